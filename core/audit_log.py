@@ -0,0 +1,389 @@
+import os
+import json
+import bisect
+import threading
+import logging
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger("TITAN-OMNI.AUDIT_LOG")
+
+# Campos indexados por igualdad (además del rango de timestamp)
+INDEX_FIELDS = ("cycle_id", "symbol", "action")
+INDEX_FORMAT = "audit-index-v1"
+
+
+def _to_iso(value: Any) -> Optional[str]:
+    """Cota temporal de consulta: datetime o ISO-8601 (prefijos como '2026-09-01' valen)."""
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, datetime):
+        return value.astimezone(timezone.utc).isoformat()
+    raise ValueError(f"AUDIT_QUERY_BOUND: {value!r}")
+
+
+def _entry(offset: int, length: int, record: Dict[str, Any]) -> list:
+    """Entrada del índice lateral: [offset, bytes, timestamp, cycle_id, symbol, action]."""
+    return [offset, length, record.get("timestamp") or ""] + [record.get(name) or "" for name in INDEX_FIELDS]
+
+
+def build_index(entries: List[list]) -> Dict[str, Any]:
+    """
+    Índice ordenado de un segmento: timestamps ordenados ([ts, ordinal]) y, por campo,
+    claves ordenadas con su lista de ordinales. Búsqueda por bisección: O(log n).
+    """
+    index = {
+        "offsets": [e[0] for e in entries],
+        "lengths": [e[1] for e in entries],
+        "ts": sorted([e[2], i] for i, e in enumerate(entries)),
+        "keys": {},
+    }
+    for position, name in enumerate(INDEX_FIELDS, start=3):
+        postings: Dict[str, List[int]] = {}
+        for i, e in enumerate(entries):
+            postings.setdefault(e[position], []).append(i)
+        keys = sorted(postings)
+        index["keys"][name] = {"keys": keys, "postings": [postings[k] for k in keys]}
+    return index
+
+
+def lookup(index: Dict[str, Any], filters: Dict[str, str], since: Optional[str], until: Optional[str]) -> List[int]:
+    """Ordinales (en orden de escritura) que cumplen los filtros de igualdad y el rango [since, until)."""
+    candidates = None
+    for name, value in filters.items():
+        field = index["keys"][name]
+        i = bisect.bisect_left(field["keys"], value)
+        if i == len(field["keys"]) or field["keys"][i] != value:
+            return []
+        postings = set(field["postings"][i])
+        candidates = postings if candidates is None else candidates & postings
+        if not candidates:
+            return []
+    if since is not None or until is not None:
+        ts = index["ts"]
+        lo = bisect.bisect_left(ts, [since, -1]) if since is not None else 0
+        hi = bisect.bisect_left(ts, [until, -1]) if until is not None else len(ts)
+        in_range = {ordinal for _, ordinal in ts[lo:hi]}
+        candidates = in_range if candidates is None else candidates & in_range
+    if candidates is None:
+        return list(range(len(index["offsets"])))
+    return sorted(candidates)
+
+
+class AuditLog:
+    """
+    AUDIT-SEGMENTS-01: Log de Auditoría Segmentado e Indexado (append-only).
+    El segmento activo sigue siendo data/forensics/audit_log.jsonl; cada registro añade además
+    una entrada al índice lateral audit_log.jsonl.idx ([offset, bytes, timestamp, cycle_id,
+    symbol, action]). Al superar AUDIT_SEGMENT_MAX_MB o AUDIT_SEGMENT_MAX_HOURS el segmento se
+    sella en audit_segments/seg-NNNNNN.jsonl con su índice ordenado (.idx.json) y una entrada en
+    audit_segments/catalog.json (rango temporal, registros, bytes).
+    query() descarta segmentos por rango temporal, busca por bisección en el índice y lee
+    solo los registros que coinciden (seek + read): sin recorrer el log completo.
+    Los segmentos sellados nunca se reescriben.
+    """
+    ACTIVE_FILE = "audit_log.jsonl"
+    SEGMENT_DIR = "audit_segments"
+
+    def __init__(self, base_path: str = "data/forensics", max_bytes: Optional[int] = None,
+                 max_age_s: Optional[float] = None, readonly: bool = False):
+        self.base_path = base_path
+        self.active_path = os.path.join(base_path, self.ACTIVE_FILE)
+        self.sidecar_path = self.active_path + ".idx"
+        self.segment_dir = os.path.join(base_path, self.SEGMENT_DIR)
+        self.catalog_path = os.path.join(self.segment_dir, "catalog.json")
+        self.max_bytes = max_bytes or int(float(os.getenv("AUDIT_SEGMENT_MAX_MB", "64")) * 1024 * 1024)
+        self.max_age_s = max_age_s if max_age_s is not None else float(os.getenv("AUDIT_SEGMENT_MAX_HOURS", "24")) * 3600
+        self.readonly = readonly
+        self._lock = threading.RLock()
+        self._entries: Optional[List[list]] = None
+        self._active_index: Optional[Dict[str, Any]] = None
+        self._size = 0
+        self._catalog: Optional[List[Dict[str, Any]]] = None
+        # Índices de segmentos sellados (inmutables) usados recientemente
+        self._indexes: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._cache_size = int(os.getenv("AUDIT_INDEX_CACHE", "8"))
+
+    # --- Segmento activo ---
+    def _load_active(self):
+        """Índice lateral del segmento activo reconciliado con el archivo (crash entre registro e índice)."""
+        if self._entries is not None:
+            return
+        size = os.path.getsize(self.active_path) if os.path.exists(self.active_path) else 0
+        entries: List[list] = []
+        lines = []
+        if os.path.exists(self.sidecar_path):
+            with open(self.sidecar_path, encoding="utf-8") as f:
+                lines = f.readlines()
+        for line in lines:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                break # entrada truncada: se reindexa desde el archivo
+            if entry[0] + entry[1] > size:
+                break
+            entries.append(entry)
+        indexed = entries[-1][0] + entries[-1][1] if entries else 0
+        tail = self._scan(self.active_path, indexed) if size > indexed else []
+        if tail:
+            logger.warning(f"AUDIT INDEX RECOVERY: {len(tail)} registros reindexados de {self.active_path}")
+        self._entries = entries + tail
+        self._size = size
+        if not self.readonly and (tail or len(entries) != len(lines)):
+            self._write_sidecar(self._entries)
+
+    @staticmethod
+    def _scan(path: str, start: int) -> List[list]:
+        """Entradas de índice de las líneas completas a partir de `start`."""
+        entries = []
+        with open(path, "rb") as f:
+            f.seek(start)
+            offset = start
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    entries.append(_entry(offset, len(line), json.loads(line)))
+                except ValueError:
+                    logger.error(f"AUDIT LINE CORRUPT @{offset} ({path})")
+                offset += len(line)
+        return entries
+
+    def _write_sidecar(self, entries: List[list]):
+        temp = self.sidecar_path + ".tmp"
+        with open(temp, "w", encoding="utf-8") as f:
+            for entry in entries:
+                f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+        os.replace(temp, self.sidecar_path)
+
+    def append(self, line: str, record: Dict[str, Any]) -> str:
+        """Añade una línea JSON (con '\\n') y su entrada de índice; sella el segmento si toca."""
+        return self.append_many([(line, record)])
+
+    def append_many(self, items: List[Tuple[str, Dict[str, Any]]], fsync: bool = False) -> str:
+        """
+        AUDIT-SINK-01: Lote de líneas con una escritura por segmento (y fsync opcional del lote).
+        El orden de `items` se conserva; si el lote cruza el límite del segmento se sella a mitad.
+        """
+        with self._lock:
+            os.makedirs(self.base_path, exist_ok=True)
+            size = os.path.getsize(self.active_path) if os.path.exists(self.active_path) else 0
+            if self._entries is not None and size != self._size:
+                # Archivo activo movido/truncado fuera de este proceso: se recarga desde disco
+                self._entries, self._active_index, self._catalog = None, None, None
+            self._load_active()
+            batch: List[Tuple[bytes, Dict[str, Any]]] = []
+            pending = 0
+            for line, record in items:
+                data = line.encode("utf-8")
+                if (self._entries or batch) and self._should_rotate(pending + len(data)):
+                    self._write_batch(batch, fsync)
+                    batch, pending = [], 0
+                    if self._entries:
+                        self.rotate()
+                batch.append((data, record))
+                pending += len(data)
+            self._write_batch(batch, fsync)
+        return self.active_path
+
+    def _write_batch(self, batch: List[Tuple[bytes, Dict[str, Any]]], fsync: bool):
+        if not batch:
+            return
+        entries = []
+        offset = self._size
+        for data, record in batch:
+            entries.append(_entry(offset, len(data), record))
+            offset += len(data)
+        with open(self.active_path, "ab") as f:
+            f.write(b"".join(data for data, _ in batch))
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        # El índice lateral se escribe después del registro (recuperable desde el log tras un crash)
+        with open(self.sidecar_path, "a", encoding="utf-8") as f:
+            f.write("".join(json.dumps(entry, separators=(",", ":")) + "\n" for entry in entries))
+        self._entries.extend(entries)
+        self._size = offset
+        self._active_index = None
+
+    def _should_rotate(self, incoming: int) -> bool:
+        if self._size + incoming > self.max_bytes:
+            return True
+        if self.max_age_s <= 0 or not self._entries:
+            return False
+        try:
+            opened = datetime.fromisoformat(self._entries[0][2])
+        except ValueError:
+            return False
+        return (datetime.now(timezone.utc) - opened).total_seconds() >= self.max_age_s
+
+    def rotate(self) -> Optional[str]:
+        """
+        Sella el segmento activo. Orden a prueba de crash: índice ordenado -> rename del
+        segmento -> borrado del índice lateral -> catálogo (reconstruible desde los .idx.json).
+        """
+        with self._lock:
+            self._load_active()
+            if not self._entries:
+                return None
+            catalog = self.catalog()
+            seq = (catalog[-1]["seq"] + 1) if catalog else 1
+            name = f"seg-{seq:06d}"
+            os.makedirs(self.segment_dir, exist_ok=True)
+            timestamps = [e[2] for e in self._entries]
+            meta = {
+                "format": INDEX_FORMAT, "seq": seq, "segment": f"{name}.jsonl", "index": f"{name}.idx.json",
+                "first_ts": min(timestamps), "last_ts": max(timestamps),
+                "records": len(self._entries), "bytes": self._size,
+            }
+            index = dict(meta, **build_index(self._entries))
+            index_path = os.path.join(self.segment_dir, meta["index"])
+            with open(index_path + ".tmp", "w", encoding="utf-8") as f:
+                json.dump(index, f, separators=(",", ":"))
+            os.replace(index_path + ".tmp", index_path)
+            os.replace(self.active_path, os.path.join(self.segment_dir, meta["segment"]))
+            if os.path.exists(self.sidecar_path):
+                os.remove(self.sidecar_path)
+            catalog.append(meta)
+            self._write_catalog(catalog)
+            self._entries, self._active_index, self._size = [], None, 0
+            logger.info(f"AUDIT SEGMENT SEALED: {meta['segment']} ({meta['records']} registros, {meta['bytes']} bytes)")
+            return meta["segment"]
+
+    # --- Catálogo de segmentos sellados ---
+    def catalog(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            if self._catalog is None:
+                self._catalog = self._load_catalog()
+            return self._catalog
+
+    def _load_catalog(self) -> List[Dict[str, Any]]:
+        catalog = []
+        if os.path.exists(self.catalog_path):
+            try:
+                with open(self.catalog_path, encoding="utf-8") as f:
+                    catalog = json.load(f)
+            except ValueError:
+                logger.error("AUDIT CATALOG CORRUPT: se reconstruye desde los índices")
+        if not os.path.isdir(self.segment_dir):
+            return catalog
+        listed = {meta["index"] for meta in catalog}
+        on_disk = sorted(n for n in os.listdir(self.segment_dir) if n.endswith(".idx.json"))
+        if listed == set(on_disk):
+            return catalog
+        # Crash durante el sellado (o catálogo perdido): el catálogo se deriva de los índices
+        rebuilt = []
+        for name in on_disk:
+            path = os.path.join(self.segment_dir, name)
+            with open(path, encoding="utf-8") as f:
+                index = json.load(f)
+            if not os.path.exists(os.path.join(self.segment_dir, index["segment"])):
+                # Índice escrito pero segmento no renombrado: el activo sigue siendo la fuente
+                if not self.readonly:
+                    os.remove(path)
+                continue
+            rebuilt.append({k: index[k] for k in ("seq", "segment", "index", "first_ts", "last_ts", "records", "bytes")})
+        if not self.readonly:
+            self._write_catalog(rebuilt)
+        return rebuilt
+
+    def _write_catalog(self, catalog: List[Dict[str, Any]]):
+        self._catalog = catalog
+        temp = self.catalog_path + ".tmp"
+        with open(temp, "w", encoding="utf-8") as f:
+            json.dump(catalog, f, indent=2)
+        os.replace(temp, self.catalog_path)
+
+    def _segment_index(self, meta: Dict[str, Any]) -> Dict[str, Any]:
+        key = meta["index"]
+        with self._lock:
+            if key in self._indexes:
+                self._indexes.move_to_end(key)
+                return self._indexes[key]
+        with open(os.path.join(self.segment_dir, key), encoding="utf-8") as f:
+            index = json.load(f)
+        with self._lock:
+            self._indexes[key] = index
+            while len(self._indexes) > self._cache_size:
+                self._indexes.popitem(last=False)
+        return index
+
+    # --- Consultas ---
+    def _sources(self, since: Optional[str], until: Optional[str]) -> List[Tuple[str, Dict[str, Any]]]:
+        """(ruta, índice) de los segmentos que solapan [since, until), más el activo."""
+        sources = []
+        for meta in self.catalog():
+            if since is not None and meta["last_ts"] < since:
+                continue
+            if until is not None and meta["first_ts"] >= until:
+                continue
+            sources.append((os.path.join(self.segment_dir, meta["segment"]), self._segment_index(meta)))
+        with self._lock:
+            self._load_active()
+            if self._entries:
+                if self._active_index is None:
+                    self._active_index = build_index(self._entries)
+                sources.append((self.active_path, self._active_index))
+        return sources
+
+    def query(self, cycle_id: Optional[str] = None, symbol: Optional[str] = None, action: Optional[str] = None,
+              since: Any = None, until: Any = None, limit: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Registros que cumplen todos los filtros dados, en orden de escritura.
+        since/until: rango de timestamp [since, until) en ISO-8601 o datetime.
+        """
+        since, until = _to_iso(since), _to_iso(until)
+        filters = {name: value for name, value in zip(INDEX_FIELDS, (cycle_id, symbol, action)) if value is not None}
+        served = 0
+        for path, index in self._sources(since, until):
+            ordinals = lookup(index, filters, since, until)
+            if not ordinals:
+                continue
+            with open(path, "rb") as f:
+                for ordinal in ordinals:
+                    f.seek(index["offsets"][ordinal])
+                    yield json.loads(f.read(index["lengths"][ordinal]))
+                    served += 1
+                    if limit is not None and served >= limit:
+                        return
+
+    def tail(self, n: int) -> List[str]:
+        """Últimas n líneas del log (activo y, si no alcanza, segmentos sellados) sin leerlo entero."""
+        lines: List[str] = []
+        for path, index in reversed(self._sources(None, None)):
+            offsets, lengths = index["offsets"], index["lengths"]
+            chunk = []
+            with open(path, "rb") as f:
+                for ordinal in range(max(0, len(offsets) - (n - len(lines))), len(offsets)):
+                    f.seek(offsets[ordinal])
+                    chunk.append(f.read(lengths[ordinal]).decode("utf-8"))
+            lines = chunk + lines
+            if len(lines) >= n:
+                break
+        return lines
+
+    def stats(self) -> Dict[str, Any]:
+        catalog = self.catalog()
+        with self._lock:
+            self._load_active()
+            return {
+                "segments": len(catalog),
+                "sealed_records": sum(m["records"] for m in catalog),
+                "sealed_bytes": sum(m["bytes"] for m in catalog),
+                "active_records": len(self._entries),
+                "active_bytes": self._size,
+            }
+
+
+_LOGS: Dict[str, AuditLog] = {}
+_LOGS_LOCK = threading.Lock()
+
+
+def audit_log(base_path: str = "data/forensics") -> AuditLog:
+    """AuditLog del proceso para `base_path` (un único escritor por directorio)."""
+    key = os.path.abspath(base_path)
+    with _LOGS_LOCK:
+        if key not in _LOGS:
+            _LOGS[key] = AuditLog(key)
+        return _LOGS[key]
@@ -0,0 +1,171 @@
+import os
+import time
+import atexit
+import threading
+import logging
+from dataclasses import asdict
+from typing import Any, Dict, List, Optional, Tuple
+
+from core.audit_log import audit_log
+from core.post_audit import AuditRecord, index_keys
+from core.tracer import count
+
+logger = logging.getLogger("TITAN-OMNI.AUDIT_SINK")
+
+FSYNC_POLICIES = ("batch", "cycle", "never")
+
+
+class AuditSink:
+    """
+    AUDIT-SINK-01: Escritor de Auditoría con Group Commit (fuera del camino de decisión).
+    submit() solo serializa el registro y lo encola; un hilo vuelca la cola cada AUDIT_FLUSH_MS
+    (o al llegar a AUDIT_BATCH_MAX registros) con UNA escritura al log segmentado y UN insert
+    masivo a Supabase por lote. flush(cycle_end=True) cierra el lote del ciclo de forma síncrona.
+    AUDIT_FSYNC: batch (fsync por lote) | cycle (solo al cierre de ciclo y drenado) | never.
+    Append-only intacto: orden de envío preservado, un único escritor y el registro local
+    siempre antes que el remoto. Registros urgentes (con orden enviada) se vuelcan antes de
+    retornar. close() (también vía atexit) drena todo lo pendiente.
+    """
+
+    def __init__(self, base_path: str = "data/forensics", flush_ms: Optional[float] = None,
+                 max_batch: Optional[int] = None, fsync: Optional[str] = None):
+        self.base_path = base_path
+        self.flush_ms = flush_ms if flush_ms is not None else float(os.getenv("AUDIT_FLUSH_MS", "250"))
+        self.max_batch = max_batch or int(os.getenv("AUDIT_BATCH_MAX", "500"))
+        self.fsync = (fsync or os.getenv("AUDIT_FSYNC", "batch")).lower()
+        if self.fsync not in FSYNC_POLICIES:
+            raise ValueError(f"AUDIT_FSYNC inválido: {self.fsync} (válidos: {', '.join(FSYNC_POLICIES)})")
+        self._cond = threading.Condition()
+        # Un único volcador a la vez: el orden de la cola es el orden del archivo
+        self._flush_lock = threading.Lock()
+        self._local: List[Tuple[str, Dict[str, Any]]] = []
+        self._remote: List[Tuple[Any, Dict[str, Any]]] = []
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        self.metrics = {"records": 0, "batches": 0, "max_batch": 0, "fsyncs": 0, "remote_batches": 0,
+                        "remote_records": 0, "remote_failed": 0, "local_failed": 0, "last_flush_ms": 0.0}
+        atexit.register(self.close)
+
+    # --- Productor ---
+    def submit(self, record: AuditRecord, supabase: Any = None, urgent: bool = False):
+        """Encola el registro (y su insert remoto si `supabase`). urgent -> volcado síncrono."""
+        line = record.to_json() + "\n"
+        with self._cond:
+            if self._closed:
+                closed = True
+            else:
+                closed = False
+                self._local.append((line, index_keys(record)))
+                if supabase is not None:
+                    self._remote.append((supabase, asdict(record)))
+                self.metrics["records"] += 1
+                if self.flush_ms > 0 and self._thread is None:
+                    self._thread = threading.Thread(target=self._worker, name="audit-sink", daemon=True)
+                    self._thread.start()
+                if len(self._local) >= self.max_batch:
+                    self._cond.notify()
+        if closed:
+            # Tras el drenado final (atexit): escritura directa, nunca se descarta un registro
+            self._write_local([(line, index_keys(record))], fsync=self.fsync != "never")
+            if supabase is not None:
+                self._write_remote([(supabase, asdict(record))])
+        elif urgent or self.flush_ms <= 0:
+            self.flush()
+
+    # --- Volcado ---
+    def flush(self, cycle_end: bool = False, remote: Optional[bool] = None) -> int:
+        """
+        Vuelca la cola local (síncrono). El lote remoto lo envía el hilo del sink; sin hilo
+        (AUDIT_FLUSH_MS <= 0), tras close() o con remote=True, aquí mismo. Retorna registros escritos.
+        """
+        if remote is None:
+            remote = self._thread is None or self._closed
+        with self._flush_lock:
+            with self._cond:
+                local, self._local = self._local, []
+                pending_remote, self._remote = (self._remote, []) if remote else ([], self._remote)
+            started = time.perf_counter()
+            fsync = self.fsync == "batch" or (self.fsync == "cycle" and cycle_end)
+            if local:
+                self._write_local(local, fsync)
+            elif fsync and cycle_end and self.fsync == "cycle":
+                self._fsync_active()
+            if local:
+                self.metrics["last_flush_ms"] = (time.perf_counter() - started) * 1000
+            if pending_remote:
+                self._write_remote(pending_remote)
+        if not remote:
+            with self._cond:
+                if self._remote:
+                    self._cond.notify()
+        return len(local)
+
+    def _write_local(self, local: List[Tuple[str, Dict[str, Any]]], fsync: bool):
+        try:
+            audit_log(self.base_path).append_many(local, fsync=fsync)
+            count("bytes_written", sum(len(line.encode("utf-8")) for line, _ in local))
+            self.metrics["batches"] += 1
+            self.metrics["max_batch"] = max(self.metrics["max_batch"], len(local))
+            if fsync:
+                self.metrics["fsyncs"] += 1
+        except Exception as e:
+            self.metrics["local_failed"] += len(local)
+            logger.error(f"FORENSIC WRITE FAILED ({len(local)} registros): {e}")
+
+    def _fsync_active(self):
+        path = audit_log(self.base_path).active_path
+        if not os.path.exists(path):
+            return
+        try:
+            with open(path, "rb") as f:
+                os.fsync(f.fileno())
+            self.metrics["fsyncs"] += 1
+        except OSError as e:
+            logger.error(f"AUDIT FSYNC FAILED: {e}")
+
+    def _write_remote(self, pending: List[Tuple[Any, Dict[str, Any]]]):
+        """Un insert masivo por cliente (log_audit_records); clientes sin él, registro a registro."""
+        groups: Dict[int, Tuple[Any, List[Dict[str, Any]]]] = {}
+        for client, record in pending:
+            groups.setdefault(id(client), (client, []))[1].append(record)
+        for client, records in groups.values():
+            try:
+                if hasattr(client, "log_audit_records"):
+                    client.log_audit_records(records)
+                elif hasattr(client, "log_audit_record"):
+                    for record in records:
+                        client.log_audit_record(record)
+                else:
+                    logger.warning("SupabaseClient no tiene método 'log_audit_records'. Saltando.")
+                    continue
+                self.metrics["remote_batches"] += 1
+                self.metrics["remote_records"] += len(records)
+            except Exception as e:
+                self.metrics["remote_failed"] += len(records)
+                logger.error(f"SUPABASE AUDIT FAILED ({len(records)} registros): {e}")
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                if not self._closed and len(self._local) < self.max_batch:
+                    self._cond.wait(self.flush_ms / 1000)
+                if self._closed:
+                    return
+            self.flush(remote=True)
+
+    def pending(self) -> int:
+        with self._cond:
+            return len(self._local) + len(self._remote)
+
+    def close(self):
+        """Drenado final (apagado ordenado y atexit): nada encolado se pierde."""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=5.0)
+        drained = self.flush(cycle_end=True)
+        if drained:
+            logger.info(f"AUDIT SINK: {drained} registros pendientes drenados.")
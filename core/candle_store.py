@@ -0,0 +1,175 @@
+import os
+import mmap
+import struct
+import threading
+import time
+import logging
+from typing import List, Optional, Any
+
+from core.tracer import count, span
+
+logger = logging.getLogger("TITAN-OMNI.CANDLES")
+
+# Duración de cada timeframe soportado (ms)
+TIMEFRAME_MS = {
+    "1m": 60_000,
+    "5m": 300_000,
+    "15m": 900_000,
+    "30m": 1_800_000,
+    "1h": 3_600_000,
+    "4h": 14_400_000,
+    "1d": 86_400_000,
+}
+
+
+class CandleStore:
+    """
+    DATA-CACHE-01: Almacén Local Incremental de Velas OHLCV.
+    Un archivo binario append-only por (símbolo, timeframe) con registros de ancho fijo
+    (timestamp int64 + OHLCV float64, little-endian), legible vía mmap.
+    Solo se persisten velas CERRADAS; la vela en formación se vuelve a pedir en cada
+    ciclo y se entrega al final de la ventana sin escribirse a disco.
+    """
+    BASE_DIR = "data/candles"
+    RECORD = struct.Struct("<q5d")
+
+    def __init__(self, base_dir: Optional[str] = None, backfill: Optional[int] = None):
+        self.base_dir = base_dir or os.getenv("CANDLE_STORE_DIR", self.BASE_DIR)
+        # Velas a pedir en la descarga inicial (Kraken sirve como máximo las 720 más recientes)
+        self.backfill = backfill if backfill is not None else int(os.getenv("CANDLE_BACKFILL", "720"))
+        self._lock = threading.Lock()
+        self.metrics = {"full_fetch": 0, "incremental_fetch": 0, "candles_fetched": 0, "resets": 0, "gaps": 0}
+
+    def path(self, symbol: str, timeframe: str) -> str:
+        symbol_sanitized = symbol.replace("/", "_").replace("\\", "_").replace(":", "_")
+        return os.path.join(self.base_dir, f"{symbol_sanitized}__{timeframe}.bin")
+
+    def count(self, symbol: str, timeframe: str) -> int:
+        """Número de velas cerradas almacenadas."""
+        file_path = self.path(symbol, timeframe)
+        if not os.path.exists(file_path):
+            return 0
+        return os.path.getsize(file_path) // self.RECORD.size
+
+    def last_timestamp(self, symbol: str, timeframe: str) -> Optional[int]:
+        """Timestamp (ms) de la última vela cerrada almacenada, o None si no hay datos válidos."""
+        file_path = self.path(symbol, timeframe)
+        try:
+            size = os.path.getsize(file_path)
+        except OSError:
+            return None
+        if size == 0 or size % self.RECORD.size != 0:
+            return None
+        with open(file_path, "rb") as f:
+            f.seek(size - self.RECORD.size)
+            return self.RECORD.unpack(f.read(self.RECORD.size))[0]
+
+    def read_window(self, symbol: str, timeframe: str, limit: int) -> List[List[Any]]:
+        """Devuelve las últimas `limit` velas cerradas en formato ccxt [ts, o, h, l, c, v]."""
+        file_path = self.path(symbol, timeframe)
+        if limit <= 0 or not os.path.exists(file_path):
+            return []
+        with open(file_path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size == 0:
+                return []
+            if size % self.RECORD.size != 0:
+                raise ValueError(f"CANDLE_STORE_CORRUPT: {file_path} size={size}")
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                start = max(0, size - limit * self.RECORD.size)
+                return [list(rec) for rec in self.RECORD.iter_unpack(mm[start:size])]
+
+    def _pack(self, candles: List[List[Any]], last_ts: Optional[int]) -> List[bytes]:
+        rows = []
+        for c in candles:
+            ts = int(c[0])
+            if last_ts is not None and ts <= last_ts:
+                continue
+            rows.append(self.RECORD.pack(ts, float(c[1]), float(c[2]), float(c[3]), float(c[4]), float(c[5] or 0.0)))
+            last_ts = ts
+        return rows
+
+    def append(self, symbol: str, timeframe: str, candles: List[List[Any]]) -> int:
+        """
+        Agrega velas cerradas estrictamente posteriores a la última almacenada.
+        Retorna el número de velas escritas.
+        """
+        rows = self._pack(candles, self.last_timestamp(symbol, timeframe))
+        if not rows:
+            return 0
+        os.makedirs(self.base_dir, exist_ok=True)
+        with open(self.path(symbol, timeframe), "ab") as f:
+            f.write(b"".join(rows))
+        count("bytes_written", len(rows) * self.RECORD.size)
+        return len(rows)
+
+    def reset(self, symbol: str, timeframe: str, candles: List[List[Any]]) -> int:
+        """Reemplaza atómicamente la serie (solo ante huecos o corrupción)."""
+        file_path = self.path(symbol, timeframe)
+        temp = file_path + ".tmp"
+        rows = self._pack(candles, None)
+        os.makedirs(self.base_dir, exist_ok=True)
+        with open(temp, "wb") as f:
+            f.write(b"".join(rows))
+        os.replace(temp, file_path)
+        count("bytes_written", len(rows) * self.RECORD.size)
+        self.metrics["resets"] += 1
+        return len(rows)
+
+    def get_ohlcv(self, exchange, symbol: str, timeframe: str = "15m", limit: int = 250) -> List[List[Any]]:
+        """
+        Equivalente a exchange.fetch_ohlcv(symbol, timeframe, limit=limit), pero solo
+        descarga las velas posteriores a la última cerrada almacenada (`since`).
+        """
+        tf_ms = TIMEFRAME_MS[timeframe]
+        now_ms = int(time.time() * 1000)
+
+        with self._lock:
+            try:
+                last_ts = self.last_timestamp(symbol, timeframe)
+            except OSError:
+                last_ts = None
+
+        stale = last_ts is None or (now_ms - last_ts) > limit * tf_ms
+        with span("fetch_ohlcv", symbol=symbol, timeframe=timeframe, full=stale):
+            if stale:
+                fetched = exchange.fetch_ohlcv(symbol, timeframe=timeframe, limit=max(limit, self.backfill))
+            else:
+                fetched = exchange.fetch_ohlcv(symbol, timeframe=timeframe, since=last_ts + tf_ms)
+        fetched = fetched or []
+
+        closed = [c for c in fetched if c[0] + tf_ms <= now_ms]
+        gap = not stale and bool(closed) and closed[0][0] > last_ts + tf_ms
+        if gap:
+            # Hueco entre lo almacenado y lo descargado: la serie deja de ser contigua.
+            # Se reinicia con una descarga completa (no solo las velas del hueco: ventana corta = régimen UNKNOWN)
+            logger.warning(f"CANDLE STORE GAP {symbol} {timeframe}: reiniciando serie local con descarga completa.")
+            with span("fetch_ohlcv", symbol=symbol, timeframe=timeframe, full=True):
+                refetched = exchange.fetch_ohlcv(symbol, timeframe=timeframe, limit=max(limit, self.backfill)) or []
+            fetched = fetched + refetched
+            closed = [c for c in refetched if c[0] + tf_ms <= now_ms]
+            forming = [c for c in refetched if c[0] + tf_ms > now_ms]
+        else:
+            forming = [c for c in fetched if c[0] + tf_ms > now_ms]
+
+        # PIPE-CONC-01: get_ohlcv puede correr en varios hilos a la vez
+        with self._lock:
+            self.metrics["full_fetch" if stale else "incremental_fetch"] += 1
+            self.metrics["candles_fetched"] += len(fetched)
+            if gap:
+                self.metrics["gaps"] += 1
+                self.metrics["full_fetch"] += 1
+            try:
+                if stale or gap:
+                    self.reset(symbol, timeframe, closed)
+                else:
+                    self.append(symbol, timeframe, closed)
+                window = self.read_window(symbol, timeframe, limit - len(forming[-1:]))
+            except (OSError, ValueError) as e:
+                # FAIL-SAFE: Ante error local devolvemos lo descargado si es una ventana completa
+                logger.error(f"CANDLE STORE ERROR {symbol} {timeframe}: {e}")
+                if stale or gap:
+                    return (refetched if gap else fetched)[-limit:]
+                return exchange.fetch_ohlcv(symbol, timeframe=timeframe, limit=limit)
+
+        return window + forming[-1:]
@@ -0,0 +1,172 @@
+import os
+import time
+import zlib
+import struct
+import marshal
+import numbers
+from array import array
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from core.indicators import IndicatorState
+from core.snapshot_store import SNAPSHOTS
+from core.tracer import count
+
+logger = logging.getLogger("TITAN-OMNI.CHECKPOINT")
+
+# Cabecera: magic | versión de formato | versión marshal | longitud payload | crc32 payload | saved_at
+HEADER = struct.Struct("<4sHHIId")
+MAGIC = b"TOCP"
+
+
+class CheckpointCorrupt(RuntimeError):
+    """Checkpoint ilegible o de otra versión: el estado (posición abierta) es desconocido."""
+
+
+class RuntimeCheckpoint:
+    """
+    CHECKPOINT-01: Checkpoint Binario de Arranque en Caliente.
+    Estado de runtime del bot en un único archivo binario (cabecera + payload marshal con CRC32):
+    máquina de estados, posición abierta, estados de indicadores, caché de régimen (índice LRU)
+    y refs de chunks de la última ventana de snapshots OHLCV (SNAPSHOT-CAS-01).
+    Se escribe al final de cada ciclo (y al abrir/cerrar posición) con tmp + fsync + os.replace,
+    y se carga en el arranque en milisegundos (cron o daemon).
+    FAIL-CLOSED: checkpoint corrupto o de otra versión -> CheckpointCorrupt (no se opera
+    sin saber si hay una posición abierta). Sin archivo -> arranque en frío (HUNTING).
+    Archivo: data/checkpoint.bin
+    """
+    STATE_FILE = "data/checkpoint.bin"
+    VERSION = 1
+
+    def __init__(self, state_file: Optional[str] = None):
+        self.state_file = state_file or self.STATE_FILE
+        self.last_save_ms = 0.0
+        self.last_load_ms = 0.0
+        self.last_size = 0
+
+    # --- Serialización ---
+    def load(self) -> Optional[Dict[str, Any]]:
+        """Snapshot del último checkpoint, None si no existe. Lanza CheckpointCorrupt si es inválido."""
+        if not os.path.exists(self.state_file):
+            return None
+        start = time.perf_counter()
+        try:
+            with open(self.state_file, "rb") as f:
+                blob = f.read()
+            if len(blob) < HEADER.size:
+                raise ValueError(f"TRUNCATED_HEADER size={len(blob)}")
+            magic, version, marshal_version, length, crc, saved_at = HEADER.unpack_from(blob)
+            if magic != MAGIC:
+                raise ValueError(f"BAD_MAGIC {magic!r}")
+            if version != self.VERSION or marshal_version != marshal.version:
+                raise ValueError(f"VERSION_MISMATCH format={version}/{self.VERSION} marshal={marshal_version}/{marshal.version}")
+            payload = blob[HEADER.size:]
+            if len(payload) != length:
+                raise ValueError(f"TRUNCATED_PAYLOAD {len(payload)} != {length}")
+            if zlib.crc32(payload) != crc:
+                raise ValueError("CRC_MISMATCH")
+            snapshot = marshal.loads(payload)
+            if not isinstance(snapshot, dict) or snapshot.get("state") not in ("HUNTING", "MANAGING"):
+                raise ValueError("INVALID_STATE")
+            if snapshot["state"] == "MANAGING" and not snapshot.get("position"):
+                raise ValueError("MANAGING_WITHOUT_POSITION")
+        except Exception as e:
+            logger.critical(f"CHECKPOINT CORRUPT ({self.state_file}): {e}. Revisión manual requerida.")
+            raise CheckpointCorrupt(f"CHECKPOINT_CORRUPT: {e}")
+        snapshot["saved_at"] = saved_at
+        self.last_size = len(blob)
+        self.last_load_ms = (time.perf_counter() - start) * 1000
+        return snapshot
+
+    def save(self, snapshot: Dict[str, Any]):
+        """Escritura atómica y durable (tmp + fsync + os.replace)."""
+        start = time.perf_counter()
+        temp = self.state_file + ".tmp"
+        try:
+            payload = marshal.dumps(snapshot)
+            header = HEADER.pack(MAGIC, self.VERSION, marshal.version, len(payload), zlib.crc32(payload), time.time())
+            os.makedirs(os.path.dirname(self.state_file) or ".", exist_ok=True)
+            with open(temp, "wb") as f:
+                f.write(header)
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp, self.state_file)
+            self.last_size = len(header) + len(payload)
+            count("bytes_written", self.last_size)
+        except Exception as e:
+            logger.error(f"FAILED TO PERSIST CHECKPOINT: {e}")
+            return False
+        self.last_save_ms = (time.perf_counter() - start) * 1000
+        return True
+
+    # --- Captura / restauración del bot ---
+    @staticmethod
+    def capture(bot) -> Dict[str, Any]:
+        """Snapshot del bot con tipos planos (marshal no admite objetos ni tipos numpy)."""
+        position = None
+        if bot.position:
+            position = {k: _plain(v) for k, v in bot.position.items()}
+        snapshot = {
+            "state": bot.state,
+            "position": position,
+            "cycle_id": bot.cycle_id,
+            "indicators": None,
+            "regime_cache": [(k, (v[0], float(v[1]))) for k, v in list(bot.regime_cache.entries.items())],
+            "snapshot_refs": SNAPSHOTS.export_latest(),
+        }
+        if bot.indicators is not None:
+            snapshot["indicators"] = {
+                "capacity": bot.indicators.capacity,
+                "states": {k: _pack_state(s) for k, s in list(bot.indicators.states.items())},
+            }
+        return snapshot
+
+    @staticmethod
+    def restore(bot, snapshot: Dict[str, Any]):
+        bot.state = snapshot["state"]
+        bot.position = snapshot.get("position")
+        entries = OrderedDict(snapshot.get("regime_cache") or [])
+        while len(entries) > bot.regime_cache.max_size:
+            entries.popitem(last=False)
+        bot.regime_cache.entries = entries
+        SNAPSHOTS.import_latest(snapshot.get("snapshot_refs") or {})
+        indicators = snapshot.get("indicators")
+        # Estados de indicadores: caché derivada, solo si coincide motor y ventana (si no, se reconstruyen)
+        if bot.indicators is not None and indicators and indicators.get("capacity") == bot.indicators.capacity:
+            bot.indicators.states = {k: _unpack_state(v) for k, v in indicators["states"].items()}
+
+
+
+EWM_FIELDS = ("ema", "gain", "loss", "atr")
+
+
+def _pack_state(state: IndicatorState) -> Dict[str, Any]:
+    """Ventanas EWM como float64 contiguos (bytes): el grueso del checkpoint sin objetos por vela."""
+    data = state.to_dict()
+    for name in EWM_FIELDS:
+        ewm = data[name]
+        ewm["values"] = array("d", [x for pair in ewm["values"] for x in pair]).tobytes()
+    return data
+
+
+def _unpack_state(data: Dict[str, Any]) -> IndicatorState:
+    data = dict(data)
+    for name in EWM_FIELDS:
+        flat = array("d")
+        flat.frombytes(data[name]["values"])
+        it = iter(flat)
+        data[name] = dict(data[name], values=list(zip(it, it)))
+    return IndicatorState.from_dict(data)
+
+
+def _plain(value: Any) -> Any:
+    """Tipos nativos exactos (np.float64 hereda de float pero marshal lo serializa como buffer)."""
+    if value is None or type(value) in (str, bool, int, float):
+        return value
+    if isinstance(value, numbers.Integral):
+        return int(value)
+    if isinstance(value, numbers.Real):
+        return float(value)
+    return str(value)
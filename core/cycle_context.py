@@ -0,0 +1,130 @@
+import os
+import time
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from core.exchange_proxy import CachingExchange
+
+logger = logging.getLogger("TITAN-OMNI.CONTEXT")
+
+
+class CycleContext:
+    """
+    CYCLE-CTX-01: Snapshot de Mercado por Ciclo.
+    Se construye una vez por run_cycle y memoiza balance, tickers y metadata de mercados
+    con su instante de captura. Cada lectura respeta un límite explícito de antigüedad
+    (max_age, segundos); si se supera, el valor se vuelve a pedir al exchange.
+    Cada refresco queda registrado y se vuelca a los facts forenses con drain_facts().
+    Lecturas críticas (critical=True, RiskGate/ejecución): solo aceptan valores leídos
+    directamente del exchange, saltando la caché del proxy (EXCHANGE-CACHE-01) si existe.
+    """
+    def __init__(self, exchange, cycle_id: str, market_meta=None, deadline=None):
+        self.exchange = exchange
+        self.cycle_id = cycle_id
+        # Límites de antigüedad leídos por ciclo (no al importar: main.py carga .env después)
+        self.balance_max_age = float(os.getenv("CTX_BALANCE_MAX_AGE", "60"))
+        self.ticker_max_age = float(os.getenv("CTX_TICKER_MAX_AGE", "5"))
+        self.markets_max_age = float(os.getenv("CTX_MARKETS_MAX_AGE", "3600"))
+        # CYCLE-DEADLINE-01: Deadline del ciclo (CycleDeadline) para las etapas que reciben el contexto
+        self.deadline = deadline
+        # MARKET-META-01: Metadata de mercados persistida (evita load_markets en cada arranque)
+        self.market_meta = market_meta
+        self.created_at = time.time()
+        # Entradas: (valor, instante de captura, leído directo del exchange)
+        self._balance: Optional[Tuple[Dict[str, Any], float, bool]] = None
+        self._tickers: Dict[str, Tuple[Dict[str, Any], float, bool]] = {}
+        self._markets: Optional[Tuple[Dict[str, Any], float, bool]] = None
+        self._direct_only = not isinstance(exchange, CachingExchange)
+        self.refreshes: List[Dict[str, Any]] = []
+        self._drained = 0
+        self.reads = 0
+
+    @staticmethod
+    def _fresh(entry: Optional[Tuple[Any, float, bool]], max_age: float, critical: bool = False) -> bool:
+        if entry is None or (critical and not entry[2]):
+            return False
+        return (time.time() - entry[1]) <= max_age
+
+    @staticmethod
+    def _reason(entry: Optional[Tuple[Any, float, bool]], critical: bool) -> str:
+        if entry is None:
+            return "miss"
+        return "not_direct" if critical and not entry[2] else "stale"
+
+    def _fetch(self, method: str, critical: bool, *args) -> Tuple[Any, float, bool]:
+        if critical and not self._direct_only:
+            value = self.exchange.bypass(method, *args)
+        else:
+            value = getattr(self.exchange, method)(*args)
+        return value, time.time(), critical or self._direct_only
+
+    def _record(self, kind: str, key: Optional[str], reason: str, captured_at: float):
+        self.refreshes.append({"kind": kind, "key": key, "reason": reason, "captured_at": captured_at})
+
+    def balance(self, max_age: Optional[float] = None, critical: bool = False) -> Dict[str, Any]:
+        self.reads += 1
+        max_age = self.balance_max_age if max_age is None else max_age
+        if not self._fresh(self._balance, max_age, critical):
+            reason = self._reason(self._balance, critical)
+            self._balance = self._fetch("fetch_balance", critical)
+            self._record("balance", None, reason, self._balance[1])
+        return self._balance[0]
+
+    def ticker(self, symbol: str, max_age: Optional[float] = None, critical: bool = False) -> Dict[str, Any]:
+        self.reads += 1
+        max_age = self.ticker_max_age if max_age is None else max_age
+        entry = self._tickers.get(symbol)
+        if not self._fresh(entry, max_age, critical):
+            reason = self._reason(entry, critical)
+            entry = self._tickers[symbol] = self._fetch("fetch_ticker", critical, symbol)
+            self._record("ticker", symbol, reason, entry[1])
+        return entry[0]
+
+    def tickers(self, symbols: List[str], max_age: Optional[float] = None) -> Dict[str, Dict[str, Any]]:
+        """Tickers en bloque (una sola llamada fetch_tickers si falta o caducó alguno)."""
+        self.reads += 1
+        max_age = self.ticker_max_age if max_age is None else max_age
+        if not all(self._fresh(self._tickers.get(s), max_age) for s in symbols):
+            reason = "miss" if any(s not in self._tickers for s in symbols) else "stale"
+            values, captured_at, direct = self._fetch("fetch_tickers", False, symbols)
+            self._record("tickers", ",".join(symbols), reason, captured_at)
+            for symbol, value in (values or {}).items():
+                self._tickers[symbol] = (value, captured_at, direct)
+        return {s: self._tickers[s][0] for s in symbols if s in self._tickers}
+
+    def markets(self, max_age: Optional[float] = None) -> Dict[str, Any]:
+        self.reads += 1
+        max_age = self.markets_max_age if max_age is None else max_age
+        if not self._fresh(self._markets, max_age):
+            reason = self._reason(self._markets, False)
+            if self.market_meta is not None:
+                self._markets = (self.market_meta.get_markets(), self.market_meta.saved_at, False)
+                reason = f"{reason}|source={self.market_meta.source}"
+            else:
+                self._markets = self._fetch("load_markets", False)
+            self._record("markets", None, reason, self._markets[1])
+        return self._markets[0]
+
+    def invalidate(self, kind: str, key: Optional[str] = None):
+        """Descarta un valor memoizado (ej. balance tras una orden ejecutada)."""
+        if kind == "balance":
+            self._balance = None
+        elif kind == "ticker":
+            if key is None:
+                self._tickers.clear()
+            else:
+                self._tickers.pop(key, None)
+        elif kind == "markets":
+            self._markets = None
+
+    def drain_facts(self) -> List[str]:
+        """Facts forenses de los refrescos ocurridos desde la última llamada."""
+        facts = []
+        for r in self.refreshes[self._drained:]:
+            target = r["kind"] if r["key"] is None else f"{r['kind']}:{r['key']}"
+            facts.append(f"ctx_refresh={target}|{r['reason']}|captured_ms={int(r['captured_at'] * 1000)}")
+        self._drained = len(self.refreshes)
+        return facts
+
+    def summary(self) -> Dict[str, Any]:
+        return {"cycle_id": self.cycle_id, "reads": self.reads, "refreshes": len(self.refreshes)}
@@ -0,0 +1,114 @@
+import os
+import time
+import uuid
+import signal
+import threading
+import logging
+from typing import Optional, Tuple
+
+from core.candle_store import TIMEFRAME_MS
+
+logger = logging.getLogger("TITAN-OMNI.DAEMON")
+
+
+def estimate_clock_offset(exchange, samples: int = 3) -> Tuple[float, float]:
+    """
+    Offset del reloj del exchange respecto al local (ms): exchange_ms ≈ local_ms + offset.
+    Toma la muestra de menor RTT (estimación tipo NTP: punto medio de la petición).
+    Retorna (offset_ms, rtt_ms).
+    """
+    best = None
+    for _ in range(max(1, samples)):
+        t0 = time.time() * 1000
+        server_ms = exchange.fetch_time()
+        t1 = time.time() * 1000
+        if server_ms is None:
+            continue
+        rtt = t1 - t0
+        offset = float(server_ms) - (t0 + t1) / 2
+        if best is None or rtt < best[1]:
+            best = (offset, rtt)
+    if best is None:
+        raise RuntimeError("CLOCK_OFFSET_UNAVAILABLE")
+    return best
+
+
+def next_candle_close(now_ms: float, timeframe_ms: int) -> int:
+    """Timestamp (ms, reloj del exchange) del próximo cierre de vela."""
+    return (int(now_ms) // timeframe_ms + 1) * timeframe_ms
+
+
+class CycleDaemon:
+    """
+    DAEMON-01: Modo Residente.
+    Mantiene vivo TitanOmniBot (conexiones, cachés, estado de indicadores) y dispara
+    cada ciclo justo después del cierre de vela (DAEMON_TIMEFRAME, 15m) según el reloj
+    del exchange (offset estimado con fetch_time, re-sincronizado cada DAEMON_CLOCK_RESYNC ciclos).
+    SIGTERM/SIGINT -> apagado ordenado: termina el ciclo en curso y drena el WAL.
+    """
+    def __init__(self, bot, timeframe: Optional[str] = None, close_delay_ms: Optional[int] = None, max_cycles: Optional[int] = None):
+        self.bot = bot
+        self.timeframe = timeframe or os.getenv("DAEMON_TIMEFRAME", "15m")
+        self.timeframe_ms = TIMEFRAME_MS[self.timeframe]
+        # Margen tras el cierre para que el exchange publique la vela cerrada
+        self.close_delay_ms = close_delay_ms if close_delay_ms is not None else int(os.getenv("DAEMON_CLOSE_DELAY_MS", "2000"))
+        self.max_cycles = max_cycles if max_cycles is not None else int(os.getenv("DAEMON_MAX_CYCLES", "0"))
+        self.resync_every = int(os.getenv("DAEMON_CLOCK_RESYNC", "4"))
+        self.offset_ms = 0.0
+        self.cycles = 0
+        self.stop_event = threading.Event()
+
+    def request_stop(self, signum=None, frame=None):
+        logger.warning(f"DAEMON: Señal de apagado recibida ({signum}). Terminando tras el ciclo en curso.")
+        self.stop_event.set()
+
+    def _install_signals(self):
+        if threading.current_thread() is not threading.main_thread():
+            return
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(sig, self.request_stop)
+
+    def sync_clock(self):
+        try:
+            self.offset_ms, rtt_ms = estimate_clock_offset(self.bot.exchange)
+            logger.info(f"DAEMON: offset reloj exchange={self.offset_ms:+.1f} ms (rtt={rtt_ms:.1f} ms)")
+        except Exception as e:
+            # Sin offset se usa el reloj local (el margen DAEMON_CLOSE_DELAY_MS absorbe la deriva típica)
+            logger.warning(f"DAEMON: no se pudo estimar el offset del reloj: {e}")
+
+    def seconds_until_next_cycle(self) -> float:
+        exchange_now = time.time() * 1000 + self.offset_ms
+        target = next_candle_close(exchange_now, self.timeframe_ms) + self.close_delay_ms
+        return max(0.0, (target - exchange_now) / 1000)
+
+    def run(self):
+        self._install_signals()
+        self.sync_clock()
+        logger.info(f"DAEMON: iniciado (timeframe={self.timeframe}, delay={self.close_delay_ms} ms)")
+        try:
+            while not self.stop_event.is_set():
+                wait_s = self.seconds_until_next_cycle()
+                logger.info(f"DAEMON: próximo ciclo en {wait_s:.1f} s")
+                if self.stop_event.wait(wait_s):
+                    break
+
+                self.bot.cycle_id = str(uuid.uuid4())[:8]
+                started = time.time()
+                try:
+                    self.bot.run_cycle()
+                except Exception as e:
+                    # Un ciclo fallido no detiene el daemon (cada ciclo es fail-closed por sí mismo)
+                    logger.critical(f"DAEMON: CRASH EN CICLO [{self.bot.cycle_id}]: {e}")
+                self.cycles += 1
+
+                elapsed = time.time() - started
+                if elapsed * 1000 > self.timeframe_ms:
+                    logger.warning(f"DAEMON: CYCLE OVERRUN ({elapsed:.1f} s > {self.timeframe}). Se omiten cierres intermedios.")
+                if self.max_cycles and self.cycles >= self.max_cycles:
+                    break
+                if self.resync_every and self.cycles % self.resync_every == 0:
+                    self.sync_clock()
+        finally:
+            # SystemExit (preflight/gobernanza) también pasa por aquí: apagado ordenado y se propaga
+            self.bot.shutdown()
+            logger.info(f"DAEMON: detenido tras {self.cycles} ciclos.")
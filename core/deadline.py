@@ -0,0 +1,159 @@
+import os
+import time
+import faulthandler
+import logging
+from concurrent.futures import TimeoutError as FutureTimeout
+from typing import Any, Dict, Hashable, List, Optional
+
+logger = logging.getLogger("TITAN-OMNI.DEADLINE")
+
+
+class DeadlineExceeded(TimeoutError):
+    """Presupuesto de una etapa (o del ciclo) agotado: la operación no se inicia / se abandona."""
+    def __init__(self, stage: str):
+        super().__init__(f"DEADLINE_EXCEEDED_{stage.upper()}")
+        self.stage = stage
+
+
+class CycleDeadline:
+    """
+    CYCLE-DEADLINE-01: Deadline del Ciclo y Presupuestos por Etapa.
+    Se crea al inicio de run_cycle (CYCLE_DEADLINE_S, 20 s según MASTER_ARCHITECTURE) y viaja
+    en el CycleContext a escáner, adquisición, régimen, RiskGate y ejecución.
+    Cada etapa tiene un presupuesto propio (DEADLINE_<ETAPA>_S) acotado además por lo que
+    resta del ciclo. Las esperas usan timeout(etapa); al agotarse se falla cerrado
+    (DeadlineExceeded -> SKIP_DEADLINE). reserve(etapa) exige tiempo suficiente para
+    completar una etapa antes de empezarla (RiskGate + orden): en entradas RiskGate devuelve
+    RISK_GATE_DEADLINE_EXCEEDED y la ejecución DEADLINE_EXCEEDED; las salidas (SELL en
+    MANAGING, SL/TP) nunca se aplazan. La auditoría no consume
+    presupuesto: el registro remoto va siempre al outbox de Supabase (OUTBOX-01), sin bloquear.
+    CYCLE_DEADLINE_S <= 0 desactiva el deadline (presupuestos infinitos).
+    for_exchange(): presupuestos mínimos según el rate limit del cliente ccxt (rateLimit x peticiones
+    esperadas por etapa); los valores por defecto solo bastan para clientes sin throttling.
+    El entorno se lee al crear cada deadline (no al importar): .env se carga después de los imports.
+    """
+    TOTAL_S = 20.0
+    BUDGETS = {"scan": 4.0, "acquire": 8.0, "decide": 8.0, "execution": 3.0}
+
+    # Peticiones al exchange esperadas por etapa: (fijas, por activo). Escaneo: tickers + balance + mercados;
+    # adquisición: 15m + 1h/4h (mientras el resample no cubre la ventana); ejecución: ticker + balance + orden
+    REQUESTS = {"scan": (3, 0), "acquire": (0, 3), "decide": (0, 1), "execution": (3, 0)}
+
+    def __init__(self, total_s: Optional[float] = None, budgets: Optional[Dict[str, float]] = None):
+        self.total_s = self.configured_total() if total_s is None else total_s
+        self.enabled = self.total_s > 0
+        self.budgets = dict(self.configured_budgets(), **(budgets or {}))
+        self.started_at = time.monotonic()
+        self.expires_at = self.started_at + self.total_s
+        self.stages: Dict[str, float] = {}
+        self.exceeded: List[str] = []
+
+    @classmethod
+    def configured_total(cls) -> float:
+        return float(os.getenv("CYCLE_DEADLINE_S", str(cls.TOTAL_S)))
+
+    @classmethod
+    def configured_budgets(cls) -> Dict[str, float]:
+        return {stage: float(os.getenv(f"DEADLINE_{stage.upper()}_S", str(default))) for stage, default in cls.BUDGETS.items()}
+
+    @classmethod
+    def for_exchange(cls, exchange: Any, assets: Optional[int] = None) -> "CycleDeadline":
+        """
+        Deadline con presupuestos >= rateLimit (s) x peticiones esperadas x DEADLINE_RATE_MARGIN.
+        Con enableRateLimit, ccxt serializa las peticiones del cliente (Kraken: ~3 s cada una):
+        un ciclo sano de 5 activos no cabe en los valores por defecto. Las variables de entorno
+        explícitas (CYCLE_DEADLINE_S, DEADLINE_<ETAPA>_S) tienen prioridad.
+        """
+        assets = assets if assets is not None else int(os.getenv("DEADLINE_EXPECTED_ASSETS", "5"))
+        rate_limit = getattr(exchange, "rateLimit", 0)
+        throttled = getattr(exchange, "enableRateLimit", False) is True and isinstance(rate_limit, (int, float))
+        rate_s = rate_limit / 1000 if throttled else 0.0
+        margin = float(os.getenv("DEADLINE_RATE_MARGIN", "1.5"))
+        budgets = cls.configured_budgets()
+        for stage in budgets:
+            if os.getenv(f"DEADLINE_{stage.upper()}_S") is None:
+                fixed, per_asset = cls.REQUESTS.get(stage, (0, 0))
+                budgets[stage] = max(budgets[stage], rate_s * (fixed + per_asset * assets) * margin)
+        total_s = cls.configured_total()
+        if rate_s > 0 and os.getenv("CYCLE_DEADLINE_S") is None and total_s > 0:
+            # Etapas secuenciales del ciclo
+            total_s = max(total_s, budgets["scan"] + budgets["acquire"] + budgets["decide"] + budgets["execution"])
+        return cls(total_s=total_s, budgets=budgets)
+
+    def remaining(self) -> float:
+        if not self.enabled:
+            return float("inf")
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def start(self, stage: str) -> "CycleDeadline":
+        self.stages[stage] = time.monotonic()
+        return self
+
+    def timeout(self, stage: str) -> float:
+        """Segundos disponibles para la etapa: min(presupuesto restante de la etapa, resto del ciclo)."""
+        if not self.enabled:
+            return float("inf")
+        started = self.stages.get(stage, time.monotonic())
+        budget_left = self.budgets.get(stage, self.total_s) - (time.monotonic() - started)
+        return max(0.0, min(budget_left, self.remaining()))
+
+    def check(self, stage: str):
+        if self.timeout(stage) <= 0:
+            self._exceeded(stage)
+            raise DeadlineExceeded(stage)
+
+    def reserve(self, stage: str) -> bool:
+        """True si queda ciclo para completar la etapa entera (no se empieza lo que no puede terminar)."""
+        if self.remaining() >= self.budgets.get(stage, 0.0):
+            return True
+        self._exceeded(stage)
+        return False
+
+    def result(self, prefetcher, key: Hashable, stage: str) -> Any:
+        """Resultado de un trabajo del pool esperando como mucho timeout(etapa)."""
+        wait = self.timeout(stage)
+        try:
+            return prefetcher.result(key, timeout=None if wait == float("inf") else wait)
+        except FutureTimeout:
+            self._exceeded(stage)
+            raise DeadlineExceeded(stage)
+
+    def _exceeded(self, stage: str):
+        if stage not in self.exceeded:
+            self.exceeded.append(stage)
+            logger.warning(f"DEADLINE: etapa '{stage}' sin presupuesto (resto ciclo {self.remaining():.2f} s)")
+
+    def facts(self) -> List[str]:
+        if not self.enabled:
+            return ["deadline=disabled"]
+        return [f"deadline_remaining_ms={int(self.remaining() * 1000)}"]
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "total_s": self.total_s,
+            "elapsed_s": round(time.monotonic() - self.started_at, 3),
+            "remaining_s": round(self.remaining(), 3) if self.enabled else None,
+            "exceeded": list(self.exceeded),
+        }
+
+
+class CycleWatchdog:
+    """
+    CYCLE-DEADLINE-01: Watchdog de ciclo colgado (faulthandler, hilo nativo).
+    Si el ciclo no termina en deadline + CYCLE_WATCHDOG_GRACE_S vuelca las pilas de todos
+    los hilos a stderr; con CYCLE_WATCHDOG_EXIT=true además termina el proceso (fail-closed
+    para ejecuciones cron: el siguiente ciclo arranca limpio desde el checkpoint).
+    """
+    def __init__(self, grace_s: Optional[float] = None, exit_on_timeout: Optional[bool] = None):
+        self.grace_s = grace_s if grace_s is not None else float(os.getenv("CYCLE_WATCHDOG_GRACE_S", "10"))
+        self.exit_on_timeout = exit_on_timeout if exit_on_timeout is not None else os.getenv("CYCLE_WATCHDOG_EXIT", "false").lower() == "true"
+
+    def arm(self, deadline: CycleDeadline):
+        if deadline.enabled:
+            faulthandler.dump_traceback_later(deadline.total_s + self.grace_s, exit=self.exit_on_timeout)
+
+    def disarm(self):
+        faulthandler.cancel_dump_traceback_later()
@@ -0,0 +1,181 @@
+import os
+import time
+import threading
+import logging
+from concurrent.futures import Future
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger("TITAN-OMNI.EXCHANGE_CACHE")
+
+# TTL (segundos) por método de lectura cacheable; EXCHANGE_TTL_<MÉTODO> los sobrescribe
+DEFAULT_TTLS = {
+    "fetch_tickers": 5.0,
+    "fetch_ticker": 2.0,
+    "fetch_ohlcv": 10.0,
+    "load_markets": 3600.0,
+    "fetch_balance": 10.0,
+}
+
+
+def configured_ttls() -> Dict[str, float]:
+    """TTLs con los overrides del entorno, leídos al crear el proxy (main.py carga .env después de los imports)."""
+    return {method: float(os.getenv(f"EXCHANGE_TTL_{method.upper()}", str(ttl))) for method, ttl in DEFAULT_TTLS.items()}
+
+
+def _freeze(value: Any) -> Any:
+    """Convierte argumentos (listas/dicts) en una clave hashable estable."""
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple, set)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+class CachingExchange:
+    """
+    EXCHANGE-CACHE-01: Proxy de Caché sobre el Exchange ccxt.
+    Reemplazo directo del objeto exchange: los métodos de lectura de DEFAULT_TTLS se
+    cachean por (método, argumentos) con TTL propio y las llamadas idénticas concurrentes
+    comparten una sola petición (coalescing). El resto de atributos (create_order, id,
+    markets, ...) se delega sin cambios al exchange real.
+    Lecturas críticas para ejecución: bypass(método, ...) siempre consulta el exchange
+    (y refresca la caché con el resultado).
+    """
+    def __init__(self, exchange, ttls: Optional[Dict[str, float]] = None, max_entries: Optional[int] = None):
+        self._exchange = exchange
+        self._ttls = dict(configured_ttls(), **(ttls or {}))
+        self._max_entries = max_entries or int(os.getenv("EXCHANGE_CACHE_MAX", "4096"))
+        self._cache: Dict[Tuple, Tuple[Any, float]] = {}
+        self._inflight: Dict[Tuple, Future] = {}
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, float]] = {}
+
+    # --- Métricas ---
+    def _stat(self, method: str) -> Dict[str, float]:
+        stat = self._stats.get(method)
+        if stat is None:
+            stat = self._stats[method] = {"hits": 0, "misses": 0, "coalesced": 0, "bypass": 0, "errors": 0, "calls": 0, "latency_total_ms": 0.0, "latency_max_ms": 0.0}
+        return stat
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Contadores por método: hits, misses, coalesced, bypass, errors, calls y latencia de las llamadas reales."""
+        with self._lock:
+            out = {}
+            for method, stat in self._stats.items():
+                row = dict(stat)
+                row["latency_avg_ms"] = round(stat["latency_total_ms"] / stat["calls"], 3) if stat["calls"] else 0.0
+                out[method] = row
+            return out
+
+    def hit_rate(self) -> float:
+        with self._lock:
+            hits = sum(s["hits"] + s["coalesced"] for s in self._stats.values())
+            total = hits + sum(s["misses"] for s in self._stats.values())
+        return hits / total if total else 0.0
+
+    # --- Núcleo ---
+    def _call(self, method: str, args: tuple, kwargs: dict) -> Any:
+        """Llamada real al exchange, con medición de latencia."""
+        start = time.perf_counter()
+        try:
+            return getattr(self._exchange, method)(*args, **kwargs)
+        except Exception:
+            with self._lock:
+                self._stat(method)["errors"] += 1
+            raise
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            with self._lock:
+                stat = self._stat(method)
+                stat["calls"] += 1
+                stat["latency_total_ms"] += elapsed_ms
+                stat["latency_max_ms"] = max(stat["latency_max_ms"], elapsed_ms)
+
+    def _store(self, key: Tuple, value: Any):
+        # Con el lock tomado
+        now = time.monotonic()
+        self._cache[key] = (value, now)
+        if len(self._cache) > self._max_entries:
+            expired = [k for k, (_, ts) in self._cache.items() if now - ts > self._ttls.get(k[0], 0)]
+            for k in expired:
+                del self._cache[k]
+            while len(self._cache) > self._max_entries:
+                del self._cache[next(iter(self._cache))]
+
+    def _cached(self, method: str, args: tuple, kwargs: dict) -> Any:
+        key = (method, _freeze(args), _freeze(kwargs))
+        ttl = self._ttls.get(method, 0)
+        with self._lock:
+            stat = self._stat(method)
+            entry = self._cache.get(key)
+            if entry is not None and time.monotonic() - entry[1] <= ttl:
+                stat["hits"] += 1
+                return entry[0]
+            future = self._inflight.get(key)
+            if future is not None:
+                # Petición idéntica en curso: esperar su resultado
+                stat["coalesced"] += 1
+                owner = False
+            else:
+                stat["misses"] += 1
+                future = self._inflight[key] = Future()
+                owner = True
+
+        if not owner:
+            return future.result()
+
+        try:
+            value = self._call(method, args, kwargs)
+            with self._lock:
+                self._store(key, value)
+            future.set_result(value)
+            return value
+        except Exception as e:
+            # Los errores no se cachean: se propagan a todos los que esperaban
+            future.set_exception(e)
+            raise
+        finally:
+            # También ante BaseException (KeyboardInterrupt/SystemExit del watchdog): nadie queda esperando
+            with self._lock:
+                self._inflight.pop(key, None)
+            if not future.done():
+                future.set_exception(RuntimeError(f"COALESCED_CALL_ABORTED: {method}"))
+
+    def bypass(self, method: str, *args, **kwargs) -> Any:
+        """Lectura crítica para ejecución: siempre va al exchange; el resultado refresca la caché."""
+        with self._lock:
+            self._stat(method)["bypass"] += 1
+        value = self._call(method, args, kwargs)
+        if method in self._ttls:
+            with self._lock:
+                self._store((method, _freeze(args), _freeze(kwargs)), value)
+        return value
+
+    def invalidate(self, method: Optional[str] = None):
+        """Descarta entradas cacheadas (de un método o todas)."""
+        with self._lock:
+            if method is None:
+                self._cache.clear()
+            else:
+                for k in [k for k in self._cache if k[0] == method]:
+                    del self._cache[k]
+
+    # --- Interfaz ccxt cacheada ---
+    def fetch_tickers(self, *args, **kwargs):
+        return self._cached("fetch_tickers", args, kwargs)
+
+    def fetch_ticker(self, *args, **kwargs):
+        return self._cached("fetch_ticker", args, kwargs)
+
+    def fetch_ohlcv(self, *args, **kwargs):
+        return self._cached("fetch_ohlcv", args, kwargs)
+
+    def load_markets(self, *args, **kwargs):
+        return self._cached("load_markets", args, kwargs)
+
+    def fetch_balance(self, *args, **kwargs):
+        return self._cached("fetch_balance", args, kwargs)
+
+    def __getattr__(self, name: str) -> Any:
+        # Solo se invoca para atributos no definidos en el proxy
+        return getattr(self._exchange, name)
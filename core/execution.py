@@ -12,14 +12,22 @@ class ExecutionEngine:
         self.exchange = exchange
         self.supabase = supabase
     
-    def execute(self, ticket):
+    def execute(self, ticket, context=None):
         """
         Procesa un ExecutionTicket.
+        context: CycleContext opcional (CYCLE-CTX-01) para reutilizar el ticker del ciclo.
         """
         logger.info(f"EXECUTION: Procesando ticket {ticket.ticket_id} | {ticket.action} {ticket.symbol}")
         
         if ticket.action == "HOLD":
             return {"status": "SKIPPED", "fill_price": 0.0}
+        
+        # CYCLE-DEADLINE-01: Una entrada fuera del deadline del ciclo no se envía (fail-closed);
+        # una salida (SELL) sí: reduce riesgo y diferirla dejaría la posición abierta otro ciclo
+        deadline = getattr(context, "deadline", None)
+        if ticket.action != "SELL" and deadline is not None and deadline.expired():
+            logger.error(f"EXECUTION ABORTED: deadline del ciclo agotado ({ticket.ticket_id})")
+            return {"status": "FAILED", "reason": "DEADLINE_EXCEEDED"}
             
         try:
             # Aqu\u00ed ir\u00eda la l\u00f3gica real de CCXT
@@ -28,7 +36,7 @@ class ExecutionEngine:
             # Simular latencia de red
             time.sleep(0.1)
             
-            ticker = self.exchange.fetch_ticker(ticket.symbol)
+            ticker = context.ticker(ticket.symbol, critical=True) if context else self.exchange.fetch_ticker(ticket.symbol)
             fill_price = ticker['close']
             
             logger.info(f"EXECUTION: Orden ENVIADA -> {ticket.action} {ticket.quantity} @ ~{fill_price}")
@@ -0,0 +1,337 @@
+import os
+import json
+import math
+import sys
+import time
+import logging
+from typing import Dict, List, Optional, Any, Tuple
+
+import numpy as np
+
+from core.candle_store import TIMEFRAME_MS
+from core.market_regime import MarketRegime
+
+logger = logging.getLogger("TITAN-OMNI.INDICATORS")
+
+EMA_LENGTH = 200
+RSI_LENGTH = 14
+ATR_LENGTH = 14
+WINDOW = 250 # Misma ventana que el fetch_ohlcv(limit=250) del path pandas_ta
+
+
+def _nonzero_range(high: float, low: float) -> float:
+    # pandas_ta.non_zero_range: suma epsilon si el rango es cero
+    rng = high - low
+    return rng if rng != 0 else rng + sys.float_info.epsilon
+
+
+def seeded_ewm_last(values: np.ndarray, seed: int, alpha: float) -> np.ndarray:
+    """
+    Último valor de la media exponencial con semilla SMA para cada fila de `values` (A, n),
+    en forma cerrada:  b^(n-L) * mean(v[:L]) + a * sum_{j>=L} b^(n-1-j) * v_j.
+    Equivale a ewm(adjust=False) sembrado como pandas_ta, sin recorrer la serie en Python.
+    """
+    n = values.shape[1]
+    decay = 1.0 - alpha
+    weights = decay ** np.arange(n - seed - 1, -1, -1, dtype=np.float64)
+    head = values[:, :seed].mean(axis=1) * decay ** (n - seed)
+    return head + alpha * (values[:, seed:] @ weights)
+
+
+def batch_indicators(ohlcv: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    EMA200 / RSI14 / ATR14 de la última vela para un bloque (activos x velas x columnas).
+    Columnas en orden ccxt [ts, o, h, l, c, v] o solo OHLCV [o, h, l, c, v].
+    Requiere n >= EMA_LENGTH velas por activo. Retorna (price, ema, rsi, atr), cada uno (A,).
+    """
+    off = ohlcv.shape[2] - 5
+    high = ohlcv[:, :, off + 1]
+    low = ohlcv[:, :, off + 2]
+    close = ohlcv[:, :, off + 3]
+
+    ema = seeded_ewm_last(close, EMA_LENGTH, 2.0 / (EMA_LENGTH + 1))
+
+    diff = np.diff(close, axis=1)
+    gain = seeded_ewm_last(np.maximum(diff, 0.0), 1, 1.0 / RSI_LENGTH)
+    loss = seeded_ewm_last(np.maximum(-diff, 0.0), 1, 1.0 / RSI_LENGTH)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsi = 100.0 * gain / (gain + loss)
+
+    # pandas_ta.non_zero_range: si algún rango es cero, suma epsilon a toda la serie
+    hl = high - low
+    hl = hl + sys.float_info.epsilon * (hl == 0).any(axis=1)[:, None]
+    prev = close[:, :-1]
+    tr = np.empty_like(hl)
+    tr[:, 0] = np.abs(hl[:, 0])
+    tr[:, 1:] = np.maximum(np.abs(hl[:, 1:]), np.maximum(np.abs(high[:, 1:] - prev), np.abs(prev - low[:, 1:])))
+    atr = seeded_ewm_last(tr, ATR_LENGTH, 1.0 / ATR_LENGTH)
+
+    return close[:, -1], ema, rsi, atr
+
+
+class WindowedEwm:
+    """
+    Media exponencial con semilla SMA sobre ventana deslizante (semántica pandas_ta):
+    SMA de los primeros `seed` valores de la ventana y luego ewm(adjust=False).
+    Con n valores en ventana el resultado es  b^(n-L) * S/L + a * T, donde
+    S = suma de la semilla y T = sum_{j>=L} b^(n-1-j) * v_j.
+    Agregar o desplazar una vela actualiza S y T en O(1).
+    Cada elemento es (valor, valor_si_es_primero): el primer elemento de la ventana
+    puede tener otra definición (ej. True Range sin cierre previo).
+    """
+    def __init__(self, seed: int, alpha: float, capacity: int):
+        self.seed = seed
+        self.alpha = alpha
+        self.decay = 1.0 - alpha
+        self.capacity = capacity
+        self.buf: List[Optional[Tuple[float, float]]] = [None] * capacity
+        self.head = 0
+        self.n = 0
+        self.seed_sum = 0.0
+        self.tail = 0.0
+        self.slides = 0
+        self._decay_out = self.decay ** (capacity - seed) # peso b^(w-L) del elemento que entra a la semilla
+
+    def _at(self, i: int) -> Tuple[float, float]:
+        return self.buf[(self.head + i) % self.capacity]
+
+    def _next(self, value: Tuple[float, float]) -> Tuple[float, float, int]:
+        """Calcula (seed_sum, tail, n) tras agregar `value`, sin mutar el estado."""
+        if self.n < self.capacity:
+            if self.n == 0:
+                return value[1], 0.0, 1
+            if self.n < self.seed:
+                return self.seed_sum + value[0], 0.0, self.n + 1
+            return self.seed_sum, self.decay * self.tail + value[0], self.n + 1
+
+        first, second, entering = self._at(0), self._at(1), self._at(self.seed)
+        seed_sum = self.seed_sum - first[1] - second[0] + second[1] + entering[0]
+        tail = self.decay * self.tail - self._decay_out * entering[0] + value[0]
+        return seed_sum, tail, self.n
+
+    def _result(self, seed_sum: float, tail: float, n: int) -> Optional[float]:
+        if n < self.seed:
+            return None
+        return (self.decay ** (n - self.seed)) * seed_sum / self.seed + self.alpha * tail
+
+    def value(self) -> Optional[float]:
+        return self._result(self.seed_sum, self.tail, self.n)
+
+    def peek(self, value: Tuple[float, float]) -> Optional[float]:
+        """Valor que tendría la ventana si se agregara `value` (vela en formación)."""
+        return self._result(*self._next(value))
+
+    def push(self, value: Tuple[float, float]):
+        self.seed_sum, self.tail, n = self._next(value)
+        if self.n < self.capacity:
+            self.buf[(self.head + self.n) % self.capacity] = value
+            self.n = n
+        else:
+            self.buf[self.head] = value
+            self.head = (self.head + 1) % self.capacity
+            self.slides += 1
+            # Re-anclaje exacto cada `capacity` desplazamientos (O(1) amortizado, acota deriva float)
+            if self.slides % self.capacity == 0:
+                self._reanchor()
+
+    def _reanchor(self):
+        values = [self._at(i) for i in range(self.n)]
+        self.seed_sum = sum(v[1] if i == 0 else v[0] for i, v in enumerate(values[:self.seed]))
+        tail = 0.0
+        for v in values[self.seed:]:
+            tail = self.decay * tail + v[0]
+        self.tail = tail
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "seed_sum": self.seed_sum,
+            "tail": self.tail,
+            "slides": self.slides,
+            "values": [list(self._at(i)) for i in range(self.n)]
+        }
+
+    def load_dict(self, data: Dict[str, Any]):
+        values = data["values"]
+        if len(values) > self.capacity:
+            raise ValueError("WINDOW_OVERFLOW")
+        self.buf = [tuple(v) for v in values] + [None] * (self.capacity - len(values))
+        self.head = 0
+        self.n = len(values)
+        self.seed_sum = float(data["seed_sum"])
+        self.tail = float(data["tail"])
+        self.slides = int(data.get("slides", 0))
+
+
+class IndicatorState:
+    """
+    Estado incremental EMA200 / RSI14 / ATR14 de una serie (símbolo, timeframe).
+    Solo recibe velas CERRADAS; la vela en formación se evalúa con peek() sin comprometerla.
+    """
+    def __init__(self, capacity: int = WINDOW):
+        self.capacity = capacity
+        self.ema = WindowedEwm(EMA_LENGTH, 2.0 / (EMA_LENGTH + 1), capacity)
+        # RSI opera sobre diferencias: la ventana tiene una posición menos que la de cierres
+        self.gain = WindowedEwm(1, 1.0 / RSI_LENGTH, capacity - 1)
+        self.loss = WindowedEwm(1, 1.0 / RSI_LENGTH, capacity - 1)
+        self.atr = WindowedEwm(ATR_LENGTH, 1.0 / ATR_LENGTH, capacity)
+        self.last_ts: Optional[int] = None
+        self.last_close: Optional[float] = None
+
+    def _elements(self, candle: List[Any]):
+        high, low, close = float(candle[2]), float(candle[3]), float(candle[4])
+        hl = _nonzero_range(high, low)
+        if self.last_close is None:
+            return (close, close), None, (hl, hl)
+        prev = self.last_close
+        diff = close - prev
+        tr = max(abs(hl), abs(high - prev), abs(prev - low))
+        return (close, close), diff, (tr, hl)
+
+    def update(self, candle: List[Any]):
+        """Compromete una vela cerrada. O(1)."""
+        ema_el, diff, atr_el = self._elements(candle)
+        self.ema.push(ema_el)
+        if diff is not None:
+            self.gain.push((max(diff, 0.0),) * 2)
+            self.loss.push((max(-diff, 0.0),) * 2)
+        self.atr.push(atr_el)
+        self.last_ts = int(candle[0])
+        self.last_close = float(candle[4])
+
+    def snapshot(self, forming: Optional[List[Any]] = None) -> Optional[Tuple[float, float, float, float]]:
+        """
+        Retorna (price, ema200, rsi14, atr14) de la ventana actual (+ vela en formación),
+        o None si no hay suficientes velas (pandas_ta no genera EMA_200 -> UNKNOWN).
+        """
+        if forming is None:
+            if self.last_close is None:
+                return None
+            price = self.last_close
+            ema, gain, loss, atr = self.ema.value(), self.gain.value(), self.loss.value(), self.atr.value()
+        else:
+            ema_el, diff, atr_el = self._elements(forming)
+            price = float(forming[4])
+            ema, atr = self.ema.peek(ema_el), self.atr.peek(atr_el)
+            if diff is None:
+                gain = loss = None
+            else:
+                gain = self.gain.peek((max(diff, 0.0),) * 2)
+                loss = self.loss.peek((max(-diff, 0.0),) * 2)
+
+        if ema is None or gain is None or loss is None or atr is None:
+            return None
+        total = gain + loss
+        rsi = 100.0 * gain / total if total != 0 else math.nan
+        return price, ema, rsi, atr
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "capacity": self.capacity,
+            "last_ts": self.last_ts,
+            "last_close": self.last_close,
+            "ema": self.ema.to_dict(),
+            "gain": self.gain.to_dict(),
+            "loss": self.loss.to_dict(),
+            "atr": self.atr.to_dict()
+        }
+
+    @staticmethod
+    def from_dict(data: Dict[str, Any]) -> "IndicatorState":
+        state = IndicatorState(int(data["capacity"]))
+        state.last_ts = data["last_ts"]
+        state.last_close = data["last_close"]
+        for name in ("ema", "gain", "loss", "atr"):
+            getattr(state, name).load_dict(data[name])
+        return state
+
+
+class IndicatorEngine:
+    """
+    REGIME-STREAM-01: Motor de Indicadores Incremental.
+    Mantiene un IndicatorState por (símbolo, timeframe), avanza O(1) por vela cerrada y
+    persiste entre ejecuciones. Reproduce la ventana del path pandas_ta (últimas 250 velas,
+    incluida la vela en formación) para producir el mismo régimen.
+    Archivo: data/indicator_state.json (caché derivada: si está corrupta se reconstruye).
+    """
+    STATE_FILE = "data/indicator_state.json"
+    VERSION = 1
+
+    def __init__(self, capacity: int = WINDOW, state_file: Optional[str] = None, load: bool = True):
+        self.capacity = capacity
+        self.state_file = state_file or self.STATE_FILE
+        self.states: Dict[str, IndicatorState] = {}
+        self.metrics = {"incremental": 0, "rebuilds": 0}
+        # load=False: el estado lo restaura el checkpoint de runtime (CHECKPOINT-01)
+        if load:
+            self._load()
+
+    def _load(self):
+        if not os.path.exists(self.state_file):
+            return
+        try:
+            with open(self.state_file, "r") as f:
+                data = json.load(f)
+            if data.get("version") != self.VERSION:
+                logger.warning(f"INDICATOR STATE VERSION MISMATCH ({data.get('version')}): se reconstruye.")
+                return
+            for key, raw in data.get("states", {}).items():
+                if int(raw["capacity"]) == self.capacity:
+                    self.states[key] = IndicatorState.from_dict(raw)
+        except Exception as e:
+            logger.error(f"INDICATOR STATE CORRUPT: {e}. Se reconstruye desde velas.")
+            self.states = {}
+
+    def save(self):
+        """Persistencia atómica (tmp + os.replace)."""
+        temp = self.state_file + ".tmp"
+        try:
+            os.makedirs(os.path.dirname(self.state_file), exist_ok=True)
+            with open(temp, "w") as f:
+                json.dump({
+                    "version": self.VERSION,
+                    "states": {k: s.to_dict() for k, s in self.states.items()}
+                }, f)
+            os.replace(temp, self.state_file)
+        except Exception as e:
+            logger.error(f"FAILED TO PERSIST INDICATOR STATE: {e}")
+
+    def snapshot(self, symbol: str, timeframe: str, ohlcv: List[List[Any]], now_ms: Optional[int] = None):
+        """Sincroniza el estado con la ventana recibida y devuelve (price, ema, rsi, atr) o None."""
+        tf_ms = TIMEFRAME_MS[timeframe]
+        now_ms = now_ms if now_ms is not None else int(time.time() * 1000)
+        closed = [c for c in ohlcv if c[0] + tf_ms <= now_ms]
+        forming = ohlcv[-1] if ohlcv and ohlcv[-1][0] + tf_ms > now_ms else None
+
+        key = f"{symbol}|{timeframe}"
+        state = self.states.get(key)
+        if state is not None and state.last_ts is not None:
+            new = [c for c in closed if c[0] > state.last_ts]
+            contiguous = (not new and closed and closed[-1][0] == state.last_ts) or \
+                         (new and new[0][0] == state.last_ts + tf_ms)
+        else:
+            new, contiguous = closed, False
+
+        if contiguous:
+            for c in new:
+                state.update(c)
+            self.metrics["incremental"] += 1
+        else:
+            # Arranque en frío o serie no contigua: reconstrucción O(ventana)
+            state = IndicatorState(self.capacity)
+            for c in closed[-self.capacity:]:
+                state.update(c)
+            self.states[key] = state
+            self.metrics["rebuilds"] += 1
+
+        return state.snapshot(forming)
+
+    def analyze(self, symbol: str, timeframe: str, ohlcv: List[List[Any]], now_ms: Optional[int] = None):
+        """Equivalente incremental de MarketRegime.analyze. Retorna (regime, volatility_pct)."""
+        try:
+            values = self.snapshot(symbol, timeframe, ohlcv, now_ms)
+            if values is None:
+                return "UNKNOWN", 0.0
+            return MarketRegime.classify(*values)
+        except Exception as e:
+            logger.error(f"REGIME STREAM ERROR {symbol} {timeframe}: {e}")
+            return "UNKNOWN", 0.0
@@ -0,0 +1,194 @@
+import os
+import json
+import math
+import time
+import threading
+import logging
+from decimal import Decimal, ROUND_DOWN
+from typing import Any, Dict, Optional
+
+from core.exchange_proxy import CachingExchange
+
+logger = logging.getLogger("TITAN-OMNI.MARKETS")
+
+# Modos de precisión de ccxt (ccxt.base.decimal_to_precision)
+DECIMAL_PLACES = 2
+SIGNIFICANT_DIGITS = 3
+TICK_SIZE = 4
+
+
+class MarketMetadataCache:
+    """
+    MARKET-META-01: Caché Persistente de Metadata de Mercados.
+    Guarda en disco los mercados ccxt (símbolos, precisión, lotes, mínimos) con formato
+    versionado. En el arranque se cargan de disco y se inyectan en el cliente ccxt
+    (set_markets), evitando la descarga completa de load_markets en cada ejecución.
+    Al expirar (MARKET_METADATA_TTL) se refresca en segundo plano sirviendo la copia vigente.
+    Lookup O(1) por símbolo para redondeo de cantidades (tickets).
+    Archivo: data/market_metadata.json
+    """
+    STATE_FILE = "data/market_metadata.json"
+    VERSION = 1
+
+    def __init__(self, exchange, state_file: Optional[str] = None, ttl: Optional[float] = None):
+        self.exchange = exchange
+        self.state_file = state_file or self.STATE_FILE
+        self.ttl = ttl if ttl is not None else float(os.getenv("MARKET_METADATA_TTL", "86400"))
+        self.markets: Dict[str, Dict[str, Any]] = {}
+        self.currencies: Dict[str, Any] = {}
+        self.precision_mode = TICK_SIZE
+        self.saved_at = 0.0
+        self.source = "none"
+        self._lock = threading.Lock()
+        self._refresh_thread: Optional[threading.Thread] = None
+        self._load()
+
+    # --- Persistencia ---
+    def _load(self):
+        if not os.path.exists(self.state_file):
+            return
+        try:
+            with open(self.state_file, "r") as f:
+                data = json.load(f)
+            if data.get("version") != self.VERSION:
+                logger.warning(f"MARKET METADATA VERSION MISMATCH ({data.get('version')} != {self.VERSION}). Se descarta.")
+                return
+            exchange_id = getattr(self.exchange, "id", None)
+            if exchange_id and data.get("exchange") not in (None, exchange_id):
+                logger.warning(f"MARKET METADATA de otro exchange ({data.get('exchange')}). Se descarta.")
+                return
+            self.markets = data["markets"]
+            self.currencies = data.get("currencies") or {}
+            self.precision_mode = int(data.get("precision_mode", TICK_SIZE))
+            self.saved_at = float(data.get("saved_at", 0))
+            self.source = "disk"
+            self._inject()
+        except Exception as e:
+            logger.error(f"MARKET METADATA CORRUPT: {e}. Se descarta.")
+            self.markets = {}
+
+    def _save(self):
+        temp = self.state_file + ".tmp"
+        try:
+            os.makedirs(os.path.dirname(self.state_file), exist_ok=True)
+            with self._lock:
+                payload = {
+                    "version": self.VERSION,
+                    "exchange": getattr(self.exchange, "id", None),
+                    "saved_at": self.saved_at,
+                    "precision_mode": self.precision_mode,
+                    "markets": self.markets,
+                    "currencies": self.currencies,
+                }
+            with open(temp, "w") as f:
+                json.dump(payload, f, default=str)
+            os.replace(temp, self.state_file)
+        except Exception as e:
+            logger.error(f"FAILED TO PERSIST MARKET METADATA: {e}")
+
+    def _inject(self):
+        """Carga los mercados cacheados en el cliente ccxt para que no llame a load_markets."""
+        set_markets = getattr(self.exchange, "set_markets", None)
+        if not callable(set_markets) or not self.markets:
+            return
+        try:
+            set_markets(self.markets, self.currencies or None)
+        except Exception as e:
+            logger.warning(f"MARKET METADATA INJECT FAILED: {e}")
+
+    # --- Refresco ---
+    def expired(self) -> bool:
+        return not self.markets or (time.time() - self.saved_at) > self.ttl
+
+    def refresh(self):
+        """Descarga completa de mercados (bypass de la caché del proxy) y persistencia."""
+        if isinstance(self.exchange, CachingExchange):
+            markets = self.exchange.bypass("load_markets", True)
+        else:
+            markets = self.exchange.load_markets(True)
+        currencies = getattr(self.exchange, "currencies", None)
+        precision_mode = getattr(self.exchange, "precisionMode", TICK_SIZE)
+        with self._lock:
+            self.markets = dict(markets or {})
+            self.currencies = dict(currencies) if isinstance(currencies, dict) else {}
+            self.precision_mode = int(precision_mode) if isinstance(precision_mode, int) else TICK_SIZE
+            self.saved_at = time.time()
+            self.source = "exchange"
+        self._save()
+        logger.info(f"MARKET METADATA: {len(self.markets)} mercados refrescados.")
+
+    def _refresh_safe(self):
+        try:
+            self.refresh()
+        except Exception as e:
+            # Se sigue sirviendo la copia vigente
+            logger.error(f"MARKET METADATA REFRESH FAILED: {e}")
+
+    def maybe_refresh(self, background: bool = True) -> bool:
+        """
+        Refresca si expiró. Sin copia local el primer refresco es síncrono;
+        con copia vigente se hace en segundo plano. Retorna True si lanzó un refresco.
+        """
+        if not self.expired():
+            return False
+        if not self.markets or not background:
+            self._refresh_safe()
+            return True
+        if self._refresh_thread is not None and self._refresh_thread.is_alive():
+            return False
+        self._refresh_thread = threading.Thread(target=self._refresh_safe, name="titan-markets-refresh", daemon=True)
+        self._refresh_thread.start()
+        return True
+
+    # --- Lookup ---
+    def get_markets(self) -> Dict[str, Dict[str, Any]]:
+        """Mercados completos (formato ccxt) para el escáner de universo."""
+        if not self.markets:
+            self.maybe_refresh(background=False)
+        return self.markets
+
+    def market(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """Lookup O(1) de un mercado."""
+        if not self.markets:
+            self.maybe_refresh(background=False)
+        return self.markets.get(symbol)
+
+    def round_amount(self, symbol: str, amount: float) -> float:
+        """
+        Redondea HACIA ABAJO la cantidad a la precisión del mercado (nunca excede el capital).
+        Sin metadata del símbolo -> se devuelve sin cambios (el exchange valida).
+        """
+        market = self.market(symbol)
+        precision = ((market or {}).get("precision") or {}).get("amount")
+        if precision is None or amount is None or not math.isfinite(amount) or amount <= 0:
+            return amount
+        value = Decimal(str(amount))
+        if self.precision_mode == TICK_SIZE:
+            step = Decimal(str(precision))
+            if step <= 0:
+                return amount
+            return float((value / step).to_integral_value(rounding=ROUND_DOWN) * step)
+        if self.precision_mode == SIGNIFICANT_DIGITS:
+            digits = int(precision)
+            exponent = value.adjusted() - digits + 1
+            return float(value.quantize(Decimal(1).scaleb(exponent), rounding=ROUND_DOWN))
+        return float(value.quantize(Decimal(1).scaleb(-int(precision)), rounding=ROUND_DOWN))
+
+    def check_limits(self, symbol: str, amount: float, price: float):
+        """
+        Valida lote y nocional mínimos (tras round_amount). Retorna (ok, reason).
+        Cantidad nula o negativa -> rechazo. Sin metadata del símbolo -> ok (el exchange valida, como round_amount).
+        """
+        if amount is None or not math.isfinite(amount) or amount <= 0:
+            return False, f"NON_POSITIVE_AMOUNT ({amount})"
+        market = self.market(symbol)
+        if market is None:
+            return True, "MARKET_METADATA_MISSING"
+        limits = market.get("limits") or {}
+        min_amount = (limits.get("amount") or {}).get("min")
+        min_cost = (limits.get("cost") or {}).get("min")
+        if min_amount is not None and amount < min_amount:
+            return False, f"BELOW_MIN_AMOUNT ({amount} < {min_amount})"
+        if min_cost is not None and amount * price < min_cost:
+            return False, f"BELOW_MIN_NOTIONAL ({amount * price:.8f} < {min_cost})"
+        return True, "OK"
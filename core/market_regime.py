@@ -1,5 +1,4 @@
-import pandas_ta as ta
-import pandas as pd
+import numpy as np
 import logging
 
 logger = logging.getLogger("TITAN-OMNI.REGIME")
@@ -12,8 +11,11 @@ class MarketRegime:
     @staticmethod
     def analyze(df):
         """
-        Analiza un DataFrame de OHLCV y determina el r\u00e9gimen.
+        Analiza un DataFrame de OHLCV y determina el r\u00e9gimen (path legacy pandas_ta).
         """
+        # REGIME-LITE-01: pandas_ta solo se importa si se usa este path (registra df.ta)
+        import pandas_ta as ta
+
         try:
             # Asumimos que DF ya tiene indicadores o los calculamos
             if 'EMA_200' not in df.columns:
@@ -24,32 +26,123 @@ class MarketRegime:
                 df.ta.atr(length=14, append=True)
                 
             last = df.iloc[-1]
-            price = last['close']
-            ema200 = last['EMA_200']
-            rsi = last['RSI_14']
-            atr = last['ATRr_14']
-            
-            regime = "SIDEWAYS"
+            return MarketRegime.classify(last['close'], last['EMA_200'], last['RSI_14'], last['ATRr_14'])
             
-            # L\u00f3gica b\u00e1sica v6.0
-            if price > ema200:
-                if rsi > 50:
-                    regime = "BULL_TREND"
-                else:
-                    regime = "BULL_WEAK"
+        except Exception as e:
+            logger.error(f"REGIME ERROR: {e}")
+            return "UNKNOWN", 0.0
+
+    @staticmethod
+    def analyze_ohlcv(ohlcv):
+        """
+        REGIME-LITE-01: Path liviano sin pandas. Lista de velas ccxt -> arrays NumPy -> r\u00e9gimen.
+        Mismo resultado que analyze(DataFrame) con pandas_ta (ver parity_check).
+        """
+        if not ohlcv:
+            return "UNKNOWN", 0.0
+        regimes, volatility = MarketRegime.analyze_batch([ohlcv])
+        if not regimes:
+            return "UNKNOWN", 0.0
+        return regimes[0], float(volatility[0])
+
+    @staticmethod
+    def parity_check(ohlcv):
+        """
+        Compara el path NumPy contra el path pandas_ta sobre la misma ventana.
+        Diagn\u00f3stico: importa pandas/pandas_ta. Retorna {ok, numpy, pandas_ta}.
+        """
+        import pandas as pd
+
+        lite = MarketRegime.analyze_ohlcv(ohlcv)
+        df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+        legacy = MarketRegime.analyze(df)
+        ok = lite[0] == legacy[0] and abs(lite[1] - float(legacy[1])) <= 1e-9 * max(abs(float(legacy[1])), 1.0)
+        return {"ok": ok, "numpy": lite, "pandas_ta": legacy}
+
+    @staticmethod
+    def classify(price, ema200, rsi, atr):
+        """
+        Reglas de r\u00e9gimen v6.0 sobre los valores de la \u00faltima vela.
+        Compartido por todos los motores de indicadores (pandas_ta, incremental).
+        """
+        regime = "SIDEWAYS"
+        
+        # L\u00f3gica b\u00e1sica v6.0
+        if price > ema200:
+            if rsi > 50:
+                regime = "BULL_TREND"
+            else:
+                regime = "BULL_WEAK"
+        else:
+            if rsi < 50:
+                regime = "BEAR_TREND"
             else:
-                if rsi < 50:
-                    regime = "BEAR_TREND"
-                else:
-                    regime = "BEAR_WEAK"
-                    
-            # Check de Volatilidad
-            volatility_pct = (atr / price) * 100
-            if volatility_pct > 2.0: # > 2% ATR es vol\u00e1til para 15m
-                regime += "_VOLATILE"
+                regime = "BEAR_WEAK"
                 
-            return regime, volatility_pct
+        # Check de Volatilidad
+        volatility_pct = (atr / price) * 100
+        if volatility_pct > 2.0: # > 2% ATR es vol\u00e1til para 15m
+            regime += "_VOLATILE"
             
+        return regime, volatility_pct
+
+    @staticmethod
+    def analyze_batch(ohlcv):
+        """
+        REGIME-BATCH-01: R\u00e9gimen de muchos activos en una sola pasada vectorizada.
+        ohlcv: array (activos x velas x columnas), columnas ccxt [ts, o, h, l, c, v] u OHLCV.
+        Todas las filas deben tener la misma cantidad de velas (ver analyze_many).
+        Retorna (regimes: list[str], volatility_pct: np.ndarray).
+        """
+        from core.indicators import batch_indicators, EMA_LENGTH
+
+        arr = np.asarray(ohlcv, dtype=np.float64)
+        if arr.ndim != 3 or arr.shape[0] == 0:
+            return [], np.zeros(0)
+        assets = arr.shape[0]
+        # Igual que pandas_ta: sin EMA_200 no hay r\u00e9gimen
+        if arr.shape[1] < EMA_LENGTH:
+            return ["UNKNOWN"] * assets, np.zeros(assets)
+
+        try:
+            price, ema200, rsi, atr = batch_indicators(arr)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                volatility_pct = (atr / price) * 100
+
+            regimes = np.where(
+                price > ema200,
+                np.where(rsi > 50, "BULL_TREND", "BULL_WEAK"),
+                np.where(rsi < 50, "BEAR_TREND", "BEAR_WEAK")
+            ).astype(object)
+            regimes = np.where(volatility_pct > 2.0, regimes + "_VOLATILE", regimes)
+
+            # Precio cero -> el path escalar lanza ZeroDivisionError -> UNKNOWN
+            invalid = price == 0
+            regimes[invalid] = "UNKNOWN"
+            volatility_pct = np.where(invalid, 0.0, volatility_pct)
+            return list(regimes), volatility_pct
         except Exception as e:
-            logger.error(f"REGIME ERROR: {e}")
-            return "UNKNOWN", 0.0
+            logger.error(f"REGIME BATCH ERROR: {e}")
+            return ["UNKNOWN"] * assets, np.zeros(assets)
+
+    @staticmethod
+    def analyze_many(series):
+        """
+        Variante de analyze_batch para listas ccxt de largo variable.
+        series: dict {key: ohlcv_list}. Agrupa por cantidad de velas y resuelve cada grupo
+        en una sola pasada. Retorna {key: (regime, volatility_pct)}.
+        """
+        groups = {}
+        for key, ohlcv in series.items():
+            groups.setdefault(len(ohlcv) if ohlcv else 0, []).append(key)
+
+        results = {}
+        for length, keys in groups.items():
+            if length == 0:
+                for key in keys:
+                    results[key] = ("UNKNOWN", 0.0)
+                continue
+            regimes, vols = MarketRegime.analyze_batch([series[k] for k in keys])
+            for key, regime, vol in zip(keys, regimes, vols):
+                results[key] = (regime, float(vol))
+        return results
@@ -0,0 +1,142 @@
+import os
+import sys
+import logging
+import tracemalloc
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import resource # Unix
+except ImportError:
+    resource = None
+
+logger = logging.getLogger("TITAN-OMNI.MEMORY")
+
+MB = 1024 * 1024
+
+
+def rss_bytes() -> Optional[int]:
+    """RSS actual del proceso (/proc/self/statm). None si no hay /proc."""
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def peak_rss_bytes() -> Optional[int]:
+    """Pico de RSS (VmHWM de /proc; sin /proc, ru_maxrss de getrusage)."""
+    try:
+        with open("/proc/self/status", "rb") as f:
+            for line in f:
+                if line.startswith(b"VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    if resource is not None:
+        # ru_maxrss: KB en Linux, bytes en macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+    return None
+
+
+def reset_peak_rss() -> bool:
+    """Reinicia VmHWM (Linux >= 4.0, escribir 5 en clear_refs): pico por ciclo en vez de por proceso."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+class MemoryTelemetry:
+    """
+    MEM-TELEMETRY-01: Telemetría de Memoria por Ciclo (Linux nativo).
+    Sustituye a scripts/sanity_ram.py (ctypes.windll, solo Windows).
+    begin_cycle() fija la base (RSS y pico por ciclo vía clear_refs); mark(etapa) registra el
+    RSS al terminar cada etapa (scan, acquire, decide...) y, con MEMORY_TRACEMALLOC=true,
+    los MEMORY_TRACEMALLOC_TOP mayores asignadores (archivo:línea) de esa etapa.
+    facts() va a cada registro de auditoría. Presupuesto MEMORY_BUDGET_MB (0 = sin límite):
+    superado -> over_budget() True y la caza no abre posiciones (SKIP_MEMORY, fail-closed).
+    """
+    def __init__(self, budget_mb: Optional[float] = None, trace_allocations: Optional[bool] = None, top: Optional[int] = None):
+        self.budget_mb = budget_mb if budget_mb is not None else float(os.getenv("MEMORY_BUDGET_MB", "0"))
+        self.trace_allocations = trace_allocations if trace_allocations is not None else os.getenv("MEMORY_TRACEMALLOC", "false").lower() == "true"
+        self.top = top if top is not None else int(os.getenv("MEMORY_TRACEMALLOC_TOP", "5"))
+        self.cycle_peak = False
+        self.start_rss: Optional[int] = None
+        self.last_rss: Optional[int] = None
+        self.stages: Dict[str, int] = {}
+        self.allocators: Dict[str, List[Tuple[str, int]]] = {}
+        self._snapshot = None
+
+    def begin_cycle(self):
+        self.cycle_peak = reset_peak_rss()
+        self.start_rss = self.last_rss = rss_bytes()
+        self.stages = {}
+        self.allocators = {}
+        if self.trace_allocations:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            self._snapshot = self._take_snapshot()
+
+    @staticmethod
+    def _take_snapshot():
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+        ))
+
+    def mark(self, stage: str):
+        """Cierra una etapa: delta de RSS desde la marca anterior (+ top asignadores con tracemalloc)."""
+        rss = rss_bytes()
+        if rss is not None and self.last_rss is not None:
+            self.stages[stage] = rss - self.last_rss
+        self.last_rss = rss
+        if self.trace_allocations and self._snapshot is not None:
+            snapshot = self._take_snapshot()
+            diff = snapshot.compare_to(self._snapshot, "lineno")
+            self.allocators[stage] = [
+                (f"{os.path.basename(s.traceback[0].filename)}:{s.traceback[0].lineno}", s.size_diff)
+                for s in diff[:self.top] if s.size_diff > 0
+            ]
+            self._snapshot = snapshot
+
+    def over_budget(self) -> bool:
+        if self.budget_mb <= 0:
+            return False
+        rss = rss_bytes()
+        if rss is None:
+            # FAIL-CLOSED: con presupuesto configurado, memoria no medible = fuera de presupuesto
+            return True
+        if rss > self.budget_mb * MB:
+            logger.warning(f"MEMORY BUDGET EXCEEDED: rss={rss / MB:.1f} MB > {self.budget_mb:.0f} MB")
+            return True
+        return False
+
+    def facts(self) -> List[str]:
+        rss = rss_bytes()
+        peak = peak_rss_bytes()
+        facts = [
+            f"mem_rss_mb={rss / MB:.1f}" if rss is not None else "mem_rss_mb=unavailable",
+            f"mem_peak_rss_mb={peak / MB:.1f}" if peak is not None else "mem_peak_rss_mb=unavailable",
+            f"mem_peak_scope={'cycle' if self.cycle_peak else 'process'}",
+        ]
+        if self.budget_mb > 0:
+            facts.append(f"mem_budget_mb={self.budget_mb:.0f}")
+        for stage, delta in self.stages.items():
+            facts.append(f"mem_{stage}_delta_mb={delta / MB:+.1f}")
+        for stage, allocators in self.allocators.items():
+            for location, size in allocators:
+                facts.append(f"mem_{stage}_alloc={location}|+{size / 1024:.0f}KB")
+        return facts
+
+    def summary(self) -> Dict[str, float]:
+        rss = rss_bytes()
+        peak = peak_rss_bytes()
+        return {
+            "rss_mb": round(rss / MB, 1) if rss is not None else None,
+            "peak_rss_mb": round(peak / MB, 1) if peak is not None else None,
+            "cycle_delta_mb": round((rss - self.start_rss) / MB, 1) if rss is not None and self.start_rss is not None else None,
+            "stages_mb": {stage: round(delta / MB, 1) for stage, delta in self.stages.items()},
+        }
@@ -0,0 +1,323 @@
+import os
+import json
+import itertools
+import time
+import atexit
+import random
+import threading
+import logging
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+logger = logging.getLogger("TITAN-OMNI.OUTBOX")
+
+# Claves naturales por tabla (on_conflict del upsert): el reenvío de una fila ya aplicada es un no-op
+NATURAL_KEYS = {
+    "execution_logs": ("cycle_id",),
+    "paper_wallet": ("cycle_id", "symbol"),
+    "audit_trail": ("cycle_id", "symbol", "action", "timestamp"),
+}
+
+
+class _Entry:
+    __slots__ = ("table", "row", "segment", "enqueued_at", "attempts", "first_failure")
+
+    def __init__(self, table: str, row: Dict[str, Any], segment: int, enqueued_at: float):
+        self.table = table
+        self.row = row
+        self.segment = segment
+        self.enqueued_at = enqueued_at
+        self.attempts = 0
+        self.first_failure: Optional[float] = None
+
+
+class SupabaseOutbox:
+    """
+    OUTBOX-01: Outbox Durable de Escrituras a Supabase.
+    enqueue() añade la fila al spool en disco (OUTBOX_DIR/spool-NNNNNN.jsonl, fsync con
+    OUTBOX_FSYNC) y retorna; un hilo la envía en upserts por lote y por tabla
+    (OUTBOX_BATCH_MAX filas) con on_conflict = clave natural (NATURAL_KEYS) e
+    ignore_duplicates: reenviar tras un crash o una respuesta perdida es idempotente
+    (índices únicos en db/migrations/002_outbox_natural_keys.sql).
+    Fallos: backoff exponencial con jitter por tabla (OUTBOX_RETRY_BASE_S .. OUTBOX_RETRY_MAX_S)
+    y lote reducido a la mitad hasta aislar la fila rechazada, que se queda en cabeza: el orden
+    por tabla de la cola es siempre el de encolado (lectura de lo propio: pending_rows()[-1]).
+    Una fila que falla sola OUTBOX_MAX_ATTEMPTS veces mientras otras filas de su tabla sí entran
+    (si hace falta, la siguiente se envía sola como sonda) se aparta a dead_letter.jsonl.
+    Un segmento del spool (OUTBOX_SEGMENT_ROWS filas) se borra cuando todas sus filas están
+    confirmadas; al arrancar, los segmentos presentes se reenvían. shutdown() drena hasta
+    OUTBOX_DRAIN_S; metrics() (backlog, antigüedad, fallos, retardo por tabla) se loguea como OUTBOX:.
+    """
+    SPOOL_DIR = "data/outbox"
+
+    def __init__(self, client: Any, spool_dir: Optional[str] = None, batch_max: Optional[int] = None,
+                 segment_rows: Optional[int] = None, retry_base_s: Optional[float] = None,
+                 retry_max_s: Optional[float] = None, max_attempts: Optional[int] = None,
+                 fsync: Optional[bool] = None, autostart: bool = True):
+        self.client = client
+        self.spool_dir = spool_dir or os.getenv("OUTBOX_DIR", self.SPOOL_DIR)
+        self.batch_max = batch_max or int(os.getenv("OUTBOX_BATCH_MAX", "200"))
+        self.segment_rows = segment_rows or int(os.getenv("OUTBOX_SEGMENT_ROWS", "500"))
+        self.retry_base_s = retry_base_s if retry_base_s is not None else float(os.getenv("OUTBOX_RETRY_BASE_S", "1"))
+        self.retry_max_s = retry_max_s if retry_max_s is not None else float(os.getenv("OUTBOX_RETRY_MAX_S", "60"))
+        self.max_attempts = max_attempts or int(os.getenv("OUTBOX_MAX_ATTEMPTS", "10"))
+        self.fsync = fsync if fsync is not None else os.getenv("OUTBOX_FSYNC", "true").lower() == "true"
+        self._cond = threading.Condition()
+        # Un único envío en curso: el lote enviado es siempre la cabeza de la cola de su tabla
+        self._ship_lock = threading.Lock()
+        self._queues: Dict[str, Deque[_Entry]] = {}
+        # Por tabla: fallos consecutivos, próximo intento, tamaño de lote actual, último éxito
+        self._tables: Dict[str, Dict[str, float]] = {}
+        # Filas pendientes por segmento del spool (el segmento se borra al llegar a 0)
+        self._segments: Dict[int, int] = {}
+        self._segment = 0
+        self._segment_count = 0
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        self.stats = {"enqueued": 0, "shipped": 0, "batches": 0, "failures": 0, "dead_letters": 0,
+                      "replayed": 0, "last_error": None}
+        os.makedirs(self.spool_dir, exist_ok=True)
+        self._replay()
+        if autostart:
+            self.start()
+        atexit.register(self.close)
+
+    # --- Spool ---
+    def _segment_path(self, seq: int) -> str:
+        return os.path.join(self.spool_dir, f"spool-{seq:06d}.jsonl")
+
+    def _replay(self):
+        """Filas de segmentos de ejecuciones anteriores (sin confirmar o confirmadas sin borrar: upsert idempotente)."""
+        segments = sorted(int(n[6:12]) for n in os.listdir(self.spool_dir) if n.startswith("spool-") and n.endswith(".jsonl"))
+        for seq in segments:
+            count = 0
+            with open(self._segment_path(seq), "rb") as f:
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break # escritura truncada por un crash: la fila nunca se confirmó al llamador
+                    try:
+                        item = json.loads(line)
+                    except ValueError:
+                        logger.error(f"OUTBOX SPOOL CORRUPT: {self._segment_path(seq)}")
+                        continue
+                    self._queues.setdefault(item["table"], deque()).append(_Entry(item["table"], item["row"], seq, item["ts"]))
+                    count += 1
+            if count:
+                self._segments[seq] = count
+                self.stats["replayed"] += count
+            else:
+                os.remove(self._segment_path(seq))
+        # Los segmentos anteriores quedan sellados: las filas nuevas van a uno nuevo
+        self._segment = (segments[-1] + 1) if segments else 1
+        if self.stats["replayed"]:
+            logger.warning(f"OUTBOX REPLAY: {self.stats['replayed']} filas pendientes de {len(self._segments)} segmentos")
+
+    def enqueue(self, table: str, row: Dict[str, Any]):
+        self.enqueue_many(table, [row])
+
+    def enqueue_many(self, table: str, rows: List[Dict[str, Any]]):
+        """Persiste las filas en el spool (una escritura) y las deja a cargo del hilo de envío."""
+        if not rows:
+            return
+        now = time.time()
+        with self._cond:
+            if self._segment_count >= self.segment_rows:
+                self._seal()
+            data = "".join(json.dumps({"table": table, "row": row, "ts": now}, default=str) + "\n" for row in rows)
+            with open(self._segment_path(self._segment), "a", encoding="utf-8") as f:
+                f.write(data)
+                if self.fsync:
+                    f.flush()
+                    os.fsync(f.fileno())
+            queue = self._queues.setdefault(table, deque())
+            for row in rows:
+                queue.append(_Entry(table, row, self._segment, now))
+            self._segments[self._segment] = self._segments.get(self._segment, 0) + len(rows)
+            self._segment_count += len(rows)
+            self.stats["enqueued"] += len(rows)
+            self._cond.notify()
+
+    def _seal(self):
+        sealed = self._segment
+        self._segment += 1
+        self._segment_count = 0
+        self._release(sealed)
+
+    def _release(self, seq: int):
+        """Borra el segmento sin filas pendientes (el activo se recrea en la siguiente escritura)."""
+        if self._segments.get(seq, 0) == 0:
+            self._segments.pop(seq, None)
+            if seq == self._segment:
+                self._segment_count = 0
+            try:
+                os.remove(self._segment_path(seq))
+            except FileNotFoundError:
+                pass
+
+    def _ack(self, entries: List[_Entry]):
+        for entry in entries:
+            self._segments[entry.segment] -= 1
+        for seq in {entry.segment for entry in entries}:
+            self._release(seq)
+
+    # --- Envío ---
+    def start(self):
+        with self._cond:
+            if self._thread is None and not self._closed:
+                self._thread = threading.Thread(target=self._worker, name="supabase-outbox", daemon=True)
+                self._thread.start()
+
+    def _state(self, table: str) -> Dict[str, float]:
+        return self._tables.setdefault(table, {"failures": 0, "next_at": 0.0, "batch": self.batch_max, "last_success": 0.0})
+
+    def _next_batch(self, now: float) -> Optional[Tuple[str, List[_Entry]]]:
+        for table, queue in self._queues.items():
+            state = self._state(table)
+            if queue and state["next_at"] <= now:
+                head = queue[0]
+                if head.attempts >= self.max_attempts and state["last_success"] <= head.first_failure:
+                    # Sonda: ¿rechazo de la fila de cabeza o caída del servicio?
+                    probe = next((e for e in itertools.islice(queue, 1, None) if e.attempts < self.max_attempts), None)
+                    if probe is not None:
+                        return table, [probe]
+                return table, [queue[i] for i in range(min(int(state["batch"]), len(queue)))]
+        return None
+
+    def _send(self, table: str, rows: List[Dict[str, Any]]):
+        keys = NATURAL_KEYS.get(table)
+        if keys:
+            self.client.table(table).upsert(rows, on_conflict=",".join(keys), ignore_duplicates=True).execute()
+        else:
+            self.client.table(table).insert(rows).execute()
+
+    def ship_once(self) -> int:
+        """Envía un lote de la primera tabla disponible. Retorna filas confirmadas (0 = nada listo o fallo)."""
+        with self._ship_lock:
+            return self._ship()
+
+    def _ship(self) -> int:
+        with self._cond:
+            batch = self._next_batch(time.time())
+        if batch is None:
+            return 0
+        table, entries = batch
+        try:
+            self._send(table, [entry.row for entry in entries])
+        except Exception as e:
+            self._on_failure(table, entries, e)
+            return 0
+        with self._cond:
+            queue = self._queues[table]
+            if entries[0] is queue[0]:
+                for _ in entries:
+                    queue.popleft()
+            else:
+                queue.remove(entries[0]) # sonda: la cabeza sigue pendiente en su sitio
+            self._ack(entries)
+            state = self._state(table)
+            state.update(failures=0, next_at=0.0, last_success=time.time(), batch=min(self.batch_max, state["batch"] * 2))
+            self.stats["shipped"] += len(entries)
+            self.stats["batches"] += 1
+        return len(entries)
+
+    def _on_failure(self, table: str, entries: List[_Entry], error: Exception):
+        now = time.time()
+        with self._cond:
+            state = self._state(table)
+            state["failures"] += 1
+            delay = min(self.retry_max_s, self.retry_base_s * 2 ** (state["failures"] - 1))
+            state["next_at"] = now + delay * (0.5 + random.random() / 2)
+            state["batch"] = max(1, int(state["batch"]) // 2)
+            self.stats["failures"] += 1
+            self.stats["last_error"] = f"{table}: {error}"
+            for entry in entries:
+                entry.first_failure = entry.first_failure or now
+            # Intentos = fallos con la fila aislada (un lote fallido no señala a ninguna fila)
+            entry = entries[0]
+            if len(entries) == 1:
+                entry.attempts += 1
+            queue = self._queues[table]
+            if len(entries) == 1 and entry is queue[0] \
+                    and entry.attempts >= self.max_attempts and state["last_success"] > entry.first_failure:
+                # Rechazo de la fila (no caída del servicio): otras filas de la tabla sí entraron
+                queue.popleft()
+                self._dead_letter(entry, error)
+                self._ack([entry])
+        logger.error(f"OUTBOX SEND FAILED ({table}, {len(entries)} filas, reintento en {state['next_at'] - now:.1f} s): {error}")
+
+    def _dead_letter(self, entry: _Entry, error: Exception):
+        self.stats["dead_letters"] += 1
+        item = {"table": entry.table, "row": entry.row, "ts": entry.enqueued_at, "attempts": entry.attempts, "error": str(error)}
+        with open(os.path.join(self.spool_dir, "dead_letter.jsonl"), "a", encoding="utf-8") as f:
+            f.write(json.dumps(item, default=str) + "\n")
+        logger.critical(f"OUTBOX DEAD LETTER ({entry.table}): {error}")
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                if self._closed:
+                    return
+                now = time.time()
+                if self._next_batch(now) is None:
+                    due = [self._state(t)["next_at"] for t, q in self._queues.items() if q]
+                    self._cond.wait(max(0.05, min(due) - now) if due else None)
+                    continue
+            self.ship_once()
+
+    def drain(self, timeout_s: Optional[float] = None) -> bool:
+        """Envío síncrono hasta vaciar la cola o agotar `timeout_s` (esperando backoffs). True = vacía."""
+        deadline = time.time() + (timeout_s if timeout_s is not None else float(os.getenv("OUTBOX_DRAIN_S", "5")))
+        while self.backlog() and time.time() < deadline:
+            if not self.ship_once():
+                with self._cond:
+                    due = [self._state(t)["next_at"] for t, q in self._queues.items() if q]
+                wait = min(due) - time.time() if due else 0
+                time.sleep(min(max(wait, 0.01), max(0.0, deadline - time.time())))
+        return self.backlog() == 0
+
+    def close(self):
+        """Apagado: detiene el hilo e intenta vaciar la cola; lo que quede sigue en el spool (siguiente arranque)."""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=5.0)
+        if self.backlog() and not self.drain():
+            logger.warning(f"OUTBOX: {self.backlog()} filas quedan en el spool ({self.spool_dir}) para el próximo arranque")
+
+    # --- Lecturas / métricas ---
+    def backlog(self) -> int:
+        with self._cond:
+            return sum(len(q) for q in self._queues.values())
+
+    def pending_rows(self, table: str) -> List[Dict[str, Any]]:
+        """Filas aún no confirmadas de `table` (lectura de las propias escrituras)."""
+        with self._cond:
+            return [entry.row for entry in self._queues.get(table, ())]
+
+    def metrics(self) -> Dict[str, Any]:
+        now = time.time()
+        with self._cond:
+            oldest = min((q[0].enqueued_at for q in self._queues.values() if q), default=None)
+            tables = {t: {"backlog": len(q), "failures": int(self._state(t)["failures"]),
+                          "retry_in_s": round(max(0.0, self._state(t)["next_at"] - now), 2)}
+                      for t, q in self._queues.items()}
+            spool_bytes = sum(os.path.getsize(self._segment_path(s)) for s in self._segments if os.path.exists(self._segment_path(s)))
+            return dict(self.stats, backlog=sum(len(q) for q in self._queues.values()),
+                        oldest_age_s=round(now - oldest, 2) if oldest is not None else 0.0,
+                        spool_segments=len(self._segments), spool_bytes=spool_bytes, tables=tables)
+
+
+_OUTBOXES: Dict[str, SupabaseOutbox] = {}
+_OUTBOXES_LOCK = threading.Lock()
+
+
+def outbox(client: Any, spool_dir: Optional[str] = None) -> SupabaseOutbox:
+    """Outbox del proceso por directorio de spool (un único consumidor por spool)."""
+    key = os.path.abspath(spool_dir or os.getenv("OUTBOX_DIR", SupabaseOutbox.SPOOL_DIR))
+    with _OUTBOXES_LOCK:
+        if key not in _OUTBOXES:
+            _OUTBOXES[key] = SupabaseOutbox(client, spool_dir=key)
+        return _OUTBOXES[key]
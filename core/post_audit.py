@@ -1,11 +1,13 @@
 import json
 import os
 import logging
-import hashlib
 from dataclasses import dataclass, asdict, field
 from datetime import datetime, timezone
 from typing import List, Optional, Dict, Any
 
+from core.audit_log import audit_log
+from core.tracer import count, span
+
 # Configuración de Logging para Forense (separado si es necesario, pero usaremos stderr/stdout seguro)
 logger = logging.getLogger("TITAN-OMNI.AUDIT")
 
@@ -71,18 +73,20 @@ def build_audit_record(
         errors=errors
     )
 
+def index_keys(record: AuditRecord) -> Dict[str, Any]:
+    """AUDIT-SEGMENTS-01: Campos del registro que entran en el índice del segmento."""
+    return {"timestamp": record.timestamp, "cycle_id": record.cycle_id, "symbol": record.symbol, "action": record.action}
+
 def write_local_audit(record: AuditRecord, base_path: str = "data/forensics"):
     """
     Escribe el registro en archivo local (Append-Only).
     Fail-Closed: Si falla, loguea a stderr y continua.
     """
     try:
-        # Asegurar directorio
-        os.makedirs(base_path, exist_ok=True)
-        file_path = os.path.join(base_path, "audit_log.jsonl")
-        
-        with open(file_path, "a", encoding="utf-8") as f:
-            f.write(record.to_json() + "\n")
+        # AUDIT-SEGMENTS-01: Segmento activo audit_log.jsonl + índice lateral (cycle_id/symbol/action/timestamp)
+        line = record.to_json() + "\n"
+        file_path = audit_log(base_path).append(line, index_keys(record))
+        count("bytes_written", len(line.encode("utf-8")))
             
         return file_path
     except Exception as e:
@@ -117,6 +121,20 @@ def save_ohlcv_snapshot(
     DATA-ORIGIN-02: Persistencia local de snapshot OHLCV.
     Retorna {path, hash} o {None, None} si falla.
     """
+    # TRACE-01: Span de escritura de snapshot (tiempo + bytes)
+    with span("snapshot", symbol=symbol, timeframe=timeframe):
+        return _save_ohlcv_snapshot(cycle_id, state, symbol, timeframe, limit, ohlcv)
+
+
+def _save_ohlcv_snapshot(
+    cycle_id: str,
+    state: str,
+    symbol: str,
+    timeframe: str,
+    limit: int,
+    ohlcv: List[List[Any]]
+) -> Dict[str, Optional[str]]:
+    """DATA-ORIGIN-02: Cuerpo de save_ohlcv_snapshot (sin el span de traza)."""
     try:
         # 1. Sanitizar símbolo para path
         symbol_sanitized = symbol.replace("/", "_").replace("\\", "_")
@@ -134,8 +152,10 @@ def save_ohlcv_snapshot(
         }
         
         # 3. Calcular Hash (Canonical JSON)
-        json_bytes = json.dumps(snapshot_data, sort_keys=True).encode('utf-8')
-        snapshot_hash = hashlib.sha256(json_bytes).hexdigest()
+        # SNAPSHOT-BIN-01: Una sola pasada; los fragmentos de vela se reutilizan para los chunks
+        from core.snapshot_format import candle_fragments, stream_hash
+        fragments = candle_fragments(ohlcv)
+        snapshot_hash = stream_hash(snapshot_data, fragments)
         snapshot_data["snapshot_hash"] = snapshot_hash
         
         # 4. Definir ruta
@@ -145,9 +165,22 @@ def save_ohlcv_snapshot(
         file_path = os.path.join(base_dir, filename)
         
         # 5. Escribir archivo
-        with open(file_path, "w", encoding="utf-8") as f:
-            json.dump(snapshot_data, f, indent=2)
-            
+        # SNAPSHOT-CAS-01: Manifiesto + chunks deduplicados (SNAPSHOT_STORE=json -> archivo legacy completo)
+        chunked = os.getenv("SNAPSHOT_STORE", "chunked").lower() == "chunked"
+        if chunked:
+            from core.snapshot_format import SnapshotFormatError
+            from core.snapshot_store import SNAPSHOTS
+            try:
+                SNAPSHOTS.save(snapshot_data, file_path, fragments)
+            except SnapshotFormatError as e:
+                # Vela no representable en binario (tipo/rango): se conserva el JSON legacy completo
+                logger.warning(f"SNAPSHOT BINARY FALLBACK ({symbol}): {e}")
+                chunked = False
+        if not chunked:
+            with open(file_path, "w", encoding="utf-8") as f:
+                json.dump(snapshot_data, f, indent=2)
+                count("bytes_written", f.tell())
+        
         return {"path": file_path, "hash": snapshot_hash}
         
     except Exception as e:
@@ -0,0 +1,47 @@
+import os
+import logging
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Any, Callable, Dict, Hashable, Optional
+
+logger = logging.getLogger("TITAN-OMNI.PREFETCH")
+
+
+class DataPrefetcher:
+    """
+    PIPE-CONC-01: Adquisición Concurrente Acotada.
+    Lanza trabajos de descarga por clave en un pool de hilos acotado (PREFETCH_WORKERS).
+    El consumidor los recoge en su propio orden (score desc) con result(), que solo
+    bloquea si ese trabajo aún no terminó. Las decisiones siguen siendo secuenciales.
+    Los hilos comparten el cliente ccxt: su throttle lo hace el VenueRateLimiter del venue
+    (thread-safe), no el de ccxt.
+    """
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers or int(os.getenv("PREFETCH_WORKERS", "4"))
+        self.executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="titan-prefetch")
+        self.futures: Dict[Hashable, Future] = {}
+
+    def submit(self, key: Hashable, fn: Callable[..., Any], *args, **kwargs) -> Future:
+        future = self.executor.submit(fn, *args, **kwargs)
+        self.futures[key] = future
+        return future
+
+    def has(self, key: Hashable) -> bool:
+        return key in self.futures
+
+    def result(self, key: Hashable, timeout: Optional[float] = None) -> Any:
+        """Resultado del trabajo `key`. Re-lanza la excepción del trabajo si falló."""
+        return self.futures[key].result(timeout=timeout)
+
+    def shutdown(self, wait: bool = True):
+        """
+        Cancela trabajos no iniciados (ej. tras un break fail-closed) y libera el pool.
+        wait=False (deadline agotado): no bloquea el ciclo esperando descargas en curso.
+        """
+        self.executor.shutdown(wait=wait, cancel_futures=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.shutdown()
+        return False
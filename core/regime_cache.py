@@ -0,0 +1,126 @@
+import os
+import json
+import time
+import threading
+import logging
+from collections import OrderedDict
+from typing import Callable, List, Any, Optional, Tuple
+
+from core.candle_store import TIMEFRAME_MS
+
+logger = logging.getLogger("TITAN-OMNI.REGIME_CACHE")
+
+
+class RegimeCache:
+    """
+    REGIME-CACHE-01: Memoización Persistente de Régimen.
+    Clave: (símbolo, timeframe, timestamp de la última vela CERRADA).
+    El régimen cacheado se evalúa solo sobre velas cerradas (régimen confirmado), por lo que
+    no puede cambiar hasta que cierre la siguiente vela de ese timeframe.
+    Tamaño acotado con desalojo LRU. Archivo: data/regime_cache.json (caché derivada).
+    """
+    STATE_FILE = "data/regime_cache.json"
+    VERSION = 1
+
+    def __init__(self, max_size: Optional[int] = None, state_file: Optional[str] = None, load: bool = True):
+        self.max_size = max_size or int(os.getenv("REGIME_CACHE_SIZE", "2048"))
+        self.state_file = state_file or self.STATE_FILE
+        self.entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        if load:
+            self._load()
+
+    @staticmethod
+    def key(symbol: str, timeframe: str, last_closed_ts: int) -> str:
+        return f"{symbol}|{timeframe}|{int(last_closed_ts)}"
+
+    def _load(self):
+        if not os.path.exists(self.state_file):
+            return
+        try:
+            with open(self.state_file, "r") as f:
+                data = json.load(f)
+            if data.get("version") != self.VERSION:
+                return
+            for k, v in data.get("entries", []):
+                self.entries[k] = (v[0], float(v[1]))
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+        except Exception as e:
+            logger.error(f"REGIME CACHE CORRUPT: {e}. Se descarta.")
+            self.entries = OrderedDict()
+
+    def save(self):
+        temp = self.state_file + ".tmp"
+        try:
+            os.makedirs(os.path.dirname(self.state_file), exist_ok=True)
+            with self._lock:
+                payload = {"version": self.VERSION, "entries": [[k, list(v)] for k, v in self.entries.items()]}
+            with open(temp, "w") as f:
+                json.dump(payload, f)
+            os.replace(temp, self.state_file)
+        except Exception as e:
+            logger.error(f"FAILED TO PERSIST REGIME CACHE: {e}")
+
+    def get(self, key: str, count_miss: bool = True) -> Optional[Tuple[str, float]]:
+        with self._lock:
+            value = self.entries.get(key)
+            if value is None:
+                if count_miss:
+                    self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: str, value: Tuple[str, float]):
+        with self._lock:
+            self.entries[key] = (value[0], float(value[1]))
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def lookup(self, symbol: str, timeframe: str, now_ms: Optional[int] = None) -> Optional[Tuple[str, float]]:
+        """
+        Consulta previa al fetch: la última vela cerrada esperada se deduce del reloj,
+        así un hit evita también la descarga de velas.
+        """
+        tf_ms = TIMEFRAME_MS[timeframe]
+        now_ms = now_ms if now_ms is not None else int(time.time() * 1000)
+        return self.get(self.key(symbol, timeframe, (now_ms // tf_ms) * tf_ms - tf_ms))
+
+    def analyze(
+        self,
+        symbol: str,
+        timeframe: str,
+        ohlcv: List[List[Any]],
+        compute: Callable[[List[List[Any]]], Tuple[str, float]],
+        now_ms: Optional[int] = None
+    ) -> Tuple[str, float, bool]:
+        """
+        Régimen confirmado (solo velas cerradas) memoizado.
+        compute: función ohlcv -> (regime, volatility). Retorna (regime, volatility, hit).
+        """
+        tf_ms = TIMEFRAME_MS[timeframe]
+        now_ms = now_ms if now_ms is not None else int(time.time() * 1000)
+        closed = ohlcv[:-1] if ohlcv and ohlcv[-1][0] + tf_ms > now_ms else ohlcv
+        if not closed:
+            return "UNKNOWN", 0.0, False
+
+        key = self.key(symbol, timeframe, closed[-1][0])
+        # El miss ya fue contado por lookup() antes del fetch
+        cached = self.get(key, count_miss=False)
+        if cached is not None:
+            return cached[0], cached[1], True
+
+        regime, volatility = compute(closed)
+        # UNKNOWN suele indicar error transitorio: no se memoiza
+        if regime != "UNKNOWN":
+            self.put(key, (regime, volatility))
+        return regime, volatility, False
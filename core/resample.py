@@ -0,0 +1,133 @@
+import logging
+from typing import List, Optional, Any, Dict, Tuple
+
+import numpy as np
+
+from core.candle_store import TIMEFRAME_MS
+
+logger = logging.getLogger("TITAN-OMNI.RESAMPLE")
+
+
+def resample_ohlcv(
+    ohlcv: List[List[Any]],
+    base_tf: str,
+    target_tf: str,
+    now_ms: Optional[int] = None,
+    include_partial: bool = True
+) -> Tuple[List[List[Any]], Dict[str, Any]]:
+    """
+    MTF-RESAMPLE-01: Agrega velas base (ej. 15m) a un timeframe superior (1h/4h).
+    Buckets alineados a epoch UTC (misma frontera que Kraken): bucket = ts - ts % target_ms.
+    - Bucket inicial incompleto -> se descarta (el exchange lo tendría completo).
+    - Bucket final abierto (bucket_end > now) -> vela en formación, se incluye solo si include_partial.
+    - Buckets interiores con velas base faltantes -> se cuentan en info['gaps'].
+    Retorna (ohlcv_resampleado, info).
+    """
+    base_ms = TIMEFRAME_MS[base_tf]
+    target_ms = TIMEFRAME_MS[target_tf]
+    if target_ms % base_ms != 0:
+        raise ValueError(f"RESAMPLE_INVALID: {target_tf} no es múltiplo de {base_tf}")
+    ratio = target_ms // base_ms
+    info = {"ratio": ratio, "dropped_head": False, "partial_tail": False, "gaps": 0}
+
+    if not ohlcv:
+        return [], info
+
+    data = np.asarray(ohlcv, dtype=np.float64)
+    ts = data[:, 0].astype(np.int64)
+    buckets = ts - ts % target_ms
+
+    starts = np.flatnonzero(np.diff(buckets)) + 1
+    starts = np.concatenate(([0], starts))
+    ends = np.concatenate((starts[1:], [len(ts)]))
+    counts = ends - starts
+
+    out = np.empty((len(starts), 6), dtype=np.float64)
+    out[:, 0] = buckets[starts]
+    out[:, 1] = data[starts, 1]
+    out[:, 2] = np.maximum.reduceat(data[:, 2], starts)
+    out[:, 3] = np.minimum.reduceat(data[:, 3], starts)
+    out[:, 4] = data[ends - 1, 4]
+    out[:, 5] = np.add.reduceat(data[:, 5], starts)
+
+    keep = np.ones(len(starts), dtype=bool)
+
+    # Cabeza: si la primera vela base no abre el bucket, el bucket está truncado
+    if ts[0] != buckets[0]:
+        keep[0] = False
+        info["dropped_head"] = True
+
+    # Cola: bucket aún abierto
+    if now_ms is not None and buckets[-1] + target_ms > now_ms:
+        info["partial_tail"] = True
+        if not include_partial:
+            keep[-1] = False
+
+    complete = counts == ratio
+    interior = keep.copy()
+    if info["partial_tail"]:
+        interior[-1] = False
+    info["gaps"] = int(np.count_nonzero(interior & ~complete))
+
+    out = out[keep]
+    result = [[int(row[0]), float(row[1]), float(row[2]), float(row[3]), float(row[4]), float(row[5])] for row in out]
+    return result, info
+
+
+def parity_check(
+    derived: List[List[Any]],
+    native: List[List[Any]],
+    rel_tol: float = 1e-9,
+    volume_rel_tol: float = 1e-6,
+    skip_last: bool = True
+) -> Dict[str, Any]:
+    """
+    Compara velas derivadas contra velas nativas del exchange (mismo timestamp).
+    skip_last: excluye la última vela nativa (en formación) de la comparación.
+    Retorna {ok, compared, mismatches}.
+    """
+    native_rows = native[:-1] if (skip_last and native) else native
+    derived_by_ts = {int(row[0]): row for row in derived}
+    compared = 0
+    mismatches = []
+    for row in native_rows:
+        ts = int(row[0])
+        d = derived_by_ts.get(ts)
+        if d is None:
+            continue
+        compared += 1
+        a = np.asarray(d[1:6], dtype=np.float64)
+        b = np.asarray(row[1:6], dtype=np.float64)
+        tol = np.array([rel_tol] * 4 + [volume_rel_tol])
+        if not np.all(np.abs(a - b) <= tol * np.maximum(np.abs(b), 1e-12)):
+            mismatches.append(ts)
+    return {"ok": compared > 0 and not mismatches, "compared": compared, "mismatches": mismatches}
+
+
+def derive_ohlcv(
+    store,
+    symbol: str,
+    target_tf: str,
+    limit: int,
+    base_window: List[List[Any]],
+    base_tf: str = "15m",
+    now_ms: Optional[int] = None
+) -> Tuple[Optional[List[List[Any]]], Dict[str, Any]]:
+    """
+    Construye `limit` velas de target_tf desde el CandleStore local de base_tf
+    más la vela base en formación del ciclo actual (último elemento de base_window).
+    Retorna (None, info) si la cobertura local no alcanza o hay huecos (el llamador
+    debe caer al fetch nativo).
+    """
+    ratio = TIMEFRAME_MS[target_tf] // TIMEFRAME_MS[base_tf]
+    closed = store.read_window(symbol, base_tf, (limit + 1) * ratio)
+    series = list(closed)
+    if base_window and (not series or base_window[-1][0] > series[-1][0]):
+        series.append(base_window[-1])
+
+    derived, info = resample_ohlcv(series, base_tf, target_tf, now_ms=now_ms)
+    derived = derived[-limit:]
+    info["coverage"] = len(derived)
+    if len(derived) < limit or info["gaps"] > 0:
+        return None, info
+    return derived, info
@@ -76,17 +76,25 @@ class RiskGate:
     MAX_SPREAD_PCT = float(os.getenv("MAX_SPREAD_PCT", "0.5"))
 
     @staticmethod
-    def pre_trade_check(exchange, symbol: str, supabase_client=None) -> Tuple[bool, str, Dict[str, Any]]:
+    def pre_trade_check(exchange, symbol: str, supabase_client=None, context=None, action: str = "BUY") -> Tuple[bool, str, Dict[str, Any]]:
         """
         Verifica condiciones de riesgo antes de permitir ejecución.
+        context: CycleContext opcional (CYCLE-CTX-01). Ticker y balance se leen como lecturas
+        críticas (directas del exchange, sin caché de proxy) dentro del límite de antigüedad.
+        action: lado de la orden; el veto por deadline solo aplica a entradas (una salida reduce riesgo).
         Retorna: (ok, reason, metrics)
         """
         metrics = {}
         
+        # CYCLE-DEADLINE-01: Sin tiempo de ciclo no se abre posición (las salidas SL/TP no se difieren)
+        deadline = getattr(context, "deadline", None)
+        if action != "SELL" and deadline is not None and deadline.expired():
+            return False, "RISK_GATE_DEADLINE_EXCEEDED", metrics
+        
         try:
             # A) CHECK SPREAD (Crítico)
             # Requerimos bid/ask frescos
-            ticker = exchange.fetch_ticker(symbol)
+            ticker = context.ticker(symbol, critical=True) if context else exchange.fetch_ticker(symbol)
             if not ticker or 'bid' not in ticker or 'ask' not in ticker or ticker['bid'] is None or ticker['ask'] is None:
                 return False, "RISK_GATE_NO_BID_ASK", metrics
             
@@ -110,7 +118,7 @@ class RiskGate:
             if not hasattr(exchange, 'fetch_balance'):
                  return False, "RISK_GATE_NO_BALANCE_METHOD", metrics
                  
-            bal = exchange.fetch_balance()
+            bal = context.balance(critical=True) if context else exchange.fetch_balance()
             if 'total' not in bal or 'USDT' not in bal['total']:
                  # Si no hay USDT wallet, buscamos equity total estimado
                  # Para MVP v6: Requerimos USDT balance explícito
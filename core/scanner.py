@@ -1,17 +1,171 @@
 import ccxt
-import pandas as pd
+import os
+import json
+import time
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
 
 logger = logging.getLogger("TITAN-OMNI.SCANNER")
 
+
+class TierScheduler:
+    """
+    SCANNER-TIERS-01: Cadencia de Escaneo por Niveles (universo completo).
+    - HOT:  top-K por score + símbolos con cambio de régimen reciente -> evaluación completa cada ciclo.
+    - WARM: los siguientes SCANNER_WARM_N por score -> evaluación completa cada SCANNER_WARM_EVERY ciclos.
+    - COLD: resto (o que no pasan filtros) -> solo se re-puntúan con los tickers bulk.
+    Estado persistido: data/scan_tiers.json (tier, última evaluación completa, último régimen por símbolo).
+    """
+    STATE_FILE = "data/scan_tiers.json"
+    VERSION = 1
+    TIERS = ("hot", "warm", "cold")
+
+    def __init__(self, state_file: Optional[str] = None):
+        self.state_file = state_file or self.STATE_FILE
+        self.warm_n = int(os.getenv("SCANNER_WARM_N", "40"))
+        self.warm_every = int(os.getenv("SCANNER_WARM_EVERY", "4"))
+        # Ciclos durante los que un cambio de régimen mantiene al símbolo en HOT
+        self.regime_hot_cycles = int(os.getenv("SCANNER_REGIME_HOT_CYCLES", "4"))
+        self.cycle = 0
+        self.symbols: Dict[str, Dict[str, Any]] = {}
+        self.last_plan: Dict[str, Any] = {}
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.state_file):
+            return
+        try:
+            with open(self.state_file, "r") as f:
+                data = json.load(f)
+            if data.get("version") != self.VERSION:
+                return
+            self.cycle = int(data.get("cycle", 0))
+            self.symbols = data.get("symbols", {})
+        except Exception as e:
+            # Estado derivado: ante corrupción se reconstruye (todos vuelven a evaluarse)
+            logger.error(f"SCAN TIERS STATE CORRUPT: {e}. Se reinicia.")
+            self.cycle = 0
+            self.symbols = {}
+
+    def save(self):
+        temp = self.state_file + ".tmp"
+        try:
+            os.makedirs(os.path.dirname(self.state_file), exist_ok=True)
+            with open(temp, "w") as f:
+                json.dump({"version": self.VERSION, "cycle": self.cycle, "symbols": self.symbols}, f)
+            os.replace(temp, self.state_file)
+        except Exception as e:
+            logger.error(f"FAILED TO PERSIST SCAN TIERS: {e}")
+
+    def _regime_hot(self, entry: Dict[str, Any]) -> bool:
+        changed = entry.get("regime_changed_cycle")
+        return changed is not None and self.cycle - changed < self.regime_hot_cycles
+
+    def plan(self, symbols: List[str], ranked: List[int], hot_k: int) -> List[str]:
+        """
+        Clasifica el universo y decide qué símbolos se evalúan completos este ciclo.
+        symbols: universo puntuado; ranked: índices elegibles ordenados por score desc
+        (al menos hot_k + warm_n). Retorna la lista a evaluar (HOT primero, orden de score).
+        """
+        self.cycle += 1
+        rank_tier = {}
+        for pos, i in enumerate(ranked):
+            rank_tier[symbols[i]] = "hot" if pos < hot_k else ("warm" if pos < hot_k + self.warm_n else "cold")
+
+        universe = set(symbols)
+        changes = []
+        for symbol in symbols:
+            entry = self.symbols.setdefault(symbol, {"tier": "cold", "last_full_eval": None, "last_full_cycle": None})
+            tier = rank_tier.get(symbol, "cold")
+            if tier != "hot" and self._regime_hot(entry):
+                tier = "hot"
+            if tier != entry["tier"]:
+                changes.append((symbol, entry["tier"], tier))
+            entry["tier"] = tier
+        # Símbolos que salieron del universo (delist / inactivos)
+        for symbol in [s for s in self.symbols if s not in universe]:
+            del self.symbols[symbol]
+
+        order = [symbols[i] for i in ranked] + sorted(s for s in symbols if s not in rank_tier)
+        due, skipped = [], []
+        for symbol in order:
+            entry = self.symbols[symbol]
+            if entry["tier"] == "hot":
+                due.append(symbol)
+            elif entry["tier"] == "warm":
+                last = entry.get("last_full_cycle")
+                if last is None or self.cycle - last >= self.warm_every:
+                    due.append(symbol)
+                else:
+                    skipped.append(symbol)
+        # HOT primero para que ONE_TRADE_PER_CYCLE favorezca a los mejores candidatos
+        due.sort(key=lambda s: self.symbols[s]["tier"] != "hot")
+
+        counts = {t: 0 for t in self.TIERS}
+        for entry in self.symbols.values():
+            counts[entry["tier"]] += 1
+        self.last_plan = {"cycle": self.cycle, "due": due, "skipped_warm": skipped, "changes": changes, "counts": counts}
+        return due
+
+    def record_evaluation(self, symbol: str, regime: str, now_ms: Optional[int] = None):
+        """Registra una evaluación completa y detecta cambios de régimen (promoción a HOT)."""
+        entry = self.symbols.setdefault(symbol, {"tier": "hot", "last_full_eval": None, "last_full_cycle": None})
+        previous = entry.get("last_regime")
+        if previous is not None and previous != regime:
+            entry["regime_changed_cycle"] = self.cycle
+        entry["last_regime"] = regime
+        entry["last_full_eval"] = now_ms if now_ms is not None else int(time.time() * 1000)
+        entry["last_full_cycle"] = self.cycle
+
+    def facts(self, symbol: str) -> List[str]:
+        """Facts forenses del tier de un símbolo (valores previos a la evaluación en curso)."""
+        entry = self.symbols.get(symbol)
+        if entry is None:
+            return []
+        return [f"scan_tier={entry['tier']}", f"last_full_eval={entry.get('last_full_eval')}"]
+
+    def plan_facts(self) -> List[str]:
+        """Resumen del ciclo: conteos, WARM omitidos (con su última evaluación) y cambios de tier."""
+        plan = self.last_plan
+        if not plan:
+            return []
+        counts = plan["counts"]
+        facts = [
+            f"tier_cycle={plan['cycle']}",
+            f"tier_counts=hot:{counts['hot']},warm:{counts['warm']},cold:{counts['cold']}",
+            f"tier_due={len(plan['due'])}",
+        ]
+        for symbol in plan["skipped_warm"]:
+            facts.append(f"tier_skip={symbol}|warm|last_full_eval={self.symbols[symbol].get('last_full_eval')}")
+        for symbol, old, new in plan["changes"]:
+            facts.append(f"tier_change={symbol}|{old}->{new}")
+        return facts
+
+
 class Scanner:
     """
     Esc\u00e1ner de Oportunidades v6.0.
     Reduce el universo de activos al TOP 1 candidato para Hunting.
     """
-    def __init__(self, exchange):
+    def __init__(self, exchange, venues: Optional[List[Any]] = None):
         self.exchange = exchange
         self.whitelist = ["BTC/USDT", "ETH/USDT", "SOL/USDT", "XRP/USDT", "ADA/USDT"] # Universo reducido para demo
+        # SCANNER-UNIVERSE-01: whitelist (demo) | universe (todos los mercados spot activos en USDT)
+        self.mode = os.getenv("SCANNER_MODE", "whitelist").lower()
+        self.quote = os.getenv("SCANNER_QUOTE", "USDT")
+        self.top_k = int(os.getenv("SCANNER_TOP_K", "10"))
+        self.min_quote_volume = float(os.getenv("SCANNER_MIN_QUOTE_VOLUME", "100000"))
+        self.max_spread_pct = float(os.getenv("SCANNER_MAX_SPREAD_PCT", "0.5"))
+        self.last_scan: Dict[str, Any] = {}
+        # SCANNER-TIERS-01: Cadencia hot/warm/cold (solo modo universe)
+        self.tiers = TierScheduler() if self.mode == "universe" and os.getenv("SCANNER_TIERS", "true").lower() == "true" else None
+        # SCANNER-VENUES-01: Venues de escaneo (core.venues.Venue); vacío = solo self.exchange
+        self.venues = venues or []
+        self.require_primary = os.getenv("SCANNER_REQUIRE_PRIMARY", "true").lower() == "true"
+        self.best_venue: Dict[str, str] = {}
 
     def scan_top_asset(self):
         """
@@ -46,17 +200,23 @@ class Scanner:
             return "BTC/USDT" # Fallback seguro
 
     # UNIV-SCANNER-01: Multi-Asset Listing (Ordered)
-    def scan_assets(self):
+    def scan_assets(self, context=None):
         """
         Escanea la whitelist y devuelve LISTA ORDENADA de candidatos
         basado en volumen y tendencia (Score desc).
+        context: CycleContext opcional (CYCLE-CTX-01), memoiza los tickers del ciclo.
         Retorna: [symbol1, symbol2, ...]
         """
+        if self.venues:
+            return self.scan_venues(context)
+        if self.mode == "universe":
+            return self.scan_universe(context)
+
         logger.info("SCANNER: Iniciando barrido MULTI-ACTIVO...")
         scored_assets = []
         
         try:
-            tickers = self.exchange.fetch_tickers(self.whitelist)
+            tickers = context.tickers(self.whitelist) if context else self.exchange.fetch_tickers(self.whitelist)
             
             for symbol, ticker in tickers.items():
                 if not ticker: continue
@@ -77,3 +237,182 @@ class Scanner:
         except Exception as e:
             logger.error(f"SCANNER ERROR: {e}")
             return ["BTC/USDT"] # Fallback seguro lista
+
+    # SCANNER-UNIVERSE-01: Universo completo vectorizado
+    def universe(self, context=None) -> List[str]:
+        """
+        Mercados spot activos con quote == SCANNER_QUOTE, desde la metadata cacheada
+        de load_markets (CycleContext / proxy de caché). active=None (desconocido) cuenta como activo.
+        """
+        markets = context.markets() if context else self.exchange.load_markets()
+        return self._quote_markets(markets)
+
+    def _quote_markets(self, markets: Dict[str, Dict[str, Any]]) -> List[str]:
+        return sorted(
+            symbol for symbol, m in (markets or {}).items()
+            if m.get("quote") == self.quote and m.get("active") is not False and m.get("spot", True)
+        )
+
+    def score_universe(self, tickers: Dict[str, Dict[str, Any]], symbols: Optional[List[str]] = None) -> Tuple[List[str], np.ndarray, np.ndarray]:
+        """
+        Score vectorizado: quoteVolume * (1 + |percentage|), igual que scan_assets.
+        Filtros: quoteVolume >= SCANNER_MIN_QUOTE_VOLUME y spread bid/ask <= SCANNER_MAX_SPREAD_PCT
+        (sin bid/ask válidos -> descartado, FAIL-CLOSED).
+        Retorna (symbols, scores, eligible) alineados.
+        """
+        symbols = [s for s in (symbols if symbols is not None else tickers) if tickers.get(s)]
+        if not symbols:
+            return [], np.empty(0), np.empty(0, dtype=bool)
+
+        rows = [tickers[s] for s in symbols]
+        # Una columna por campo; None -> NaN
+        quote_volume, change_pct, bid, ask = (
+            np.fromiter((t.get(field) for t in rows), dtype=np.float64, count=len(rows))
+            for field in ("quoteVolume", "percentage", "bid", "ask")
+        )
+        quote_volume = np.nan_to_num(quote_volume, nan=0.0)
+        change_pct = np.nan_to_num(change_pct, nan=0.0)
+        scores = quote_volume * (1.0 + np.abs(change_pct))
+
+        mid = (bid + ask) / 2.0
+        with np.errstate(invalid="ignore", divide="ignore"):
+            spread_pct = (ask - bid) / mid * 100.0
+        eligible = (quote_volume >= self.min_quote_volume) & np.isfinite(spread_pct) & (mid > 0) & (spread_pct <= self.max_spread_pct)
+        return symbols, scores, eligible
+
+    @staticmethod
+    def top_k_indices(scores: np.ndarray, eligible: np.ndarray, k: int) -> np.ndarray:
+        """
+        Índices de los K mejores scores elegibles (desc) vía partición parcial O(n).
+        Empates resueltos por índice (orden alfabético del universo) -> resultado determinista.
+        """
+        idx = np.flatnonzero(eligible)
+        if k <= 0 or idx.size == 0:
+            return idx[:0]
+        candidate = scores[idx]
+        if idx.size > k:
+            kth = np.partition(candidate, idx.size - k)[idx.size - k]
+            keep = candidate >= kth
+            idx, candidate = idx[keep], candidate[keep]
+        order = np.lexsort((idx, -candidate))
+        return idx[order][:k]
+
+    def scan_universe(self, context=None) -> List[str]:
+        """Top-K del universo completo con una sola llamada bulk de tickers."""
+        logger.info("SCANNER: Iniciando barrido UNIVERSO COMPLETO...")
+        try:
+            universe = self.universe(context)
+            tickers = context.tickers(universe) if context else self.exchange.fetch_tickers(universe)
+
+            start = time.perf_counter()
+            symbols, scores, eligible = self.score_universe(tickers, universe)
+            return self._select(symbols, scores, eligible, len(universe), start)
+
+        except Exception as e:
+            logger.error(f"SCANNER ERROR: {e}")
+            return ["BTC/USDT"] # Fallback seguro lista
+
+    def _select(self, symbols: List[str], scores: np.ndarray, eligible: np.ndarray, universe_size: int, start: float) -> List[str]:
+        """Top-K (o plan de tiers) sobre el universo puntuado."""
+        if self.tiers is not None:
+            ranked = self.top_k_indices(scores, eligible, self.top_k + self.tiers.warm_n)
+            top = ranked[:self.top_k]
+            result_list = self.tiers.plan(symbols, list(ranked), self.top_k)
+        else:
+            top = self.top_k_indices(scores, eligible, self.top_k)
+            result_list = [symbols[i] for i in top]
+        cpu_ms = (time.perf_counter() - start) * 1000
+
+        self.last_scan = {
+            "universe": universe_size,
+            "tickers": len(symbols),
+            "eligible": int(np.count_nonzero(eligible)),
+            "cpu_ms": round(cpu_ms, 3),
+            "scores": {symbols[i]: float(scores[i]) for i in top},
+        }
+        logger.info(
+            f"SCANNER: universo={universe_size} elegibles={self.last_scan['eligible']} "
+            f"evaluar={result_list} ({cpu_ms:.2f} ms)"
+        )
+        return result_list
+
+    # SCANNER-VENUES-01: Escaneo concurrente multi-exchange
+    def _scan_venue(self, venue, context=None) -> Tuple[List[str], np.ndarray, np.ndarray]:
+        """Puntúa el universo de un venue (el primario reutiliza el CycleContext)."""
+        ctx = context if venue.primary else None
+        if self.mode == "universe":
+            universe = self._quote_markets(ctx.markets() if ctx else venue.exchange.load_markets())
+        else:
+            universe = list(self.whitelist)
+        tickers = ctx.tickers(universe) if ctx else venue.exchange.fetch_tickers(universe)
+        return self.score_universe(tickers, universe)
+
+    def scan_venues(self, context=None) -> List[str]:
+        """
+        Fan-out concurrente (un hilo por venue) y fusión en un único ranking:
+        cada símbolo toma el mejor score elegible entre venues (empate -> orden de venues,
+        primario primero) y se registra su mejor venue en best_venue.
+        Con SCANNER_REQUIRE_PRIMARY=true solo se proponen símbolos listados en el venue
+        primario (único venue de ejecución).
+        """
+        logger.info(f"SCANNER: Iniciando barrido MULTI-VENUE {[v.name for v in self.venues]}...")
+        results = {}
+        # CYCLE-DEADLINE-01: un venue lento se descarta al agotar el presupuesto de escaneo
+        deadline = getattr(context, "deadline", None)
+        pool = ThreadPoolExecutor(max_workers=len(self.venues), thread_name_prefix="titan-venue")
+        try:
+            futures = {venue.name: pool.submit(self._scan_venue, venue, context) for venue in self.venues}
+            for venue in self.venues:
+                try:
+                    timeout = deadline.timeout("scan") if deadline is not None and deadline.enabled else None
+                    results[venue.name] = futures[venue.name].result(timeout=timeout)
+                except Exception as e:
+                    # Un venue caído (o fuera de presupuesto) no bloquea el ranking de los demás
+                    logger.error(f"SCANNER VENUE ERROR {venue.name}: {type(e).__name__} {e}")
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+        try:
+            primary = next((v.name for v in self.venues if v.primary), None)
+            if primary is not None and primary not in results and self.require_primary:
+                logger.error("SCANNER ERROR: venue primario sin datos")
+                return ["BTC/USDT"] # Fallback seguro lista
+
+            start = time.perf_counter()
+            if self.require_primary and primary is not None:
+                symbols = list(results[primary][0])
+            else:
+                symbols = sorted({s for venue_symbols, _, _ in results.values() for s in venue_symbols})
+            position = {s: i for i, s in enumerate(symbols)}
+
+            # Matriz venues x símbolos (-inf = no listado / no elegible en ese venue)
+            names = [v.name for v in self.venues if v.name in results]
+            matrix = np.full((len(names), len(symbols)), -np.inf)
+            for row, name in enumerate(names):
+                venue_symbols, venue_scores, venue_eligible = results[name]
+                cols = np.fromiter((position.get(s, -1) for s in venue_symbols), dtype=np.int64, count=len(venue_symbols))
+                keep = (cols >= 0) & venue_eligible
+                matrix[row, cols[keep]] = venue_scores[keep]
+
+            best_row = np.argmax(matrix, axis=0) if names else np.zeros(len(symbols), dtype=np.int64)
+            scores = matrix[best_row, np.arange(len(symbols))] if names else np.full(len(symbols), -np.inf)
+            eligible = np.isfinite(scores)
+            self.best_venue = {symbols[i]: names[best_row[i]] for i in np.flatnonzero(eligible)}
+
+            result_list = self._select(symbols, scores, eligible, len(symbols), start)
+            self.last_scan["venues"] = {name: len(results[name][0]) for name in names}
+            return result_list
+
+        except Exception as e:
+            logger.error(f"SCANNER ERROR: {e}")
+            return ["BTC/USDT"] # Fallback seguro lista
+
+    def venue_facts(self, symbol: str) -> List[str]:
+        """Facts forenses del venue ganador de un símbolo."""
+        if not self.venues:
+            return []
+        venue = self.best_venue.get(symbol)
+        return [f"best_venue={venue}"] if venue else ["best_venue=NONE"]
+
+    def venue_stats(self) -> List[Dict[str, Any]]:
+        return [venue.stats() for venue in self.venues]
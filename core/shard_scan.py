@@ -0,0 +1,126 @@
+import os
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+from core.deadline import DeadlineExceeded
+
+logger = logging.getLogger("TITAN-OMNI.SHARDS")
+
+
+def partition(assets: List[str], shards: int) -> List[List[str]]:
+    """
+    Reparto determinista round-robin por posición en el ranking: cada shard recibe
+    activos de todo el rango de score (carga equilibrada) y conserva el orden relativo.
+    """
+    shards = max(1, min(shards, len(assets)))
+    return [assets[i::shards] for i in range(shards)]
+
+
+class ShardResults:
+    """
+    Resultados de la etapa sharded con la interfaz de consumo de DataPrefetcher
+    (has/result/shutdown): el loop de decisión los lee igual que los del pool de hilos.
+    """
+    def __init__(self):
+        self.results: Dict[Hashable, Any] = {}
+
+    def has(self, key: Hashable) -> bool:
+        return key in self.results
+
+    def result(self, key: Hashable, timeout: Optional[float] = None) -> Any:
+        value = self.results[key]
+        if isinstance(value, Exception):
+            raise value
+        return value
+
+    def shutdown(self, wait: bool = True):
+        pass
+
+
+class ShardedScan:
+    """
+    SCAN-SHARD-01: Escaneo de Amplitud Multi-Proceso.
+    Reparte el ranking entre SCAN_SHARDS procesos; cada worker hace fetch, snapshot,
+    régimen 15m y MTF de su shard y devuelve los datos por activo. El coordinador
+    (proceso principal) aplica capital, auditor IA, RiskGate y ONE_TRADE_PER_CYCLE en
+    orden global de score. Los resultados se fusionan por activo y en orden de shard,
+    así que decisiones y auditoría no dependen del orden en que terminan los workers.
+    Los workers usan un cliente público sin credenciales (SCAN_SHARD_THREADS hilos, 1 por
+    defecto = determinista) y nunca escriben auditoría; las entradas de la caché de régimen
+    y las refs de snapshot viajan al worker y vuelven al coordinador en la salida del shard.
+    El pool se mantiene entre ciclos (modo daemon) y se recrea si un worker muere; un shard
+    fallido o caído marca sus activos como error (fail-closed por activo).
+    """
+    def __init__(self, worker: Callable[[Dict[str, Any], List[str]], Dict[str, Any]], shards: Optional[int] = None,
+                 start_method: Optional[str] = None, timeout: Optional[float] = None):
+        self.worker = worker
+        self.shards = shards or int(os.getenv("SCAN_SHARDS", "0"))
+        # spawn: los workers no heredan hilos/locks del proceso principal (WAL, refresco de mercados)
+        self.start_method = start_method or os.getenv("SCAN_SHARD_START_METHOD", "spawn")
+        self.timeout = timeout if timeout is not None else float(os.getenv("SCAN_SHARD_TIMEOUT", "600"))
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self.last_run: Dict[str, Any] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self.shards > 1
+
+    def _executor(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.shards, mp_context=multiprocessing.get_context(self.start_method))
+        return self._pool
+
+    def run(self, assets: List[str], spec: Dict[str, Any], deadline=None) -> List[Dict[str, Any]]:
+        """
+        Ejecuta el worker sobre cada shard. Retorna una salida por shard, en orden de shard.
+        Un shard fallido (excepción, worker caído, timeout) devuelve {"error": Exception}
+        y sus activos se reportan como error en el loop de decisión (fail-closed por activo).
+        deadline: CycleDeadline opcional; agotado el presupuesto "acquire" -> DeadlineExceeded.
+        """
+        shards = partition(assets, self.shards)
+        pool = self._executor()
+        futures = [pool.submit(self.worker, spec, shard) for shard in shards]
+        outputs = []
+        broken = False
+        for index, (shard, future) in enumerate(zip(shards, futures)):
+            timeout = self.timeout if deadline is None else min(self.timeout, deadline.timeout("acquire"))
+            try:
+                output = future.result(timeout=timeout)
+            except FutureTimeout:
+                exceeded = deadline is not None and deadline.timeout("acquire") <= 0
+                logger.error(f"SHARD {index} TIMEOUT ({len(shard)} activos){' - deadline del ciclo' if exceeded else ''}")
+                output = {"error": DeadlineExceeded("acquire") if exceeded else TimeoutError(f"SHARD_TIMEOUT_{index}")}
+                broken = True
+            except Exception as e:
+                logger.error(f"SHARD {index} FAILED ({len(shard)} activos): {type(e).__name__}: {e}")
+                output = {"error": e}
+                broken = True
+            output["assets"] = shard
+            outputs.append(output)
+        if broken:
+            # Pool posiblemente roto o con trabajos colgados: se recrea en el próximo ciclo
+            self.shutdown()
+        self.last_run = {"shards": len(shards), "sizes": [len(s) for s in shards], "failed": sum(1 for o in outputs if "error" in o)}
+        return outputs
+
+    def merge(self, outputs: List[Dict[str, Any]]):
+        """Fusiona las salidas de los shards en (acquired, ShardResults con claves ("mtf", activo))."""
+        acquired: Dict[str, Any] = {}
+        results = ShardResults()
+        for output in outputs:
+            error = output.get("error")
+            for asset in output["assets"]:
+                if error is not None:
+                    acquired[asset] = error
+                    continue
+                acquired[asset] = output["acquired"].get(asset, RuntimeError("SHARD_RESULT_MISSING"))
+                if asset in output["mtf"]:
+                    results.results[("mtf", asset)] = output["mtf"][asset]
+        return acquired, results
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
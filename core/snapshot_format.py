@@ -0,0 +1,268 @@
+import os
+import bz2
+import json
+import lzma
+import mmap
+import zlib
+import struct
+import hashlib
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+# SNAPSHOT-BIN-01: Bloque binario columnar de velas OHLCV
+# Cabecera: magic, versión, codec, reservado, velas, bytes de metadatos JSON, bytes de payload
+HEADER = struct.Struct("<4sHBBIII")
+MAGIC = b"TOSB"
+VERSION = 1
+CODECS = {"none": 0, "zlib": 1, "lzma": 2, "bz2": 3}
+CODEC_NAMES = {v: k for k, v in CODECS.items()}
+# Tipo JSON original de cada celda: reconstrucción exacta (100 vs 100.0, null)
+TAG_FLOAT, TAG_INT, TAG_NULL = 0, 1, 2
+COLUMNS = ("timestamp", "open", "high", "low", "close", "volume")
+MAX_EXACT_INT = 2 ** 53
+
+# Claves del snapshot legacy (DATA-ORIGIN-02), en el orden del archivo JSON original
+SNAPSHOT_KEYS = ("cycle_id", "state", "symbol", "timeframe", "limit", "ohlcv", "timestamp", "snapshot_hash")
+
+
+class SnapshotFormatError(ValueError):
+    """Bloque ilegible (magic/versión/codec/longitud) o vela no representable en el formato."""
+
+
+# --- Hash canónico en una sola pasada ---
+def candle_fragments(ohlcv: Iterable[List[Any]]) -> List[str]:
+    """JSON canónico de cada vela (mismo texto que json.dumps(snapshot, sort_keys=True) produce dentro de "ohlcv")."""
+    return [json.dumps(candle) for candle in ohlcv]
+
+
+def stream_hash(snapshot: Dict[str, Any], fragments: List[str]) -> str:
+    """
+    SHA-256 de json.dumps(snapshot sin snapshot_hash, sort_keys=True) alimentado por partes:
+    cabecera + fragmentos de vela ya serializados (las velas se codifican una sola vez).
+    """
+    digest = hashlib.sha256()
+    first = True
+    digest.update(b"{")
+    for key in sorted(k for k in snapshot if k != "snapshot_hash"):
+        digest.update(b"" if first else b", ")
+        first = False
+        digest.update(json.dumps(key).encode("utf-8") + b": ")
+        if key == "ohlcv":
+            digest.update(b"[")
+            digest.update(", ".join(fragments).encode("utf-8"))
+            digest.update(b"]")
+        else:
+            digest.update(json.dumps(snapshot[key]).encode("utf-8"))
+    digest.update(b"}")
+    return digest.hexdigest()
+
+
+# --- Codificación ---
+def _columns(candles: List[List[Any]]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    n = len(candles)
+    ts = np.zeros(n, dtype="<i8")
+    values = np.zeros((5, n), dtype="<f8")
+    tags = np.zeros((6, n), dtype="u1")
+    for i, candle in enumerate(candles):
+        if len(candle) != 6:
+            raise SnapshotFormatError(f"SNAPSHOT_CANDLE_WIDTH: {len(candle)}")
+        for j, value in enumerate(candle):
+            if value is None:
+                tags[j, i] = TAG_NULL
+                continue
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                raise SnapshotFormatError(f"SNAPSHOT_CELL_TYPE: {type(value).__name__}")
+            if isinstance(value, int):
+                if abs(value) > MAX_EXACT_INT:
+                    raise SnapshotFormatError(f"SNAPSHOT_INT_RANGE: {value}")
+                tags[j, i] = TAG_INT
+            if j == 0:
+                if not isinstance(value, int) and value != int(value):
+                    raise SnapshotFormatError(f"SNAPSHOT_TIMESTAMP: {value}")
+                ts[i] = int(value)
+            else:
+                values[j - 1, i] = value
+    return ts, values, tags
+
+
+def compress(raw: bytes, codec: str) -> bytes:
+    if codec == "none":
+        return raw
+    if codec == "zlib":
+        return zlib.compress(raw, 6)
+    if codec == "lzma":
+        return lzma.compress(raw, preset=6)
+    if codec == "bz2":
+        return bz2.compress(raw, 9)
+    raise SnapshotFormatError(f"SNAPSHOT_CODEC: {codec}")
+
+
+def decompress(data: bytes, codec: str) -> bytes:
+    if codec == "none":
+        return data
+    if codec == "zlib":
+        return zlib.decompress(data)
+    if codec == "lzma":
+        return lzma.decompress(data)
+    if codec == "bz2":
+        return bz2.decompress(data)
+    raise SnapshotFormatError(f"SNAPSHOT_CODEC: {codec}")
+
+
+def _payload_offset(meta_len: int) -> int:
+    # Payload alineado a 8 bytes: columnas int64/float64 legibles sin copia desde el mmap
+    return (HEADER.size + meta_len + 7) // 8 * 8
+
+
+def encode_block(candles: List[List[Any]], meta: Optional[Dict[str, Any]] = None, codec: Optional[str] = None) -> bytes:
+    """Bloque binario: timestamp int64, OHLCV float64 (columnas) + tipos por celda, comprimido con `codec`."""
+    codec = codec or os.getenv("SNAPSHOT_CODEC", "zlib")
+    if codec not in CODECS:
+        raise SnapshotFormatError(f"SNAPSHOT_CODEC: {codec}")
+    ts, values, tags = _columns(candles)
+    raw = ts.tobytes() + values.tobytes() + tags.tobytes()
+    payload = compress(raw, codec)
+    meta_bytes = json.dumps(meta, separators=(",", ":")).encode("utf-8") if meta else b""
+    header = HEADER.pack(MAGIC, VERSION, CODECS[codec], 0, len(candles), len(meta_bytes), len(payload))
+    padding = b"\0" * (_payload_offset(len(meta_bytes)) - HEADER.size - len(meta_bytes))
+    return header + meta_bytes + padding + payload
+
+
+def is_block(data: bytes) -> bool:
+    return data[:4] == MAGIC
+
+
+# --- Lectura ---
+class SnapshotReader:
+    """
+    Lector de bloques vía mmap. columns() devuelve arrays NumPy sobre el propio mmap
+    (sin copia) con codec "none"; con compresión, una única descompresión a memoria.
+    Los arrays referencian el mmap: cerrar el lector solo cuando ya no se usan.
+    """
+    def __init__(self, source):
+        self._file = None
+        self._mm = None
+        self._columns = None
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            self._buffer = source
+        else:
+            self._file = open(source, "rb")
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._buffer = self._mm
+        try:
+            self._parse_header()
+        except Exception:
+            self.close()
+            raise
+
+    def _parse_header(self):
+        if len(self._buffer) < HEADER.size:
+            raise SnapshotFormatError("SNAPSHOT_TRUNCATED")
+        magic, version, codec, _, self.n, meta_len, payload_len = HEADER.unpack_from(self._buffer, 0)
+        if magic != MAGIC:
+            raise SnapshotFormatError("SNAPSHOT_BAD_MAGIC")
+        if version != VERSION:
+            raise SnapshotFormatError(f"SNAPSHOT_VERSION: {version} (esperada {VERSION})")
+        if codec not in CODEC_NAMES:
+            raise SnapshotFormatError(f"SNAPSHOT_CODEC: {codec}")
+        self.codec = CODEC_NAMES[codec]
+        self.offset = _payload_offset(meta_len)
+        if len(self._buffer) != self.offset + payload_len:
+            raise SnapshotFormatError("SNAPSHOT_LENGTH_MISMATCH")
+        meta = bytes(self._buffer[HEADER.size:HEADER.size + meta_len])
+        self.meta = json.loads(meta) if meta else {}
+        self._payload_len = payload_len
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        """{"timestamp": int64, "open".."volume": float64, "tags": uint8 (6, n)}."""
+        if self._columns is not None:
+            return self._columns
+        n = self.n
+        if self.codec == "none":
+            buffer, base = self._buffer, self.offset
+        else:
+            try:
+                buffer = decompress(bytes(self._buffer[self.offset:self.offset + self._payload_len]), self.codec)
+            except (zlib.error, lzma.LZMAError, OSError, EOFError) as e:
+                raise SnapshotFormatError(f"SNAPSHOT_PAYLOAD_CORRUPT: {e}")
+            base = 0
+        if len(buffer) - base < 54 * n:
+            raise SnapshotFormatError("SNAPSHOT_PAYLOAD_TRUNCATED")
+        columns = {"timestamp": np.frombuffer(buffer, dtype="<i8", count=n, offset=base)}
+        for j, name in enumerate(COLUMNS[1:]):
+            columns[name] = np.frombuffer(buffer, dtype="<f8", count=n, offset=base + 8 * n * (j + 1))
+        columns["tags"] = np.frombuffer(buffer, dtype="u1", count=6 * n, offset=base + 48 * n).reshape(6, n)
+        self._columns = columns
+        return columns
+
+    def candles(self) -> List[List[Any]]:
+        """Velas en formato ccxt con los tipos originales (int/float/None)."""
+        columns = self.columns()
+        tags = columns["tags"].tolist()
+        data = [columns["timestamp"].tolist()] + [columns[name].tolist() for name in COLUMNS[1:]]
+        candles = []
+        for i in range(self.n):
+            candle = []
+            for j in range(6):
+                tag = tags[j][i]
+                if tag == TAG_NULL:
+                    candle.append(None)
+                elif tag == TAG_INT:
+                    candle.append(int(data[j][i]))
+                else:
+                    candle.append(float(data[j][i]))
+            candles.append(candle)
+        return candles
+
+    def close(self):
+        self._columns = None
+        if self._mm is not None:
+            self._mm.close()
+            self._file.close()
+            self._mm = self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+# --- Conversión legacy JSON <-> binario ---
+def snapshot_to_block(snapshot: Dict[str, Any], codec: Optional[str] = None) -> bytes:
+    meta = {k: snapshot[k] for k in SNAPSHOT_KEYS if k != "ohlcv" and k in snapshot}
+    return encode_block(snapshot["ohlcv"], meta=meta, codec=codec)
+
+
+def block_to_snapshot(source) -> Dict[str, Any]:
+    with SnapshotReader(source) as reader:
+        candles = reader.candles()
+        meta = reader.meta
+    return {k: (candles if k == "ohlcv" else meta[k]) for k in SNAPSHOT_KEYS if k == "ohlcv" or k in meta}
+
+
+def json_to_binary(json_path: str, out_path: Optional[str] = None, codec: Optional[str] = None) -> str:
+    """Convierte un snapshot JSON legacy en bloque binario (.tosb); verifica ida y vuelta byte a byte."""
+    with open(json_path, "rb") as f:
+        original = f.read()
+    snapshot = json.loads(original)
+    block = snapshot_to_block(snapshot, codec)
+    if legacy_json(block_to_snapshot(block)) != original:
+        raise SnapshotFormatError(f"SNAPSHOT_ROUNDTRIP_MISMATCH: {json_path}")
+    out_path = out_path or os.path.splitext(json_path)[0] + ".tosb"
+    temp = out_path + ".tmp"
+    with open(temp, "wb") as f:
+        f.write(block)
+    os.replace(temp, out_path)
+    return out_path
+
+
+def binary_to_json(path: str) -> bytes:
+    """Bytes exactos del snapshot JSON legacy (json.dump indent=2) de un bloque binario."""
+    return legacy_json(block_to_snapshot(path))
+
+
+def legacy_json(snapshot: Dict[str, Any]) -> bytes:
+    return json.dumps(snapshot, indent=2).encode("utf-8")
@@ -0,0 +1,276 @@
+import os
+import json
+import hashlib
+import threading
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from core.candle_store import TIMEFRAME_MS
+from core.snapshot_format import (
+    COLUMNS, SNAPSHOT_KEYS, SnapshotReader, block_to_snapshot, candle_fragments, encode_block, is_block, legacy_json, stream_hash,
+)
+from core.tracer import count
+
+logger = logging.getLogger("TITAN-OMNI.SNAPSHOTS")
+
+# v1: chunks JSON compacto (SNAPSHOT-CAS-01); v2: chunks binarios columnares comprimidos (SNAPSHOT-BIN-01)
+MANIFEST_FORMAT = "ohlcv-manifest-v2"
+MANIFEST_FORMATS = {"ohlcv-manifest-v1": ".json", "ohlcv-manifest-v2": ".tosb"}
+
+
+def snapshot_hash(snapshot: Dict[str, Any]) -> str:
+    """Hash DATA-ORIGIN-02: SHA-256 del JSON canónico (sort_keys) sin el campo snapshot_hash."""
+    return stream_hash(snapshot, candle_fragments(snapshot["ohlcv"]))
+
+
+def chunk_id(fragments: List[str]) -> str:
+    """Identidad del chunk: SHA-256 del JSON canónico de sus velas (independiente del codec)."""
+    return hashlib.sha256(("[" + ", ".join(fragments) + "]").encode("utf-8")).hexdigest()
+
+
+class SnapshotStore:
+    """
+    SNAPSHOT-CAS-01: Almacén de Snapshots OHLCV Direccionado por Contenido.
+    Las velas de cada snapshot se agrupan en chunks alineados al reloj del timeframe
+    (SNAPSHOT_CHUNK_CANDLES velas por chunk); cada chunk es inmutable y se nombra por el
+    SHA-256 del JSON canónico de sus velas (SNAPSHOT_CHUNK_DIR/<h[:2]>/<h>.tosb). El archivo
+    del snapshot (misma ruta que antes) pasa a ser un manifiesto con la cabecera y referencias
+    (chunk, offset, velas). Ciclos consecutivos comparten todos los chunks salvo el de la
+    vela en formación; el chunk más antiguo de la ventana se referencia con offset.
+    SNAPSHOT-BIN-01: los chunks son bloques binarios columnares (core/snapshot_format.py,
+    SNAPSHOT_CODEC); los fragmentos JSON de vela se calculan una vez y sirven para el hash
+    del snapshot, la identidad de los chunks y la deduplicación.
+    snapshot_hash no cambia y load()/read_bytes() reconstruyen el JSON legacy byte a byte.
+    Las refs de la última ventana viajan en el checkpoint de runtime (export_latest/import_latest):
+    en modo cron el proceso nuevo también referencia el chunk más antiguo con offset.
+    """
+    BASE_DIR = "data/forensics/ohlcv"
+    CHUNK_DIR = "data/forensics/ohlcv_chunks"
+
+    def __init__(self, chunk_dir: Optional[str] = None, chunk_candles: Optional[int] = None, codec: Optional[str] = None):
+        self.chunk_dir = chunk_dir or os.getenv("SNAPSHOT_CHUNK_DIR", self.CHUNK_DIR)
+        self.chunk_candles = chunk_candles or int(os.getenv("SNAPSHOT_CHUNK_CANDLES", "16"))
+        self.codec = codec or os.getenv("SNAPSHOT_CODEC", "zlib")
+        self._lock = threading.Lock()
+        self._known = set()
+        # (symbol, timeframe) -> {bucket: (chunk_id, [vela JSON] o None si viene del checkpoint)} de la última ventana escrita
+        self._latest: Dict[Tuple[str, str], Dict[int, Tuple[str, List[str]]]] = {}
+        self.metrics = {"snapshots": 0, "chunks_written": 0, "chunks_reused": 0, "bytes_written": 0}
+
+    # --- Escritura ---
+    def chunk_path(self, chunk_id: str, suffix: str = ".tosb") -> str:
+        return os.path.join(self.chunk_dir, chunk_id[:2], f"{chunk_id}{suffix}")
+
+    def _groups(self, timeframe: str, ohlcv: List[List[Any]], fragments: List[str]) -> List[Tuple[int, List[List[Any]], List[str]]]:
+        """Velas (y su JSON canónico) agrupadas por bucket de tiempo; sin timeframe conocido, por posición."""
+        span_ms = TIMEFRAME_MS[timeframe] * self.chunk_candles if timeframe in TIMEFRAME_MS else None
+        groups: List[Tuple[int, List[List[Any]], List[str]]] = []
+        for position, (candle, encoded) in enumerate(zip(ohlcv, fragments)):
+            bucket = int(candle[0]) // span_ms if span_ms else position // self.chunk_candles
+            if groups and groups[-1][0] == bucket:
+                groups[-1][1].append(candle)
+                groups[-1][2].append(encoded)
+            else:
+                groups.append((bucket, [candle], [encoded]))
+        return groups
+
+    def _put_chunk(self, candles: List[List[Any]], fragments: List[str]) -> str:
+        cid = chunk_id(fragments)
+        with self._lock:
+            if cid in self._known:
+                self.metrics["chunks_reused"] += 1
+                return cid
+        file_path = self.chunk_path(cid)
+        if os.path.exists(file_path):
+            self.metrics["chunks_reused"] += 1
+        else:
+            data = encode_block(candles, codec=self.codec)
+            # Inmutable: escritura atómica; hilos/procesos que escriben el mismo chunk producen los mismos bytes
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            temp = f"{file_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temp, "wb") as f:
+                f.write(data)
+            os.replace(temp, file_path)
+            count("bytes_written", len(data))
+            with self._lock:
+                self.metrics["chunks_written"] += 1
+                self.metrics["bytes_written"] += len(data)
+        with self._lock:
+            self._known.add(cid)
+        return cid
+
+    def save(self, snapshot: Dict[str, Any], file_path: str, fragments: Optional[List[str]] = None) -> str:
+        """
+        Escribe los chunks nuevos y el manifiesto del snapshot (snapshot_hash ya calculado).
+        fragments: JSON canónico de las velas si ya se calculó para el hash (no se re-serializa).
+        """
+        if fragments is None:
+            fragments = candle_fragments(snapshot["ohlcv"])
+        key = (snapshot["symbol"], snapshot["timeframe"])
+        with self._lock:
+            previous = self._latest.get(key, {})
+        latest = {}
+        refs = []
+        for bucket, candles, encoded in self._groups(snapshot["timeframe"], snapshot["ohlcv"], fragments):
+            known = previous.get(bucket)
+            if known and known[1] is None:
+                known = self._resolve(known[0], encoded)
+            offset = self._find_run(known[1], encoded) if known else None
+            if offset is not None:
+                refs.append([known[0], offset, len(encoded)])
+                latest[bucket] = known
+                with self._lock:
+                    self.metrics["chunks_reused"] += 1
+                continue
+            cid = self._put_chunk(candles, encoded)
+            refs.append([cid, 0, len(encoded)])
+            latest[bucket] = (cid, encoded)
+        with self._lock:
+            # Solo los buckets de la ventana actual (memoria acotada en modo daemon)
+            self._latest[key] = latest
+
+        manifest = {"format": MANIFEST_FORMAT}
+        manifest.update({k: snapshot[k] for k in SNAPSHOT_KEYS if k != "ohlcv"})
+        manifest["candles"] = len(snapshot["ohlcv"])
+        manifest["chunks"] = refs
+        data = json.dumps(manifest, separators=(",", ":")).encode("utf-8")
+        os.makedirs(os.path.dirname(file_path) or ".", exist_ok=True)
+        with open(file_path, "wb") as f:
+            f.write(data)
+        count("bytes_written", len(data))
+        with self._lock:
+            self.metrics["snapshots"] += 1
+            self.metrics["bytes_written"] += len(data)
+        return file_path
+
+    def _resolve(self, cid: str, encoded: List[str]) -> Optional[Tuple[str, List[str]]]:
+        """Ref restaurada del checkpoint: velas del chunk (se lee solo si no es idéntico al bucket actual)."""
+        if chunk_id(encoded) == cid:
+            return cid, encoded
+        try:
+            return cid, candle_fragments(self.load_chunk(cid))
+        except (OSError, ValueError) as e:
+            logger.warning(f"SNAPSHOT REF {cid[:12]} NO DISPONIBLE: {e}")
+            return None
+
+    # --- Persistencia de la última ventana (CHECKPOINT-01) ---
+    def export_latest(self) -> Dict[str, List[Tuple[int, str]]]:
+        """Refs (bucket, chunk) de la última ventana por 'symbol|timeframe', en tipos planos (marshal)."""
+        with self._lock:
+            return {f"{symbol}|{timeframe}": [(bucket, ref[0]) for bucket, ref in buckets.items()]
+                    for (symbol, timeframe), buckets in self._latest.items()}
+
+    def import_latest(self, refs: Dict[str, List[Tuple[int, str]]], overwrite: bool = False):
+        """
+        Restaura las refs de export_latest(). Por defecto las de este proceso tienen prioridad;
+        overwrite=True cuando las importadas son más recientes (refs devueltas por los shards).
+        """
+        with self._lock:
+            for key, buckets in refs.items():
+                symbol, _, timeframe = key.rpartition("|")
+                if overwrite or (symbol, timeframe) not in self._latest:
+                    self._latest[(symbol, timeframe)] = {int(bucket): (cid, None) for bucket, cid in buckets}
+
+    @staticmethod
+    def _find_run(chunk: List[str], candles: List[str]) -> Optional[int]:
+        """Offset de `candles` como tramo contiguo de un chunk existente (o None)."""
+        try:
+            offset = chunk.index(candles[0])
+        except ValueError:
+            return None
+        return offset if chunk[offset:offset + len(candles)] == candles else None
+
+    # --- Lectura / verificación forense ---
+    def load_chunk(self, cid: str, manifest_format: str = MANIFEST_FORMAT) -> List[List[Any]]:
+        suffix = MANIFEST_FORMATS[manifest_format]
+        file_path = self.chunk_path(cid, suffix)
+        if suffix == ".json":
+            with open(file_path, "rb") as f:
+                data = f.read()
+            if hashlib.sha256(data).hexdigest() != cid:
+                raise ValueError(f"SNAPSHOT_CHUNK_CORRUPT: {cid}")
+            return json.loads(data)
+        with open(file_path, "rb") as f:
+            candles = SnapshotReader(f.read()).candles()
+        if chunk_id(candle_fragments(candles)) != cid:
+            raise ValueError(f"SNAPSHOT_CHUNK_CORRUPT: {cid}")
+        return candles
+
+    def _read(self, file_path: str) -> Tuple[bytes, Optional[Dict[str, Any]]]:
+        """(bytes del archivo, manifiesto o None si es un JSON legacy / bloque binario suelto)."""
+        with open(file_path, "rb") as f:
+            raw = f.read()
+        if is_block(raw):
+            return raw, None
+        data = json.loads(raw)
+        return raw, data if data.get("format") in MANIFEST_FORMATS else None
+
+    def load(self, file_path: str) -> Dict[str, Any]:
+        """Snapshot completo (dict legacy DATA-ORIGIN-02) desde un manifiesto, un bloque .tosb o un JSON legacy."""
+        raw, manifest = self._read(file_path)
+        if manifest is None:
+            return block_to_snapshot(raw) if is_block(raw) else json.loads(raw)
+        ohlcv: List[List[Any]] = []
+        chunks: Dict[str, List[List[Any]]] = {}
+        for cid, offset, length in manifest["chunks"]:
+            if cid not in chunks:
+                chunks[cid] = self.load_chunk(cid, manifest["format"])
+            ohlcv.extend(chunks[cid][offset:offset + length])
+        if len(ohlcv) != manifest["candles"]:
+            raise ValueError(f"SNAPSHOT_INCOMPLETE: {file_path} ({len(ohlcv)}/{manifest['candles']} velas)")
+        return {k: (ohlcv if k == "ohlcv" else manifest[k]) for k in SNAPSHOT_KEYS}
+
+    def arrays(self, file_path: str) -> Dict[str, np.ndarray]:
+        """
+        Columnas NumPy (timestamp int64, OHLCV float64) del snapshot; un manifiesto concatena
+        sus chunks. Lectura sin copia de un bloque .tosb: SnapshotReader(ruta).columns().
+        """
+        raw, manifest = self._read(file_path)
+        if manifest is None or manifest["format"] != MANIFEST_FORMAT:
+            if is_block(raw):
+                return {name: SnapshotReader(raw).columns()[name] for name in COLUMNS}
+            return self._table(self.load(file_path)["ohlcv"])
+        parts = {name: [] for name in COLUMNS}
+        for cid, offset, length in manifest["chunks"]:
+            with open(self.chunk_path(cid), "rb") as f:
+                columns = SnapshotReader(f.read()).columns()
+            for name in COLUMNS:
+                parts[name].append(columns[name][offset:offset + length])
+        if not manifest["chunks"]:
+            return self._table([])
+        return {name: np.concatenate(values) for name, values in parts.items()}
+
+    @staticmethod
+    def _table(ohlcv: List[List[Any]]) -> Dict[str, np.ndarray]:
+        table = np.array([[np.nan if v is None else v for v in c] for c in ohlcv], dtype=np.float64).reshape(-1, 6)
+        return {name: (table[:, j].astype(np.int64) if j == 0 else table[:, j]) for j, name in enumerate(COLUMNS)}
+
+    def read_bytes(self, file_path: str) -> bytes:
+        """Bytes exactos del archivo JSON legacy (json.dump indent=2) del snapshot."""
+        raw, manifest = self._read(file_path)
+        if manifest is None and not is_block(raw):
+            return raw
+        return legacy_json(self.load(file_path))
+
+    def verify(self, file_path: str) -> bool:
+        """Recalcula snapshot_hash sobre el snapshot reconstruido."""
+        try:
+            snapshot = self.load(file_path)
+        except (OSError, ValueError) as e:
+            logger.error(f"SNAPSHOT VERIFY FAILED ({file_path}): {e}")
+            return False
+        return snapshot_hash(snapshot) == snapshot.get("snapshot_hash")
+
+
+# Almacén del proceso (índice de chunks compartido por los hilos de adquisición)
+SNAPSHOTS = SnapshotStore()
+
+
+def load_snapshot(file_path: str) -> Dict[str, Any]:
+    return SNAPSHOTS.load(file_path)
+
+
+def verify_snapshot(file_path: str) -> bool:
+    return SNAPSHOTS.verify(file_path)
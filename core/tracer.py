@@ -0,0 +1,224 @@
+import os
+import json
+import time
+import threading
+import logging
+import logging.handlers
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger("TITAN-OMNI.TRACE")
+
+# Prefijos de métodos ccxt que generan una petición HTTP (también los usa core/venues.py)
+NETWORK_PREFIXES = ("fetch", "load_markets", "create", "cancel", "edit")
+
+
+class _NoopSpan:
+    """Span compartido cuando el tracing está desactivado: sin reloj, sin asignaciones."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set(self, **attrs):
+        pass
+
+
+_NOOP = _NoopSpan()
+
+
+class _Span:
+    __slots__ = ("tracer", "name", "attrs", "parent", "start", "started_at", "calls0", "bytes0")
+
+    def __init__(self, tracer: "Tracer", name: str, attrs: Dict[str, Any]):
+        self.tracer = tracer
+        self.name = name
+        self.attrs = attrs
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def __enter__(self):
+        local = self.tracer._thread_state()
+        self.parent = local.stack[-1] if local.stack else None
+        local.stack.append(self.name)
+        self.calls0 = local.exchange_calls
+        self.bytes0 = local.bytes_written
+        self.started_at = time.time()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        wall_ms = (time.perf_counter() - self.start) * 1000
+        local = self.tracer._local
+        local.stack.pop()
+        record = {
+            "cycle_id": self.tracer.cycle_id,
+            "span": self.name,
+            "parent": self.parent,
+            "thread": threading.current_thread().name,
+            "ts": round(self.started_at, 6),
+            "wall_ms": round(wall_ms, 3),
+            "exchange_calls": local.exchange_calls - self.calls0,
+            "bytes_written": local.bytes_written - self.bytes0,
+        }
+        if self.attrs:
+            record["attrs"] = self.attrs
+        if exc_type is not None:
+            record["error"] = exc_type.__name__
+        self.tracer._record(record)
+        return False
+
+
+class Tracer:
+    """
+    TRACE-01: Tracer de Ciclo por Spans.
+    span(nombre) mide tiempo de pared, llamadas al exchange (TracedExchange) y bytes escritos
+    (count) por hilo; los spans anidados incluyen los contadores de sus hijos del mismo hilo
+    (fetch/snapshot del pool de adquisición son spans raíz de su hilo, no del span "cycle").
+    Los spans del ciclo se acumulan en memoria y se vuelcan al cerrar el ciclo a un JSONL
+    rotativo (TRACE_FILE, TRACE_MAX_BYTES x TRACE_BACKUPS); summary() alimenta el registro
+    de auditoría CYCLE_TRACE. Desactivado (TRACE_ENABLED=false, por defecto) span() devuelve
+    un span no-op compartido y count() retorna de inmediato.
+    La configuración TRACE_* se resuelve en el primer uso, no al importar (main.py carga .env
+    después de los imports).
+    Agregado p50/p95/p99 por etapa: python scripts/trace_report.py
+    """
+    def __init__(self, enabled: Optional[bool] = None, path: Optional[str] = None,
+                 max_bytes: Optional[int] = None, backups: Optional[int] = None):
+        self._enabled = enabled
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.cycle_id: Optional[str] = None
+        self._spans: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._writer: Optional[logging.Logger] = None
+
+    @property
+    def enabled(self) -> bool:
+        if self._enabled is None:
+            self._enabled = os.getenv("TRACE_ENABLED", "false").lower() == "true"
+        return self._enabled
+
+    @enabled.setter
+    def enabled(self, value: bool):
+        self._enabled = value
+
+    # --- Instrumentación ---
+    def span(self, name: str, **attrs):
+        if not self.enabled:
+            return _NOOP
+        return _Span(self, name, attrs)
+
+    def count(self, counter: str, n: int = 1):
+        """Suma a un contador del hilo actual ("exchange_calls" | "bytes_written")."""
+        if not self.enabled:
+            return
+        local = self._thread_state()
+        setattr(local, counter, getattr(local, counter) + n)
+
+    def _thread_state(self):
+        local = self._local
+        if not hasattr(local, "stack"):
+            local.stack = []
+            local.exchange_calls = 0
+            local.bytes_written = 0
+        return local
+
+    def _record(self, record: Dict[str, Any]):
+        with self._lock:
+            self._spans.append(record)
+
+    # --- Ciclo ---
+    def begin_cycle(self, cycle_id: str):
+        if not self.enabled:
+            return
+        with self._lock:
+            self.cycle_id = cycle_id
+            self._spans = []
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """Agregado por etapa del ciclo en curso: n, wall_ms total/max, llamadas y bytes."""
+        with self._lock:
+            spans = list(self._spans)
+        stages: Dict[str, Dict[str, Any]] = {}
+        for s in spans:
+            stage = stages.setdefault(s["span"], {"n": 0, "wall_ms": 0.0, "max_ms": 0.0, "exchange_calls": 0, "bytes_written": 0})
+            stage["n"] += 1
+            stage["wall_ms"] += s["wall_ms"]
+            stage["max_ms"] = max(stage["max_ms"], s["wall_ms"])
+            stage["exchange_calls"] += s["exchange_calls"]
+            stage["bytes_written"] += s["bytes_written"]
+        return stages
+
+    def summary_facts(self) -> List[str]:
+        """Facts de auditoría: trace_<etapa>=n/total_ms/max_ms/llamadas/bytes."""
+        return [
+            f"trace_{name}=n:{s['n']}|ms:{s['wall_ms']:.1f}|max_ms:{s['max_ms']:.1f}|calls:{s['exchange_calls']}|bytes:{s['bytes_written']}"
+            for name, s in sorted(self.summary().items())
+        ]
+
+    def end_cycle(self):
+        """Vuelca los spans del ciclo al JSONL rotativo."""
+        if not self.enabled:
+            return
+        with self._lock:
+            spans, self._spans = self._spans, []
+        if not spans:
+            return
+        try:
+            writer = self._file_writer()
+            for record in spans:
+                writer.info(json.dumps(record, default=str))
+        except Exception as e:
+            logger.error(f"FAILED TO WRITE TRACE: {e}")
+
+    def _file_writer(self) -> logging.Logger:
+        if self._writer is None:
+            self.path = self.path or os.getenv("TRACE_FILE", "data/traces/trace.jsonl")
+            if self.max_bytes is None:
+                self.max_bytes = int(os.getenv("TRACE_MAX_BYTES", str(10 * 1024 * 1024)))
+            if self.backups is None:
+                self.backups = int(os.getenv("TRACE_BACKUPS", "5"))
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            handler = logging.handlers.RotatingFileHandler(self.path, maxBytes=self.max_bytes, backupCount=self.backups, encoding="utf-8")
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            writer = logging.getLogger(f"TITAN-OMNI.TRACE.FILE.{id(self)}")
+            writer.propagate = False
+            writer.setLevel(logging.INFO)
+            writer.addHandler(handler)
+            self._writer = writer
+        return self._writer
+
+
+class TracedExchange:
+    """Envuelve un exchange ccxt: cada método de red cuenta una llamada en el span activo del hilo."""
+    def __init__(self, exchange, tracer: Tracer):
+        self._exchange = exchange
+        self._tracer = tracer
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._exchange, name)
+        if not callable(attr) or not name.startswith(NETWORK_PREFIXES):
+            return attr
+
+        def call(*args, **kwargs):
+            self._tracer.count("exchange_calls")
+            return attr(*args, **kwargs)
+        return call
+
+
+# Tracer del proceso (un bot por proceso); la instrumentación usa span()/count() de este módulo
+TRACER = Tracer()
+
+
+def span(name: str, **attrs):
+    return TRACER.span(name, **attrs)
+
+
+def count(counter: str, n: int = 1):
+    TRACER.count(counter, n)
@@ -0,0 +1,108 @@
+import os
+import time
+import threading
+import logging
+from typing import Any, Dict, Optional
+
+from core.exchange_proxy import CachingExchange
+from core.tracer import NETWORK_PREFIXES, TRACER, TracedExchange
+
+logger = logging.getLogger("TITAN-OMNI.VENUES")
+
+
+class VenueRateLimiter:
+    """
+    SCANNER-VENUES-01: Contabilidad de rate-limit por venue.
+    Intervalo mínimo entre peticiones (ms). Con min_interval_ms=0 solo contabiliza.
+    PIPE-CONC-01: Thread-safe; es el único throttle fiable cuando varios hilos (prefetch)
+    comparten un cliente ccxt, cuyo throttle propio no lo es.
+    """
+    def __init__(self, min_interval_ms: float = 0.0):
+        self.min_interval = max(0.0, float(min_interval_ms)) / 1000.0
+        self._next_allowed = 0.0
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.throttled = 0
+        self.waited_ms = 0.0
+
+    def acquire(self):
+        with self._lock:
+            now = time.monotonic()
+            wait = max(0.0, self._next_allowed - now)
+            self._next_allowed = max(now, self._next_allowed) + self.min_interval
+            self.requests += 1
+            if wait > 0:
+                self.throttled += 1
+                self.waited_ms += wait * 1000
+        if wait > 0:
+            time.sleep(wait)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "throttled": self.throttled,
+                "waited_ms": round(self.waited_ms, 3),
+                "min_interval_ms": self.min_interval * 1000,
+            }
+
+
+class RateLimitedExchange:
+    """Envuelve un exchange ccxt: cada método de red pasa por el limitador de su venue."""
+    def __init__(self, exchange, limiter: VenueRateLimiter):
+        self._exchange = exchange
+        self.limiter = limiter
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._exchange, name)
+        if not callable(attr) or not name.startswith(NETWORK_PREFIXES):
+            return attr
+
+        def call(*args, **kwargs):
+            self.limiter.acquire()
+            return attr(*args, **kwargs)
+        return call
+
+
+class Venue:
+    """Un exchange de escaneo: nombre, cliente (caché -> rate-limit -> ccxt) y su limitador."""
+    def __init__(self, name: str, exchange, limiter: VenueRateLimiter, primary: bool = False):
+        self.name = name
+        self.exchange = exchange
+        self.limiter = limiter
+        self.primary = primary
+
+    def stats(self) -> Dict[str, Any]:
+        stats = {"venue": self.name, "primary": self.primary, "rate_limit": self.limiter.stats()}
+        if isinstance(self.exchange, CachingExchange):
+            stats["cache_hit_rate"] = round(self.exchange.hit_rate(), 4)
+        return stats
+
+
+def build_venue(name: str, exchange=None, min_interval_ms: Optional[float] = None, cache: bool = True, primary: bool = False) -> Venue:
+    """
+    Crea un Venue de escaneo.
+    - exchange=None: cliente ccxt público (sin credenciales) con throttling propio por venue
+      (rateLimit del exchange o SCANNER_VENUE_MIN_INTERVAL_MS).
+    - exchange dado (ej. venue primario de ejecución): espaciado por su rateLimit aunque ccxt
+      ya limite (PIPE-CONC-01: los hilos de prefetch comparten el cliente).
+    primary: venue de ejecución (reutiliza el CycleContext del ciclo).
+    """
+    if exchange is None:
+        import ccxt
+        exchange = getattr(ccxt, name)({"enableRateLimit": False})
+        # TRACE-01: Llamadas de red reales del venue (bajo throttling y caché)
+        if TRACER.enabled:
+            exchange = TracedExchange(exchange, TRACER)
+    if min_interval_ms is None:
+        override = os.getenv("SCANNER_VENUE_MIN_INTERVAL_MS")
+        rate_limit = getattr(exchange, "rateLimit", 0)
+        if override is not None and getattr(exchange, "enableRateLimit", False) is not True:
+            min_interval_ms = float(override)
+        else:
+            min_interval_ms = float(rate_limit) if isinstance(rate_limit, (int, float)) else 0.0
+    limiter = VenueRateLimiter(min_interval_ms)
+    client = RateLimitedExchange(exchange, limiter)
+    if cache:
+        client = CachingExchange(client)
+    return Venue(name, client, limiter, primary=primary)
@@ -33,12 +33,33 @@ class WriteAheadLog:
         self.worker_thread.start()
         logger.info("WAL: Worker started.")
 
-    def stop(self):
+    def stop(self, drain=True):
         self.running = False
         if self.worker_thread:
             self.worker_thread.join(timeout=2.0)
+        if drain:
+            self.drain()
         logger.info("WAL: Worker stopped.")
 
+    def drain(self):
+        """
+        DAEMON-01: Persiste de forma síncrona todo lo pendiente en la cola (apagado ordenado).
+        Retorna el número de escrituras drenadas.
+        """
+        drained = 0
+        while True:
+            try:
+                file_path, data = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            self._persist_atomic(file_path, data)
+            self.queue.task_done()
+            drained += 1
+        self.metrics["queue_len"] = self.queue.qsize()
+        if drained:
+            logger.info(f"WAL: {drained} escrituras pendientes drenadas.")
+        return drained
+
     def write(self, file_path, data):
         """
         Enqueues a write operation.
@@ -58,7 +79,10 @@ class WriteAheadLog:
             try:
                 # Flush all pending
                 while not self.queue.empty():
-                    file_path, data = self.queue.get()
+                    try:
+                        file_path, data = self.queue.get_nowait()
+                    except queue.Empty:
+                        break
                     self._persist_atomic(file_path, data)
                     self.queue.task_done()
                     self.metrics["queue_len"] = self.queue.qsize()
@@ -5,6 +5,8 @@ import os
 import time
 import json
 
+from core.audit_log import AuditLog
+
 # Configuración de Página
 st.set_page_config(
     page_title="TITAN-OMNI Governance Dashboard v7.0",
@@ -95,7 +97,11 @@ logs_dir = "data/forensics"
 if os.path.exists(logs_dir):
     log_files = [f for f in os.listdir(logs_dir) if f.endswith(".jsonl")]
     selected_log = st.selectbox("Select Audit Log", log_files)
-    if selected_log:
+    if selected_log == AuditLog.ACTIVE_FILE:
+        # AUDIT-SEGMENTS-01: últimas 50 entradas vía índice (seek), sin leer el log completo
+        lines = AuditLog(logs_dir, readonly=True).tail(50)
+        st.code("".join(lines), language="json")
+    elif selected_log:
         with open(os.path.join(logs_dir, selected_log), "r") as f:
             lines = f.readlines()[-50:] # Last 50 lines
             st.code("".join(lines), language="json")
@@ -5,11 +5,17 @@ import json
 from supabase import create_client, Client
 from datetime import datetime, timezone
 
+from core.outbox import outbox
+
 class SupabaseClient:
     def __init__(self):
         self.mode = os.getenv("SYSTEM_MODE", "DRY_RUN").upper()
         self.client = None
+        self.outbox = None
         self._init_client()
+        # OUTBOX-01: Escrituras vía spool durable + envío por lotes en segundo plano
+        if self.client is not None:
+            self.outbox = outbox(self.client)
 
     def _init_client(self):
         url = os.getenv("SUPABASE_URL")
@@ -78,10 +84,17 @@ class SupabaseClient:
             pass
 
     def close(self):
-        pass
+        """OUTBOX-01: Vacía el outbox (lo no enviado queda en el spool para el próximo arranque)."""
+        if self.outbox is not None:
+            self.outbox.close()
+
+    def outbox_metrics(self):
+        return self.outbox.metrics() if self.outbox is not None else None
 
     def check_log_exists(self, cycle_id):
         if not self.client: return False
+        if any(row.get("cycle_id") == cycle_id for row in self.outbox.pending_rows("execution_logs")):
+            return True
         try:
             res = self.client.table("execution_logs").select("cycle_id").eq("cycle_id", cycle_id).execute()
             return len(res.data) > 0
@@ -89,24 +102,27 @@ class SupabaseClient:
 
     def log_execution(self, cycle_id, action, reason, ai_payload=None):
         if not self.client: return
-        try:
-            data = {
-                "cycle_id": cycle_id,
-                "created_at": datetime.now(timezone.utc).isoformat(),
-                "action": action,
-                "reason": reason,
-                "ai_audit_payload": ai_payload,
-                "strategy_version": "v4.4.2"
-            }
-            self.client.table("execution_logs").insert(data).execute()
-        except Exception as e:
-            print(f"LOG ERROR: {e}")
+        data = {
+            "cycle_id": cycle_id,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "action": action,
+            "reason": reason,
+            "ai_audit_payload": ai_payload,
+            "strategy_version": "v4.4.2"
+        }
+        self.outbox.enqueue("execution_logs", data)
 
     # v4.4.2: Multi-Asset Filtered Portfolio
     def get_latest_portfolio_state(self, symbol):
         if not self.client:
             return 10000.0, 0.0, 0.0 # Default Paper State
-            
+
+        # OUTBOX-01: Una fila aún en el outbox es el estado más reciente
+        pending = [row for row in self.outbox.pending_rows("paper_wallet") if row.get("symbol") == symbol]
+        if pending:
+            row = pending[-1]
+            return float(row['cash_usd']), float(row['asset_qty']), float(row['last_entry_price'])
+
         try:
             res = self.client.table("paper_wallet") \
                 .select("cash_usd, asset_qty, last_entry_price") \
@@ -125,28 +141,23 @@ class SupabaseClient:
 
     def record_paper_state(self, cycle_id, cash, asset_qty, entry_price, symbol):
         if not self.client: return
-        try:
-            data = {
-                "created_at": datetime.now(timezone.utc).isoformat(),
-                "cash_usd": float(cash),
-                "asset_qty": float(asset_qty),
-                "last_entry_price": float(entry_price),
-                "cycle_id": cycle_id,
-                "symbol": symbol,
-                "strategy_version": "v4.4.2"
-            }
-            self.client.table("paper_wallet").insert(data).execute()
-        except:
-            pass
+        data = {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "cash_usd": float(cash),
+            "asset_qty": float(asset_qty),
+            "last_entry_price": float(entry_price),
+            "cycle_id": cycle_id,
+            "symbol": symbol,
+            "strategy_version": "v4.4.2"
+        }
+        self.outbox.enqueue("paper_wallet", data)
 
-    # EXEC-AUDIT-01: Persistencia Forense Best-Effort
+    # EXEC-AUDIT-01: Persistencia Forense (OUTBOX-01: durable, reintentos e idempotencia por clave natural)
     def log_audit_record(self, record_dict):
         if not self.client: return
-        try:
-            # Intentar escribir en tabla 'audit_records' si existe, o usar 'execution_logs' fallback
-            # Para v6.0 estricto, usamos una tabla dedicada o un campo JSONB en logs.
-            # Asumimos tabla 'audit_trail' para no ensuciar 'execution_logs' legacy.
-            self.client.table("audit_trail").insert(record_dict).execute()
-        except Exception as e:
-            # Silent Fail (Best Effort)
-            print(f"SUPABASE AUDIT REJECTED: {e}")
+        self.outbox.enqueue("audit_trail", record_dict)
+
+    # AUDIT-SINK-01: Lote de registros forenses (una escritura al spool por lote)
+    def log_audit_records(self, records):
+        if not self.client or not records: return
+        self.outbox.enqueue_many("audit_trail", records)
@@ -0,0 +1,29 @@
+-- Migration: 002_outbox_natural_keys.sql
+-- Description: audit_trail table and its natural key, used as on_conflict target by the Supabase outbox (OUTBOX-01)
+-- Date: 2026-10-18
+
+-- Replayed rows (after a crash or a lost response) are upserted with ignore_duplicates:
+-- each table needs a unique constraint on its natural key.
+-- execution_logs(cycle_id) and paper_wallet(cycle_id, symbol) are already UNIQUE in data/schema.sql.
+
+-- 1. Table: audit_trail (one row per AuditRecord, EXEC-AUDIT-01)
+create table if not exists audit_trail (
+    id bigserial primary key,
+    created_at timestamptz not null default now(),
+    cycle_id text not null,
+    "timestamp" timestamptz not null,
+    state text not null,
+    symbol text null, -- null for cycle-level records (CYCLE_TRACE)
+    market_regime text null,
+    execution_intent jsonb null,
+    ai_audit_result text null,
+    ai_audit_reason text null,
+    action text not null,
+    order_result jsonb null,
+    decision_facts jsonb not null default '[]'::jsonb,
+    errors jsonb not null default '[]'::jsonb
+);
+
+-- 2. Natural key: one record per (cycle, asset, action, timestamp)
+create unique index if not exists uq_audit_trail_natural on audit_trail(cycle_id, symbol, action, "timestamp") nulls not distinct;
+create index if not exists idx_audit_trail_cycle on audit_trail(cycle_id);
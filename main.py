@@ -9,12 +9,28 @@ from dotenv import load_dotenv
 
 # Import Core v6.0
 from core.governance import Governance
-from core.scanner import Scanner
+from core.scanner import Scanner, TierScheduler
 from core.market_regime import MarketRegime
 from core.execution_intent import ExecutionTicket
 from core.execution import ExecutionEngine
 from core.ai_auditor import AIAuditor
 from core.preflight import preflight # GOV-01: Explicit Import
+from core.candle_store import CandleStore
+from core.resample import derive_ohlcv, parity_check
+from core.indicators import IndicatorEngine
+from core.regime_cache import RegimeCache
+from core.prefetch import DataPrefetcher
+from core.cycle_context import CycleContext
+from core.exchange_proxy import CachingExchange
+from core.venues import build_venue
+from core.market_metadata import MarketMetadataCache
+from core.checkpoint import RuntimeCheckpoint
+from core.shard_scan import ShardedScan
+from core.deadline import CycleDeadline, CycleWatchdog, DeadlineExceeded
+from core.tracer import TRACER, TracedExchange, span
+from core.memory import MemoryTelemetry
+from core.audit_sink import AuditSink
+from core.snapshot_store import SNAPSHOTS
 from data.supabase_client import SupabaseClient
 
 # Configuración de Logging
@@ -29,17 +45,59 @@ class TitanOmniBot:
         self.state = "HUNTING" # Initial State
         self.cycle_id = str(uuid.uuid4())[:8]
         self.position = None # EXEC-STATE-01: Position Tracking
+        self.context = None # CYCLE-CTX-01: Snapshot de mercado del ciclo en curso
+        self.deadline = None # CYCLE-DEADLINE-01: Deadline del ciclo en curso
+        self.watchdog = CycleWatchdog()
+        self.memory = MemoryTelemetry() # MEM-TELEMETRY-01: RSS/pico por ciclo y etapa + presupuesto
         
         # Inicializar Componentes
         try:
             self.exchange = ccxt.kraken({
                 'apiKey': os.getenv("KRAKEN_API_KEY"),
                 'secret': os.getenv("KRAKEN_SECRET"),
-                'enableRateLimit': True
+                'enableRateLimit': True,
+                # CYCLE-DEADLINE-01: Cota explícita por petición (ms); las etapas no esperan más que su presupuesto
+                'timeout': int(os.getenv("EXCHANGE_TIMEOUT_MS", "10000"))
             })
+            # TRACE-01: Conteo de llamadas de red por span (bajo los proxies de caché: solo peticiones reales)
+            if TRACER.enabled:
+                self.exchange = TracedExchange(self.exchange, TRACER)
+            exchange_cache = os.getenv("EXCHANGE_CACHE", "true").lower() == "true"
+            # PIPE-CONC-01: Limitador thread-safe compartido por los hilos de prefetch (el throttle de ccxt no lo es)
+            # EXCHANGE-CACHE-01: Proxy con TTL por método y coalescing (compartido por todos los componentes)
+            primary = build_venue("kraken", exchange=self.exchange, cache=exchange_cache, primary=True)
+            self.exchange = primary.exchange
+            # SCANNER-VENUES-01: Venues de escaneo adicionales (datos públicos). Kraken sigue siendo el único venue de ejecución.
+            self.venues = []
+            venue_names = [v.strip().lower() for v in os.getenv("SCANNER_VENUES", "").split(",") if v.strip()]
+            if venue_names:
+                self.venues = [primary] + [build_venue(name) for name in venue_names if name != "kraken"]
+            # MARKET-META-01: Mercados desde disco (sin descarga completa en el arranque)
+            self.market_meta = MarketMetadataCache(self.exchange)
             self.supabase = SupabaseClient()
-            self.scanner = Scanner(self.exchange)
+            # AUDIT-SINK-01: Registros forenses en lote (group commit) fuera del camino de decisión
+            self.audit = AuditSink()
+            self.scanner = Scanner(self.exchange, venues=self.venues)
+            # DATA-CACHE-01: Velas locales incrementales (solo se descargan velas nuevas)
+            self.candle_store = CandleStore()
+            # CHECKPOINT-01: Arranque en caliente (estado, posición, indicadores, caché de régimen).
+            # Checkpoint corrupto -> CheckpointCorrupt -> FATAL (fail-closed: posición desconocida)
+            self.checkpoint = RuntimeCheckpoint() if os.getenv("RUNTIME_CHECKPOINT", "true").lower() == "true" else None
+            snapshot = self.checkpoint.load() if self.checkpoint is not None else None
+            # REGIME-LITE-01: Motor de régimen (numpy | stream | pandas_ta). pandas_ta = legacy.
+            self.regime_engine = os.getenv("REGIME_ENGINE", "numpy").lower()
+            self.indicators = IndicatorEngine(load=snapshot is None) if self.regime_engine == "stream" else None
+            # REGIME-CACHE-01: Régimen confirmado memoizado para timeframes MTF
+            self.regime_cache = RegimeCache(load=snapshot is None)
+            self.regime_cache_timeframes = [tf.strip() for tf in os.getenv("REGIME_CACHE_TIMEFRAMES", "1h,4h").split(",") if tf.strip()]
             self.execution_engine = ExecutionEngine(self.exchange, self.supabase)
+            # SCAN-SHARD-01: Adquisición multi-proceso (SCAN_SHARDS > 1); decisiones en este proceso
+            self.shard_scan = ShardedScan(scan_shard)
+            self.shard_exchange_factory = None # None -> cliente ccxt público por worker
+            if snapshot is not None:
+                RuntimeCheckpoint.restore(self, snapshot)
+                logger.info(f"CHECKPOINT: arranque en caliente ({self.checkpoint.last_load_ms:.2f} ms, {self.checkpoint.last_size} bytes) "
+                            f"estado={self.state} posición={self.position}")
             
             # [B] WAL Async Persistence
             from core.wal import WriteAheadLog
@@ -52,30 +110,94 @@ class TitanOmniBot:
             logger.critical(f"FATAL: Error inicializando componentes: {e}")
             sys.exit(1)
 
+    def save_state(self):
+        """CHECKPOINT-01: Persiste el estado de runtime (checkpoint binario o, si está desactivado, los JSON por componente)."""
+        if self.checkpoint is not None:
+            self.checkpoint.save(RuntimeCheckpoint.capture(self))
+            return
+        # REGIME-STREAM-01: Persistir estado incremental de indicadores
+        if self.indicators is not None:
+            self.indicators.save()
+        self.regime_cache.save()
+
+    def shutdown(self):
+        """DAEMON-01: Apagado ordenado (drena el WAL y persiste el estado de runtime)."""
+        try:
+            self.save_state()
+            self.shard_scan.shutdown()
+        finally:
+            self.audit.close()
+            # OUTBOX-01: Después del sink (que entrega su último lote al outbox)
+            if hasattr(self.supabase, "close"):
+                self.supabase.close()
+            self.wal.stop(drain=True)
+
     def run_cycle(self):
+        # CYCLE-DEADLINE-01: Deadline creado al inicio del ciclo + watchdog de ciclo colgado
+        self.deadline = CycleDeadline.for_exchange(self.exchange)
+        self.watchdog.arm(self.deadline)
+        # TRACE-01: Spans del ciclo -> JSONL rotativo al cerrar el ciclo
+        TRACER.begin_cycle(self.cycle_id)
+        self.memory.begin_cycle()
+        try:
+            with span("cycle", state=self.state):
+                self._run_cycle()
+        finally:
+            self.watchdog.disarm()
+            TRACER.end_cycle()
+
+    def _run_cycle(self):
         logger.info(f"--- INICIO CICLO v6.0 [{self.cycle_id}] ESTADO: {self.state} ---")
         
         # 0. PREFLIGHT & GOVERNANCE LOCK (GOV-01)
         # Runtime verification of Integrity before any logic runs.
         # FAIL-CLOSED: Exit cycle immediately if false.
-        pf_ok, pf_reason, pf_report = preflight()
+        with span("preflight"):
+            pf_ok, pf_reason, pf_report = preflight()
         if not pf_ok:
             logger.critical(f"FATAL: PREFLIGHT FAILED. ABORTING CYCLE. Reason: {pf_reason}")
             # In a real daemon we might sleep/retry, but for strict audit compliance we STOP.
             sys.exit(2) # Exit Code 2 = Governance Violation
 
         # 1. GOBERNANZA (Gatekeeper)
-        gov_ok, gov_reason = Governance.check_environment()
+        with span("governance"):
+            gov_ok, gov_reason = Governance.check_environment()
         if not gov_ok:
             logger.warning(f"CICLO ABORTADO POR GOBERNANZA: {gov_reason}")
             return
 
+        # MARKET-META-01: Refresco en segundo plano si la metadata expiró
+        self.market_meta.maybe_refresh()
+
+        # CYCLE-CTX-01: Balance/tickers/mercados memoizados para todo el ciclo
+        self.context = CycleContext(self.exchange, self.cycle_id, market_meta=self.market_meta, deadline=self.deadline)
+
         # MÁQUINA DE ESTADOS
-        if self.state == "HUNTING":
-            self._state_hunting()
-        elif self.state == "MANAGING":
-            self._state_managing()
-        
+        try:
+            if self.state == "HUNTING":
+                self._state_hunting()
+            elif self.state == "MANAGING":
+                self._state_managing()
+        finally:
+            # CHECKPOINT-01: También tras un fallo a mitad de ciclo (la posición puede haber cambiado)
+            self.save_state()
+        if isinstance(getattr(self.scanner, "tiers", None), TierScheduler):
+            self.scanner.tiers.save()
+
+        ctx = self.context.summary()
+        logger.info(f"CONTEXT: lecturas={ctx['reads']} refrescos={ctx['refreshes']}")
+        if isinstance(self.exchange, CachingExchange):
+            logger.info(f"EXCHANGE CACHE: hit_rate={self.exchange.hit_rate():.2%} stats={self.exchange.stats()}")
+        for venue in getattr(self, "venues", []):
+            logger.info(f"VENUE {venue.name}: {venue.stats()}")
+        logger.info(f"DEADLINE: {self.deadline.summary()}")
+        logger.info(f"MEMORY: {self.memory.summary()}")
+        outbox_metrics = self.supabase.outbox_metrics() if hasattr(self.supabase, "outbox_metrics") else None
+        if outbox_metrics is not None:
+            logger.info(f"OUTBOX: backlog={outbox_metrics['backlog']} oldest={outbox_metrics['oldest_age_s']}s "
+                        f"enviadas={outbox_metrics['shipped']} fallos={outbox_metrics['failures']} dead={outbox_metrics['dead_letters']}")
+        if TRACER.enabled:
+            self._log_cycle_trace()
         logger.info(f"--- FIN CICLO [{self.cycle_id}] ---")
 
     def _state_hunting(self):
@@ -84,12 +206,45 @@ class TitanOmniBot:
         # [C] Breadth Scanning - Single Trade Flag
         cycle_trade_executed = False
         assets_scanned_count = 0
+        prefetcher = None
+        # CYCLE-DEADLINE-01: Sin ciclo en curso (llamada directa) -> deadline desactivado
+        deadline = self.deadline if self.deadline is not None else CycleDeadline(total_s=0)
+        deadline_stage = None
 
         try:
             # 1. Obtener Lista Ordenada de Activos
-            target_assets = self.scanner.scan_assets()
+            deadline.start("scan")
+            with span("scan"):
+                target_assets = self.scanner.scan_assets(self.context)
+            try:
+                deadline.check("scan")
+            except DeadlineExceeded:
+                # FAIL-CLOSED: un ranking que llega fuera de presupuesto no se evalúa
+                deadline_stage = "scan"
+            self.memory.mark("scan")
             
-            # 2. Bucle Secuencial (NO Threads)
+            # SCANNER-TIERS-01: Registro del plan de tiers (qué se omite y por qué)
+            tiers = getattr(self.scanner, "tiers", None)
+            if not isinstance(tiers, TierScheduler):
+                tiers = None
+            if tiers is not None:
+                self._log_audit(None, "N/A", None, "N/A", "N/A", "SCAN_TIERS", None, tiers.plan_facts(), [])
+            
+            # PIPE-CONC-01: Adquisición concurrente (descargas en paralelo, decisiones en orden de score)
+            # SCAN-SHARD-01: Con SCAN_SHARDS > 1 la adquisición se reparte entre procesos
+            deadline.start("acquire")
+            if deadline_stage is not None:
+                acquired = {}
+            elif self.shard_scan.enabled and len(target_assets) > 1:
+                with span("shard_acquire", assets=len(target_assets), shards=self.shard_scan.shards):
+                    acquired, prefetcher = self._sharded_acquisition(target_assets, deadline)
+            else:
+                prefetcher = DataPrefetcher()
+                acquired = self._acquisition_stage(prefetcher, target_assets, deadline)
+            deadline.start("decide")
+            self.memory.mark("acquire")
+            
+            # 2. Bucle Secuencial de Decisión (las descargas MTF siguen en curso en el pool)
             # [C] Scan Loop - Iterate ALL
             for i, target_asset in enumerate(target_assets):
                 assets_scanned_count += 1
@@ -105,6 +260,23 @@ class TitanOmniBot:
                     self._log_audit(target_asset, "N/A", None, "N/A", "N/A", "SKIP_ONE_TRADE_LIMIT", None, [f"asset_index={i}", f"asset={target_asset}", "one_trade_limit_reached=true"], [])
                     continue
 
+                # CYCLE-DEADLINE-01: Presupuesto agotado -> el resto de activos no se evalúa
+                if deadline_stage is None:
+                    try:
+                        deadline.check("decide")
+                    except DeadlineExceeded:
+                        deadline_stage = "decide"
+                if deadline_stage is not None:
+                    logger.warning(f"BREADTH SCAN {target_asset}: SKIP_DEADLINE (etapa {deadline_stage})")
+                    self._log_audit(target_asset, "N/A", None, "N/A", "N/A", "SKIP_DEADLINE", None, [f"asset_index={i}", f"asset={target_asset}", f"deadline_stage={deadline_stage}"] + deadline.facts(), [])
+                    continue
+
+                # MEM-TELEMETRY-01: Presupuesto de memoria superado -> no se abren posiciones (fail-closed)
+                if self.memory.over_budget():
+                    logger.warning(f"BREADTH SCAN {target_asset}: SKIP_MEMORY")
+                    self._log_audit(target_asset, "N/A", None, "N/A", "N/A", "SKIP_MEMORY", None, [f"asset_index={i}", f"asset={target_asset}", "memory_budget_exceeded=true"], [])
+                    continue
+
                 # Variables de contexto forense por activo
                 audit_symbol = target_asset
                 audit_regime = None
@@ -114,6 +286,10 @@ class TitanOmniBot:
                 audit_action = "SKIP"
                 audit_order = None
                 audit_facts = [f"asset_index={i}", f"asset={target_asset}"]
+                if tiers is not None:
+                    audit_facts.extend(tiers.facts(target_asset))
+                if getattr(self, "venues", None):
+                    audit_facts.extend(self.scanner.venue_facts(target_asset))
                 
                 # PROD-DEPLOY-01: Environment Evidence
                 env_trading_enabled = os.getenv("TRADING_ENABLED", "false").lower()
@@ -124,83 +300,35 @@ class TitanOmniBot:
                 audit_errors = []
                 
                 try:
-                    # Analizar Régimen MICRO (15m)
-                    ohlcv = self.exchange.fetch_ohlcv(target_asset, timeframe='15m', limit=250)
+                    # Analizar Régimen MICRO (15m) - datos de la etapa de adquisición
+                    pre = acquired[target_asset]
+                    if isinstance(pre, Exception):
+                        raise pre
+                    ohlcv, snapshot, regime, volatility = pre
                     
                     # DATA-ORIGIN-02: Snapshot OHLCV (HUNTING - 15m)
-                    from core.post_audit import save_ohlcv_snapshot
-                    snapshot = save_ohlcv_snapshot(
-                        cycle_id=self.cycle_id,
-                        state="HUNTING",
-                        symbol=target_asset,
-                        timeframe='15m',
-                        limit=250,
-                        ohlcv=ohlcv
-                    )
                     if snapshot["path"]:
                         audit_facts.append(f"ohlcv_15m_path={snapshot['path']}")
                         audit_facts.append(f"ohlcv_15m_hash={snapshot['hash']}")
                     
-                    df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-                    regime, volatility = MarketRegime.analyze(df)
                     audit_regime = regime
                     audit_facts.append(f"regime_15m={regime}")
+                    if tiers is not None:
+                        tiers.record_evaluation(target_asset, regime)
                     audit_facts.append(f"volatility={volatility:.2f}")
                     
                     logger.info(f"ANÁLISIS {target_asset} ({i+1}/{len(target_assets)}): Régimen={regime}")
 
-                    # --- MTF ACTIVATION (Phase 3-03) ---
-                    # Descargar y analizar 1h y 4h para Veto Direccional
-                    
-                    # 1H Analysis
-                    ohlcv_1h = self.exchange.fetch_ohlcv(target_asset, timeframe='1h', limit=250)
-                    snapshot_1h = save_ohlcv_snapshot(self.cycle_id, "HUNTING", target_asset, '1h', 250, ohlcv_1h)
-                    if snapshot_1h["path"]: audit_facts.append(f"ohlcv_1h_hash={snapshot_1h['hash']}")
-                    
-                    df_1h = pd.DataFrame(ohlcv_1h, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-                    regime_1h, _ = MarketRegime.analyze(df_1h)
-                    audit_facts.append(f"regime_1h={regime_1h}")
-
-                    # 4H Analysis
-                    ohlcv_4h = self.exchange.fetch_ohlcv(target_asset, timeframe='4h', limit=250)
-                    snapshot_4h = save_ohlcv_snapshot(self.cycle_id, "HUNTING", target_asset, '4h', 250, ohlcv_4h)
-                    if snapshot_4h["path"]: audit_facts.append(f"ohlcv_4h_hash={snapshot_4h['hash']}")
-                    
-                    df_4h = pd.DataFrame(ohlcv_4h, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-                    regime_4h, _ = MarketRegime.analyze(df_4h)
-                    audit_facts.append(f"regime_4h={regime_4h}")
-
-                    # MTF VETO LOGIC (Directional Alignment)
-                    # Rule: Si Micro BULL -> Macro (1h/4h) NO puede ser BEAR.
-                    # Rule: Si Data Missing -> FAIL-CLOSED.
-                    
-                    mtf_ok = True
-                    mtf_reason = "ALIGNED"
-                    
-                    # Fail-Closed Checks
-                    if not ohlcv_1h or not ohlcv_4h:
-                        mtf_ok = False
-                        mtf_reason = "MTF_DATA_MISSING"
-                    
-                    elif "BULL" in regime:
-                        if "BEAR" in regime_1h or "BEAR" in regime_4h:
-                            mtf_ok = False
-                            mtf_reason = f"MTF_MISMATCH_BEAR_MACRO (1h={regime_1h}, 4h={regime_4h})"
-                    
-                    # (Opcional) Si Micro BEAR y fueramos a shortear... (v6.0 solo compra BULL)
-                    elif "BEAR" in regime:
-                        # Si tuvieramos estrategia short, validariamos no BULL en macro.
-                        pass
-                        
-                    audit_facts.append(f"mtf_ok={mtf_ok}")
-                    audit_facts.append(f"mtf_reason={mtf_reason}")
-                    
-                    if not mtf_ok:
-                         audit_action = "SKIP_MTF"
-                         logger.info(f"MTF VETO {target_asset}: {mtf_reason}")
-                         # Log y Next
-                         self._log_audit(audit_symbol, audit_regime, audit_intent, audit_ai_result, audit_ai_reason, audit_action, audit_order, audit_facts, audit_errors)
-                         continue
+                    # PIPE-LAZY-01: Pipeline con corto-circuito (gate más barato primero)
+                    # 15m -> Capital -> MTF. Solo un 15m BULL puede terminar en ticket: sin él,
+                    # ni el capital ni el veto MTF pueden cambiar la decisión.
+                    if "BULL" not in regime:
+                        audit_facts.append("stage_capital=skipped")
+                        audit_facts.append("stage_mtf=skipped")
+                        audit_facts.append("stage_skip_reason=REGIME_15M_NOT_BULL")
+                        logger.info(f"SKIP {target_asset}: Régimen 15m {regime} (capital/MTF no evaluados)")
+                        self._log_audit(audit_symbol, audit_regime, audit_intent, audit_ai_result, audit_ai_reason, audit_action, audit_order, audit_facts, audit_errors)
+                        continue
 
                     # DUST-LOGIC-01: Capital Check (ACTUALIZADO PHASE 3-04)
                     # Gestión de Capital Real y Segregación
@@ -208,7 +336,7 @@ class TitanOmniBot:
                     capital_usd = 0.0
                     try:
                         # 1. Fetch Real Equity (FAIL-CLOSED)
-                        bal = self.exchange.fetch_balance()
+                        bal = self.context.balance()
                         if not bal or 'total' not in bal or 'USDT' not in bal['total']:
                              logger.critical("CAPITAL CHECK FAILED: No USDT total balance found.")
                              audit_errors.append("CAPITAL_READ_FAILURE")
@@ -219,13 +347,14 @@ class TitanOmniBot:
                         
                         # 2. Init/Update Capital Manager
                         from core.capital_manager import CapitalManager
-                        # [B] Pass WAL for async persistence
-                        cap_mgr = CapitalManager(current_equity, wal=self.wal) 
-                        realized_profit = cap_mgr.update(current_equity)
-                        
-                        # 3. Get Safe Sizing Capital
-                        sizing_capital = cap_mgr.get_safe_capital()
-                        metrics = cap_mgr.get_state_metrics()
+                        with span("capital", symbol=target_asset):
+                            # [B] Pass WAL for async persistence
+                            cap_mgr = CapitalManager(current_equity, wal=self.wal) 
+                            realized_profit = cap_mgr.update(current_equity)
+                            
+                            # 3. Get Safe Sizing Capital
+                            sizing_capital = cap_mgr.get_safe_capital()
+                            metrics = cap_mgr.get_state_metrics()
                         
                         # 4. Log Forensic Facts
                         audit_facts.append(f"cycle_id={metrics['cycle_id']}")
@@ -241,6 +370,8 @@ class TitanOmniBot:
                         if capital_usd < 10.0:
                              audit_action = "SKIP_DUST"
                              audit_facts.append(f"capital_insufficient={capital_usd}")
+                             audit_facts.append("stage_mtf=skipped")
+                             audit_facts.append("stage_skip_reason=DUST_CAPITAL")
                              logger.warning(f"SKIP {target_asset}: Capital Insuficiente ({capital_usd} < 10)")
                              self._log_audit(audit_symbol, audit_regime, audit_intent, audit_ai_result, audit_ai_reason, audit_action, audit_order, audit_facts, audit_errors)
                              continue
@@ -250,7 +381,53 @@ class TitanOmniBot:
                         audit_errors.append(f"CAPITAL_CRITICAL_{str(e)}")
                         # FAIL-CLOSED
                         break
+                    audit_facts.append("stage_capital=passed")
+                    
+                    # --- MTF ACTIVATION (Phase 3-03) ---
+                    # Obtener y analizar 1h y 4h para Veto Direccional
+                    # MTF-RESAMPLE-01: Derivados localmente desde 15m cuando hay cobertura
+                    
+                    # 1H / 4H Analysis (PIPE-CONC-01: adquiridos en paralelo para candidatos BULL)
+                    mtf_key = ("mtf", target_asset)
+                    mtf = deadline.result(prefetcher, mtf_key, "decide") if prefetcher.has(mtf_key) else self._acquire_mtf(target_asset, ohlcv)
+                    regime_1h, has_1h, regime_4h, has_4h, mtf_facts = mtf
+                    audit_facts.extend(mtf_facts)
+                    audit_facts.append(f"regime_1h={regime_1h}")
+                    audit_facts.append(f"regime_4h={regime_4h}")
+
+                    # MTF VETO LOGIC (Directional Alignment)
+                    # Rule: Si Micro BULL -> Macro (1h/4h) NO puede ser BEAR.
+                    # Rule: Si Data Missing -> FAIL-CLOSED.
+                    
+                    mtf_ok = True
+                    mtf_reason = "ALIGNED"
+                    
+                    # Fail-Closed Checks
+                    if not has_1h or not has_4h:
+                        mtf_ok = False
+                        mtf_reason = "MTF_DATA_MISSING"
+                    
+                    elif "BULL" in regime:
+                        if "BEAR" in regime_1h or "BEAR" in regime_4h:
+                            mtf_ok = False
+                            mtf_reason = f"MTF_MISMATCH_BEAR_MACRO (1h={regime_1h}, 4h={regime_4h})"
+                    
+                    # (Opcional) Si Micro BEAR y fueramos a shortear... (v6.0 solo compra BULL)
+                    elif "BEAR" in regime:
+                        # Si tuvieramos estrategia short, validariamos no BULL en macro.
+                        pass
+                        
+                    audit_facts.append("stage_mtf=evaluated")
+                    audit_facts.append(f"mtf_ok={mtf_ok}")
+                    audit_facts.append(f"mtf_reason={mtf_reason}")
                     
+                    if not mtf_ok:
+                         audit_action = "SKIP_MTF"
+                         logger.info(f"MTF VETO {target_asset}: {mtf_reason}")
+                         # Log y Next
+                         self._log_audit(audit_symbol, audit_regime, audit_intent, audit_ai_result, audit_ai_reason, audit_action, audit_order, audit_facts, audit_errors)
+                         continue
+
                     # ... (rest of the hunting logic)
                     # This is where the AI and Risk Gate logic would go, leading to a ticket
                     # For now, let's assume a ticket is created for demonstration purposes
@@ -297,12 +474,22 @@ class TitanOmniBot:
                             symbol=target_asset,
                             action="BUY",
                             order_type="MARKET",
-                            quantity=capital_usd / df.iloc[-1]['close'] if not df.empty else 0.0, # Example quantity
+                            # MARKET-META-01: Cantidad redondeada a la precisión del mercado
+                            quantity=self.market_meta.round_amount(target_asset, capital_usd / ohlcv[-1][4]) if ohlcv else 0.0,
                             regime=regime,
                             reason="HUNTING_BULL_REGIME"
                         )
                         audit_intent = ticket
-                        audit_ok, audit_reason = self.auditor.audit_intent(ticket, regime)
+                        # MARKET-META-01: Lote / nocional mínimos tras el redondeo (un lote inválido no se audita ni se envía)
+                        limits_ok, limits_reason = self.market_meta.check_limits(target_asset, ticket.quantity, ohlcv[-1][4]) if ohlcv else (False, "NO_OHLCV")
+                        audit_facts.append(f"market_limits={limits_reason}")
+                        if not limits_ok:
+                            logger.info(f"SKIP {target_asset}: {limits_reason}")
+                            audit_action = "SKIP"
+                            self._log_audit(audit_symbol, audit_regime, audit_intent, audit_ai_result, audit_ai_reason, audit_action, audit_order, audit_facts, audit_errors)
+                            continue
+                        with span("ai_audit", symbol=target_asset):
+                            audit_ok, audit_reason = self.auditor.audit_intent(ticket, regime)
                         audit_ai_result = "APPROVED" if audit_ok else "REJECTED"
                         audit_ai_reason = audit_reason
 
@@ -324,9 +511,13 @@ class TitanOmniBot:
                             audit_action = "SKIP_AI_VETO" # Ensure it's skipped
                             
                         if audit_ok: # Only proceed if AI approved (no fallback to trade in hunting)
+                            # CYCLE-DEADLINE-01: No se inicia RiskGate + orden sin tiempo para completarlos
+                            if not deadline.reserve("execution"):
+                                raise DeadlineExceeded("execution")
                             # RISK-GATE-01: Pre-Trade Check
                             from core.risk_gate import RiskGate
-                            gate_ok, gate_reason, gate_metrics = RiskGate.pre_trade_check(self.exchange, audit_symbol, self.supabase)
+                            with span("risk_gate", symbol=audit_symbol):
+                                gate_ok, gate_reason, gate_metrics = RiskGate.pre_trade_check(self.exchange, audit_symbol, self.supabase, context=self.context)
                             
                             if not gate_ok:
                                 logger.warning(f"RISK GATE BLOCK {target_asset}: {gate_reason}")
@@ -348,10 +539,13 @@ class TitanOmniBot:
 
                                 # EXECUTION
                                 logger.info(f"EJECUTANDO ORDEN REAL: {audit_action} {target_asset}") # Changed from 'action' to 'audit_action'
-                                execution_result = self.execution_engine.execute(ticket)
+                                with span("execution", symbol=audit_symbol, action=audit_action):
+                                    execution_result = self.execution_engine.execute(ticket, context=self.context)
                                 
                                 audit_order = execution_result
                                 if execution_result["status"] == "FILLED":
+                                    # El balance memoizado ya no refleja la cuenta
+                                    self.context.invalidate("balance")
                                     audit_action = "EXECUTED"
                                     logger.info(f"ORDEN EJECUTADA: {execution_result}")
                                     # Position Capture
@@ -362,6 +556,7 @@ class TitanOmniBot:
                                         "entry_price": execution_result.get("fill_price", 0.0) # Changed from 'result' to 'execution_result'
                                     }
                                     self.state = "MANAGING" 
+                                    self.save_state()
                                     audit_facts.append("position_opened=true")
                                     
                                     # Loguear ESTE activo y continuar (Limit 1 Trade)
@@ -379,6 +574,12 @@ class TitanOmniBot:
                         if not audit_action: audit_action = "SKIP"
                         logger.info(f"SKIP {target_asset}: {audit_reason}")
 
+                except DeadlineExceeded as e:
+                    # CYCLE-DEADLINE-01: Fail-closed por presupuesto agotado (no es un error del activo)
+                    logger.warning(f"SKIP_DEADLINE {target_asset}: {e}")
+                    audit_action = "SKIP_DEADLINE"
+                    audit_facts.append(f"deadline_stage={e.stage}")
+                    audit_facts.extend(deadline.facts())
                 except Exception as e:
                     logger.error(f"ERROR EN HUNTING {target_asset}: {e}")
                     audit_errors.append(str(e))
@@ -388,10 +589,243 @@ class TitanOmniBot:
 
         except Exception as e:
             logger.error(f"ERROR CRITICO EN SCANNER: {e}")
+        finally:
+            self.memory.mark("decide")
+            if prefetcher is not None:
+                # Con el deadline agotado no se espera a descargas en curso
+                prefetcher.shutdown(wait=not deadline.exceeded)
+            # AUDIT-SINK-01: Cierre del lote del ciclo (registros locales en disco al salir de HUNTING)
+            self.audit.flush(cycle_end=True)
+
+    def _analyze_regime(self, symbol, timeframe, ohlcv):
+        """Régimen de mercado con el motor configurado (REGIME_ENGINE)."""
+        with span("regime", symbol=symbol, timeframe=timeframe):
+            if self.indicators is not None:
+                return self.indicators.analyze(symbol, timeframe, ohlcv)
+            if self.regime_engine == "numpy":
+                # Diagnóstico opcional: contrastar contra pandas_ta (carga las dependencias pesadas)
+                if os.getenv("REGIME_PARITY_CHECK", "false").lower() == "true":
+                    parity = MarketRegime.parity_check(ohlcv)
+                    if not parity["ok"]:
+                        logger.warning(f"REGIME PARITY MISMATCH {symbol} {timeframe}: numpy={parity['numpy']} pandas_ta={parity['pandas_ta']}")
+                    return parity["numpy"]
+                return MarketRegime.analyze_ohlcv(ohlcv)
+
+            # Legacy: pandas solo se carga si se pide este motor
+            import pandas as pd
+            df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+            return MarketRegime.analyze(df)
+
+    def _acquisition_stage(self, prefetcher, target_assets, deadline=None):
+        """
+        PIPE-CONC-01: Etapa de adquisición de datos de mercado.
+        1. Ventana 15m + snapshot de todos los activos, en paralelo.
+        2. Régimen 15m (REGIME-BATCH-01: una sola pasada vectorizada con el motor numpy).
+        3. Datos MTF en paralelo solo para candidatos BULL (PIPE-LAZY-01).
+        Retorna {asset: (ohlcv, snapshot, regime, volatility)} o {asset: Exception}
+        (el error se reporta en el loop de decisión de ese activo).
+        deadline: CycleDeadline opcional (CYCLE-DEADLINE-01); las esperas y el análisis por
+        activo respetan el presupuesto "acquire" (DeadlineExceeded -> SKIP_DEADLINE).
+        """
+        for asset in target_assets:
+            prefetcher.submit(("15m", asset), self._acquire_15m, asset)
+
+        windows = {}
+        acquired = {}
+        for asset in target_assets:
+            try:
+                if deadline is not None:
+                    windows[asset] = deadline.result(prefetcher, ("15m", asset), "acquire")
+                else:
+                    windows[asset] = prefetcher.result(("15m", asset))
+            except Exception as e:
+                acquired[asset] = e
+
+        if self.regime_engine == "numpy":
+            with span("regime", timeframe="15m", assets=len(windows)):
+                regimes = MarketRegime.analyze_many({asset: w[0] for asset, w in windows.items()})
+        else:
+            regimes = {}
+            for asset, w in windows.items():
+                try:
+                    if deadline is not None:
+                        deadline.check("acquire")
+                    regimes[asset] = self._analyze_regime(asset, '15m', w[0])
+                except Exception as e:
+                    acquired[asset] = e
+
+        for asset, (ohlcv, snapshot) in windows.items():
+            if asset not in regimes:
+                continue
+            regime, volatility = regimes[asset]
+            acquired[asset] = (ohlcv, snapshot, regime, volatility)
+            if "BULL" in regime:
+                prefetcher.submit(("mtf", asset), self._acquire_mtf, asset, ohlcv)
+        return acquired
+
+    def _sharded_acquisition(self, target_assets, deadline=None):
+        """
+        SCAN-SHARD-01: Etapa de adquisición repartida entre procesos (coordinador).
+        Cada worker recibe las entradas de la caché de régimen de los activos del ranking y
+        devuelve las nuevas; se fusionan en orden de shard (determinista).
+        Retorna (acquired, resultados MTF con interfaz de DataPrefetcher).
+        """
+        symbols = set(target_assets)
+        spec = {
+            "cycle_id": self.cycle_id,
+            "regime_engine": self.regime_engine,
+            "regime_cache_timeframes": self.regime_cache_timeframes,
+            "regime_cache": [(k, v) for k, v in list(self.regime_cache.entries.items()) if k.split("|", 1)[0] in symbols],
+            # SNAPSHOT-CAS-01: Refs de la última ventana de snapshots (el worker referencia el chunk más antiguo con offset)
+            "snapshot_refs": {k: v for k, v in SNAPSHOTS.export_latest().items() if k.rpartition("|")[0] in symbols},
+            "exchange_factory": self.shard_exchange_factory,
+        }
+        started = time.time()
+        outputs = self.shard_scan.run(target_assets, spec, deadline)
+        for output in outputs:
+            for key, value in output.get("regime_cache", []):
+                self.regime_cache.put(key, value)
+            hits, misses = output.get("regime_cache_stats", (0, 0))
+            self.regime_cache.hits += hits
+            self.regime_cache.misses += misses
+            # Refs escritas por el worker: las del checkpoint del coordinador quedan al día
+            SNAPSHOTS.import_latest(output.get("snapshot_refs", {}), overwrite=True)
+        acquired, results = self.shard_scan.merge(outputs)
+        logger.info(f"SHARDS: {self.shard_scan.last_run} en {time.time() - started:.2f} s")
+        return acquired, results
+
+    @classmethod
+    def shard_worker(cls, spec):
+        """
+        SCAN-SHARD-01: Instancia mínima del bot para un proceso worker: solo el plano de datos
+        (cliente de mercado sin credenciales, velas locales, caché de régimen). Nunca opera.
+        """
+        worker = cls.__new__(cls)
+        worker.cycle_id = spec["cycle_id"]
+        # TRACE-01: El worker no cierra ciclos (sus spans nunca se volcarían); el coordinador mide shard_acquire
+        TRACER.enabled = False
+        factory = spec.get("exchange_factory")
+        exchange = factory() if factory is not None else ccxt.kraken({'enableRateLimit': True})
+        # PIPE-CONC-01: Los hilos del shard (SCAN_SHARD_THREADS) comparten el cliente
+        worker.exchange = build_venue("kraken", exchange=exchange, cache=False).exchange
+        worker.candle_store = CandleStore()
+        # El estado incremental (stream) vive en el coordinador: los workers usan el motor numpy equivalente
+        worker.regime_engine = "numpy" if spec["regime_engine"] == "stream" else spec["regime_engine"]
+        worker.indicators = None
+        worker.regime_cache = RegimeCache(load=False)
+        worker.regime_cache.entries.update(spec["regime_cache"])
+        worker.regime_cache_timeframes = spec["regime_cache_timeframes"]
+        SNAPSHOTS.import_latest(spec.get("snapshot_refs", {}), overwrite=True)
+        return worker
+
+    def _scan_shard(self, assets):
+        """Adquisición de un shard (en el worker). Secuencial por defecto (SCAN_SHARD_THREADS=1): salida determinista."""
+        seed = dict(self.regime_cache.entries)
+        mtf = {}
+        with DataPrefetcher(int(os.getenv("SCAN_SHARD_THREADS", "1"))) as prefetcher:
+            acquired = self._acquisition_stage(prefetcher, assets)
+            for asset in assets:
+                if prefetcher.has(("mtf", asset)):
+                    try:
+                        mtf[asset] = prefetcher.result(("mtf", asset))
+                    except Exception as e:
+                        mtf[asset] = e
+        return {
+            "acquired": acquired,
+            "mtf": mtf,
+            "regime_cache": [(k, v) for k, v in self.regime_cache.entries.items() if seed.get(k) != v],
+            "regime_cache_stats": (self.regime_cache.hits, self.regime_cache.misses),
+            "snapshot_refs": {k: v for k, v in SNAPSHOTS.export_latest().items() if k.rpartition("|")[0] in assets},
+        }
+
+    def _acquire_15m(self, symbol):
+        """Descarga (incremental) la ventana 15m y escribe su snapshot forense."""
+        from core.post_audit import save_ohlcv_snapshot
+        ohlcv = self.candle_store.get_ohlcv(self.exchange, symbol, '15m', 250)
+        snapshot = save_ohlcv_snapshot(
+            cycle_id=self.cycle_id,
+            state="HUNTING",
+            symbol=symbol,
+            timeframe='15m',
+            limit=250,
+            ohlcv=ohlcv
+        )
+        return ohlcv, snapshot
+
+    def _acquire_mtf(self, symbol, base_ohlcv):
+        """Régimen 1h y 4h de un candidato. Retorna (regime_1h, has_1h, regime_4h, has_4h, facts)."""
+        facts = []
+        regime_1h, has_1h = self._mtf_regime(symbol, '1h', base_ohlcv, facts)
+        regime_4h, has_4h = self._mtf_regime(symbol, '4h', base_ohlcv, facts)
+        return regime_1h, has_1h, regime_4h, has_4h, facts
+
+    def _mtf_regime(self, symbol, timeframe, base_ohlcv, audit_facts):
+        """
+        Régimen de timeframe superior para el veto MTF (con snapshot forense).
+        REGIME-CACHE-01: si el timeframe está cacheado se usa el régimen confirmado
+        (velas cerradas), memoizado por última vela cerrada; un hit evita fetch y cálculo.
+        Retorna (regime, data_ok).
+        """
+        from core.post_audit import save_ohlcv_snapshot
+
+        cached_tf = timeframe in self.regime_cache_timeframes
+        if cached_tf:
+            cached = self.regime_cache.lookup(symbol, timeframe)
+            if cached is not None:
+                audit_facts.append(f"regime_{timeframe}_cache=hit")
+                audit_facts.append(f"regime_cache_hit_rate={self.regime_cache.hit_rate():.2f}")
+                return cached[0], True
+
+        ohlcv_tf = self._get_mtf_ohlcv(symbol, timeframe, base_ohlcv, audit_facts)
+        snapshot = save_ohlcv_snapshot(self.cycle_id, "HUNTING", symbol, timeframe, 250, ohlcv_tf)
+        if snapshot["path"]: audit_facts.append(f"ohlcv_{timeframe}_hash={snapshot['hash']}")
+
+        if not cached_tf:
+            regime, _ = self._analyze_regime(symbol, timeframe, ohlcv_tf)
+            return regime, bool(ohlcv_tf)
+
+        regime, _, hit = self.regime_cache.analyze(
+            symbol, timeframe, ohlcv_tf,
+            compute=lambda window: self._analyze_regime(symbol, timeframe, window)
+        )
+        audit_facts.append(f"regime_{timeframe}_cache={'hit' if hit else 'miss'}")
+        audit_facts.append(f"regime_cache_hit_rate={self.regime_cache.hit_rate():.2f}")
+        return regime, bool(ohlcv_tf)
+
+    def _get_mtf_ohlcv(self, symbol, timeframe, base_ohlcv, audit_facts, limit=250):
+        """
+        MTF-RESAMPLE-01: Velas de timeframe superior para el veto MTF.
+        Se derivan de la serie local de 15m; si la cobertura local no alcanza
+        (arranque en frío, huecos) se descargan nativas del exchange.
+        """
+        if os.getenv("MTF_RESAMPLE", "true").lower() == "true":
+            derived, info = derive_ohlcv(self.candle_store, symbol, timeframe, limit, base_ohlcv, now_ms=int(time.time() * 1000))
+            if derived is not None:
+                audit_facts.append(f"ohlcv_{timeframe}_source=derived_15m")
+                if info["partial_tail"]:
+                    audit_facts.append(f"ohlcv_{timeframe}_partial_tail=true")
+
+                # Verificación opcional contra velas nativas (diagnóstico)
+                if os.getenv("MTF_PARITY_CHECK", "false").lower() == "true":
+                    native = self.candle_store.get_ohlcv(self.exchange, symbol, timeframe, limit)
+                    parity = parity_check(derived, native)
+                    audit_facts.append(f"ohlcv_{timeframe}_parity_ok={parity['ok']}")
+                    if not parity["ok"]:
+                        logger.warning(f"MTF PARITY MISMATCH {symbol} {timeframe}: {parity['mismatches'][:5]}")
+                        return native
+                return derived
+            audit_facts.append(f"ohlcv_{timeframe}_coverage={info.get('coverage', 0)}")
+
+        audit_facts.append(f"ohlcv_{timeframe}_source=native")
+        return self.candle_store.get_ohlcv(self.exchange, symbol, timeframe, limit)
 
     def _log_audit(self, symbol, regime, intent, ai_result, ai_reason, action, order, facts, errors):
         """Helper para registrar auditoría por activo."""
-        from core.post_audit import build_audit_record, write_local_audit, try_write_supabase
+        from core.post_audit import build_audit_record
+        # CYCLE-CTX-01: Refrescos del snapshot de mercado ocurridos durante este activo
+        facts = facts + self.context.drain_facts()
+        # MEM-TELEMETRY-01: RSS, pico y deltas por etapa del ciclo hasta este registro
+        facts = facts + self.memory.facts()
         record = build_audit_record(
             cycle_id=self.cycle_id,
             state="HUNTING",
@@ -405,8 +839,21 @@ class TitanOmniBot:
             facts=facts,
             errors=errors
         )
-        write_local_audit(record)
-        try_write_supabase(record, self.supabase)
+        # AUDIT-SINK-01: Encolado (volcado por lote); con orden enviada, a disco antes de seguir.
+        # OUTBOX-01: El insert remoto va al outbox (nunca bloquea ni se descarta por deadline)
+        self.audit.submit(record, self.supabase, urgent=order is not None)
+
+    def _log_cycle_trace(self):
+        """TRACE-01: Resumen por etapa del ciclo (spans cerrados hasta aquí) como registro de auditoría."""
+        from core.post_audit import build_audit_record
+        record = build_audit_record(
+            cycle_id=self.cycle_id,
+            state=self.state,
+            action="CYCLE_TRACE",
+            facts=TRACER.summary_facts()
+        )
+        self.audit.submit(record)
+        self.audit.flush(cycle_end=True)
 
     def _state_managing(self):
         """Modo Gestión: Administra posiciones abiertas (EXEC-STATE-01)."""
@@ -438,7 +885,7 @@ class TitanOmniBot:
             audit_facts.append(f"managing_symbol={audit_symbol}")
 
             # 1. Revalidar Contexto (Régimen)
-            ohlcv = self.exchange.fetch_ohlcv(audit_symbol, timeframe='15m', limit=250)
+            ohlcv = self.candle_store.get_ohlcv(self.exchange, audit_symbol, '15m', 250)
             
             # DATA-ORIGIN-02: Snapshot OHLCV (MANAGING)
             from core.post_audit import save_ohlcv_snapshot
@@ -454,8 +901,7 @@ class TitanOmniBot:
                 audit_facts.append(f"ohlcv_snapshot_path={snapshot['path']}")
                 audit_facts.append(f"ohlcv_snapshot_hash={snapshot['hash']}")
             
-            df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-            regime, volatility = MarketRegime.analyze(df)
+            regime, volatility = self._analyze_regime(audit_symbol, '15m', ohlcv)
             audit_regime = regime
             audit_facts.append(f"regime={regime}")
             
@@ -473,7 +919,7 @@ class TitanOmniBot:
                 # Estimamos valor de la posicion
                 pos_qty = self.position.get("qty", 0.0)
                 # Precio actual aproximado (close de ohlcv recente)
-                current_price = df.iloc[-1]['close'] if not df.empty else 0.0
+                current_price = ohlcv[-1][4] if ohlcv else 0.0
                 capital_involved = pos_qty * current_price
                 
                 from core.dust_logic import DustLogic
@@ -503,14 +949,15 @@ class TitanOmniBot:
                         symbol=audit_symbol,
                         action="SELL",
                         order_type="MARKET",
-                        quantity=self.position["qty"],
+                        quantity=self.market_meta.round_amount(audit_symbol, self.position["qty"]),
                         regime=regime,
                         reason="MANAGING_EXIT_RULE"
                     )
                     audit_intent = ticket
                     
                     # Auditoría (IA)
-                    audit_ok, audit_reason = self.auditor.audit_intent(ticket, regime)
+                    with span("ai_audit", symbol=audit_symbol):
+                        audit_ok, audit_reason = self.auditor.audit_intent(ticket, regime)
                     audit_ai_result = "APPROVED" if audit_ok else "REJECTED"
                     audit_ai_reason = audit_reason
                     
@@ -546,7 +993,8 @@ class TitanOmniBot:
                 
                 if (audit_ok or fallback_used) and audit_action != "HOLD":                 # RISK-GATE-01: Pre-Trade Check (Exit)
                     from core.risk_gate import RiskGate
-                    gate_ok, gate_reason, gate_metrics = RiskGate.pre_trade_check(self.exchange, audit_symbol, self.supabase)
+                    with span("risk_gate", symbol=audit_symbol):
+                        gate_ok, gate_reason, gate_metrics = RiskGate.pre_trade_check(self.exchange, audit_symbol, self.supabase, context=self.context, action="SELL")
                     
                     if not gate_ok:
                         logger.warning(f"RISK GATE BLOCK EXIT {audit_symbol}: {gate_reason}")
@@ -566,12 +1014,15 @@ class TitanOmniBot:
                              if env_system_mode == "DRY_RUN":
                                  logger.info("SYSTEM_MODE=DRY_RUN: Executing SIMULATED EXIT.")
                                  
-                             result = self.execution_engine.execute(ticket)
+                             with span("execution", symbol=audit_symbol, action="SELL"):
+                                 result = self.execution_engine.execute(ticket, context=self.context)
                              audit_order = result
                              if result['status'] == "FILLED":
+                                  self.context.invalidate("balance")
                                   audit_action = "TRADE_EXIT"
                                   self.position = None
                                   self.state = "HUNTING"
+                                  self.save_state()
                                   audit_facts.append("position_closed=true")
                              else:
                                   audit_action = "FAIL"
@@ -587,7 +1038,10 @@ class TitanOmniBot:
             
         finally:
             # EXEC-AUDIT-01: Registro Forense Obligatorio para MANAGING
-            from core.post_audit import build_audit_record, write_local_audit, try_write_supabase
+            from core.post_audit import build_audit_record
+            audit_facts.extend(self.context.drain_facts())
+            self.memory.mark("manage")
+            audit_facts.extend(self.memory.facts())
             
             record = build_audit_record(
                 cycle_id=self.cycle_id,
@@ -602,18 +1056,28 @@ class TitanOmniBot:
                 facts=audit_facts,
                 errors=audit_errors
             )
-            write_local_audit(record)
-            try_write_supabase(record, self.supabase)
+            self.audit.submit(record, self.supabase, urgent=audit_order is not None)
+            # AUDIT-SINK-01: Cierre del lote del ciclo
+            self.audit.flush(cycle_end=True)
+
+
+def scan_shard(spec, assets):
+    """SCAN-SHARD-01: Punto de entrada del proceso worker (debe ser importable a nivel de módulo)."""
+    return TitanOmniBot.shard_worker(spec)._scan_shard(assets)
 
-import pandas as pd # Requerido dentro de los métodos
 
 if __name__ == "__main__":
     bot = TitanOmniBot()
-    try:
-        # Bucle principal infinito (o controlado por cron externo si es script único)
-        # Para entorno local, ejecutamos una vez
-        bot.run_cycle()
-    except KeyboardInterrupt:
-        logger.info("APAGADO MANUAL.")
-    except Exception as e:
-        logger.critical(f"CRASH NO CONTROLADO: {e}")
+    # DAEMON-01: Modo residente (--daemon o DAEMON_MODE=true); por defecto un ciclo (cron externo)
+    if "--daemon" in sys.argv or os.getenv("DAEMON_MODE", "false").lower() == "true":
+        from core.daemon import CycleDaemon
+        CycleDaemon(bot).run()
+    else:
+        try:
+            bot.run_cycle()
+        except KeyboardInterrupt:
+            logger.info("APAGADO MANUAL.")
+        except Exception as e:
+            logger.critical(f"CRASH NO CONTROLADO: {e}")
+        finally:
+            bot.shutdown()
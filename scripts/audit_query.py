@@ -0,0 +1,35 @@
+import os
+import sys
+import json
+
+# Ejecutar desde la raíz del repo:
+#   python scripts/audit_query.py [symbol=ETH/USDT] [action=SKIP_MTF] [cycle_id=...] [since=2026-09-01] [until=2026-10-01] [limit=100] [base=data/forensics]
+#   python scripts/audit_query.py stats
+sys.path.append(os.getcwd())
+
+from core.audit_log import AuditLog
+
+FILTERS = ("cycle_id", "symbol", "action", "since", "until")
+
+
+def main(argv):
+    options = dict(arg.split("=", 1) for arg in argv if "=" in arg)
+    log = AuditLog(options.pop("base", "data/forensics"), readonly=True)
+    if "stats" in argv:
+        print(json.dumps(log.stats(), indent=2))
+        return 0
+    limit = int(options.pop("limit")) if "limit" in options else None
+    unknown = set(options) - set(FILTERS)
+    if unknown:
+        print(f"Filtros desconocidos: {sorted(unknown)} (válidos: {', '.join(FILTERS)}, limit, base)")
+        return 2
+    found = 0
+    for record in log.query(limit=limit, **options):
+        print(json.dumps(record))
+        found += 1
+    print(f"# {found} registros", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
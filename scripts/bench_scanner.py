@@ -0,0 +1,91 @@
+import os
+import sys
+import time
+import random
+
+# Ejecutar desde la raíz del repo: python scripts/bench_scanner.py [n_symbols] [rounds]
+sys.path.append(os.getcwd())
+
+from core.scanner import Scanner
+
+
+class SyntheticExchange:
+    """Universo sintético de mercados/tickers (sin red) para medir el escáner."""
+    def __init__(self, n_symbols, seed=7):
+        rng = random.Random(seed)
+        self.markets = {}
+        self.tickers = {}
+        for i in range(n_symbols):
+            quote = "USDT" if i % 4 else rng.choice(["USD", "EUR", "BTC"])
+            symbol = f"C{i:04d}/{quote}"
+            self.markets[symbol] = {"symbol": symbol, "quote": quote, "active": rng.random() > 0.03, "spot": True}
+            bid = rng.uniform(0.001, 50000)
+            spread = rng.choice([0.0005, 0.001, 0.003, 0.02]) * bid
+            self.tickers[symbol] = {
+                "symbol": symbol,
+                "bid": bid if rng.random() > 0.02 else None,
+                "ask": bid + spread,
+                "quoteVolume": rng.lognormvariate(12, 2.5) if rng.random() > 0.05 else None,
+                "percentage": rng.uniform(-15, 15),
+            }
+
+    def load_markets(self):
+        return self.markets
+
+    def fetch_tickers(self, symbols=None):
+        return {s: self.tickers[s] for s in (symbols or self.tickers) if s in self.tickers}
+
+
+def reference_top_k(scanner, tickers, universe):
+    """Implementación escalar (loop Python + sort completo) para verificar el resultado."""
+    scored = []
+    for symbol in universe:
+        t = tickers.get(symbol)
+        if not t:
+            continue
+        vol_usd = t["quoteVolume"] if t.get("quoteVolume") else 0
+        change_pct = abs(t["percentage"]) if t.get("percentage") else 0
+        bid, ask = t.get("bid"), t.get("ask")
+        if not bid or not ask:
+            continue
+        mid = (bid + ask) / 2
+        if mid <= 0 or vol_usd < scanner.min_quote_volume or ((ask - bid) / mid) * 100 > scanner.max_spread_pct:
+            continue
+        scored.append((symbol, vol_usd * (1 + change_pct)))
+    scored.sort(key=lambda x: (-x[1], x[0]))
+    return [s for s, _ in scored[:scanner.top_k]]
+
+
+def bench(n_symbols=2000, rounds=50):
+    exchange = SyntheticExchange(n_symbols)
+    scanner = Scanner(exchange)
+    universe = scanner.universe()
+    tickers = exchange.fetch_tickers(universe)
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        symbols, scores, eligible = scanner.score_universe(tickers, universe)
+        top = scanner.top_k_indices(scores, eligible, scanner.top_k)
+    vector_ms = (time.perf_counter() - start) * 1000 / rounds
+    vector_top = [symbols[i] for i in top]
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        reference = reference_top_k(scanner, tickers, universe)
+    loop_ms = (time.perf_counter() - start) * 1000 / rounds
+
+    scanner.mode = "universe"
+    end_to_end = scanner.scan_assets()
+
+    print(f"Universe (active {scanner.quote}): {len(universe)} of {n_symbols} markets | eligible: {int(eligible.sum())}")
+    print(f"Vectorized score + top-{scanner.top_k}: {vector_ms:.3f} ms/cycle")
+    print(f"Python loop + full sort:     {loop_ms:.3f} ms/cycle")
+    print(f"Parity vs reference: {'PASS' if vector_top == reference else 'FAIL'}")
+    print(f"scan_assets(): {end_to_end} ({scanner.last_scan.get('cpu_ms')} ms)")
+    return vector_top == reference and end_to_end == reference
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    r = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    sys.exit(0 if bench(n, r) else 1)
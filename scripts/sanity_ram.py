@@ -1,33 +1,24 @@
-import ctypes
-from ctypes import wintypes
-import time
+import os
+import sys
+
+# Ejecutar desde la raíz del repo: python scripts/sanity_ram.py [budget_mb]
+# MEM-TELEMETRY-01: RSS/pico desde /proc (o getrusage); antes ctypes.windll (solo Windows)
+sys.path.append(os.getcwd())
+
+from core.memory import MB, MemoryTelemetry, peak_rss_bytes, rss_bytes
 
-class PROCESS_MEMORY_COUNTERS_EX(ctypes.Structure):
-    _fields_ = [
-        ('cb', ctypes.c_uint32),
-        ('PageFaultCount', ctypes.c_uint32),
-        ('PeakWorkingSetSize', ctypes.c_size_t),
-        ('WorkingSetSize', ctypes.c_size_t),
-        ('QuotaPeakPagedPoolUsage', ctypes.c_size_t),
-        ('QuotaPagedPoolUsage', ctypes.c_size_t),
-        ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t),
-        ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
-        ('PagefileUsage', ctypes.c_size_t),
-        ('PeakPagefileUsage', ctypes.c_size_t),
-        ('PrivateUsage', ctypes.c_size_t),
-    ]
 
 def get_peak_ram_mb():
-    try:
-        current_process = ctypes.windll.kernel32.GetCurrentProcess()
-        counters = PROCESS_MEMORY_COUNTERS_EX()
-        counters.cb = ctypes.sizeof(PROCESS_MEMORY_COUNTERS_EX)
-        if ctypes.windll.psapi.GetProcessMemoryInfo(current_process, ctypes.byref(counters), ctypes.sizeof(counters)):
-            return float(counters.PeakWorkingSetSize) / (1024.0 * 1024.0)
-    except Exception as e:
-        print(f"Error: {e}")
-        return 0.0
-    return 0.0
+    peak = peak_rss_bytes()
+    return peak / MB if peak is not None else 0.0
+
 
-print(f"RAM Check: {get_peak_ram_mb():.2f} MB")
-print("Verification Complete")
+if __name__ == "__main__":
+    budget = float(sys.argv[1]) if len(sys.argv) > 1 else None
+    telemetry = MemoryTelemetry(budget_mb=budget)
+    rss = rss_bytes()
+    print(f"RAM Check: {get_peak_ram_mb():.2f} MB (peak) | {rss / MB if rss is not None else 0.0:.2f} MB (rss)")
+    if telemetry.over_budget():
+        print(f"RAM Budget EXCEEDED: {telemetry.budget_mb:.0f} MB")
+        sys.exit(1)
+    print("Verification Complete")
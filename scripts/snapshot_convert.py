@@ -0,0 +1,78 @@
+import os
+import sys
+import glob
+
+# Ejecutar desde la raíz del repo:
+#   python scripts/snapshot_convert.py to-binary <snapshot.json | dir> [codec]   -> bloque binario EN LA MISMA RUTA
+#     (las auditorías referencian esa ruta: ohlcv_*_path / snapshot_hash; verifica ida y vuelta)
+#   python scripts/snapshot_convert.py to-json <snapshot.tosb | manifiesto> [out.json]
+#   python scripts/snapshot_convert.py verify <archivo | dir>
+sys.path.append(os.getcwd())
+
+from core.snapshot_format import SnapshotFormatError, is_block, json_to_binary
+from core.snapshot_store import SNAPSHOTS, MANIFEST_FORMATS
+
+
+def snapshot_files(target, pattern="*.json"):
+    if os.path.isdir(target):
+        return sorted(glob.glob(os.path.join(target, pattern)))
+    return [target]
+
+
+def to_binary(target, codec=None):
+    converted = failed = before = after = 0
+    for path in snapshot_files(target):
+        try:
+            with open(path, "rb") as f:
+                head = f.read(64)
+            if is_block(head) or any(fmt.encode() in head for fmt in MANIFEST_FORMATS):
+                continue # ya binario, o manifiesto: ya deduplicado en chunks binarios
+            size = os.path.getsize(path)
+            # Reemplazo atómico en la misma ruta: SnapshotStore detecta el bloque por su magic
+            json_to_binary(path, path, codec=codec)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"SKIP {path}: {e}")
+            failed += 1
+            continue
+        before += size
+        after += os.path.getsize(path)
+        converted += 1
+    print(f"Convertidos: {converted} | fallidos: {failed} | {before / 1024:.0f} KB -> {after / 1024:.0f} KB")
+    return failed == 0
+
+
+def to_json(path, out=None):
+    data = SNAPSHOTS.read_bytes(path)
+    out = out or os.path.splitext(path)[0] + ".json"
+    with open(out, "wb") as f:
+        f.write(data)
+    print(f"{path} -> {out} ({len(data)} bytes)")
+    return True
+
+
+def verify(target):
+    files = snapshot_files(target, "*") if os.path.isdir(target) else [target]
+    bad = [path for path in files if os.path.isfile(path) and not SNAPSHOTS.verify(path)]
+    for path in bad:
+        print(f"FAIL {path}")
+    print(f"Verificados: {len(files)} | hash incorrecto: {len(bad)}")
+    return not bad
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3 or sys.argv[1] not in ("to-binary", "to-json", "verify"):
+        print("uso: python scripts/snapshot_convert.py to-binary|to-json|verify <ruta> [codec|salida]")
+        sys.exit(2)
+    command, target = sys.argv[1], sys.argv[2]
+    extra = sys.argv[3] if len(sys.argv) > 3 else None
+    try:
+        if command == "to-binary":
+            ok = to_binary(target, extra)
+        elif command == "to-json":
+            ok = to_json(target, extra)
+        else:
+            ok = verify(target)
+    except SnapshotFormatError as e:
+        print(f"ERROR: {e}")
+        ok = False
+    sys.exit(0 if ok else 1)
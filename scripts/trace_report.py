@@ -0,0 +1,74 @@
+import os
+import sys
+import json
+from collections import defaultdict
+
+import numpy as np
+
+# Ejecutar desde la raíz del repo: python scripts/trace_report.py [trace.jsonl] [ultimos_n_ciclos]
+sys.path.append(os.getcwd())
+
+
+def trace_files(path):
+    """Archivo activo + rotados (trace.jsonl.N ... trace.jsonl.1, trace.jsonl), del más antiguo al más reciente."""
+    rotated = []
+    index = 1
+    while os.path.exists(f"{path}.{index}"):
+        rotated.append(f"{path}.{index}")
+        index += 1
+    files = list(reversed(rotated))
+    if os.path.exists(path):
+        files.append(path)
+    return files
+
+
+def load_spans(path, last_cycles=None):
+    spans = []
+    for file_path in trace_files(path):
+        with open(file_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    spans.append(json.loads(line))
+                except ValueError:
+                    continue # línea truncada (rotación/crash a mitad de escritura)
+    if last_cycles:
+        cycles = list(dict.fromkeys(s.get("cycle_id") for s in spans))[-last_cycles:]
+        keep = set(cycles)
+        spans = [s for s in spans if s.get("cycle_id") in keep]
+    return spans
+
+
+def report(spans):
+    """Por etapa: n, p50/p95/p99/max de wall_ms y media de llamadas al exchange y bytes escritos."""
+    stages = defaultdict(list)
+    for s in spans:
+        stages[s["span"]].append(s)
+    rows = []
+    for name, items in stages.items():
+        wall = np.array([s["wall_ms"] for s in items])
+        p50, p95, p99 = np.percentile(wall, [50, 95, 99])
+        rows.append({
+            "span": name,
+            "n": len(items),
+            "p50": p50, "p95": p95, "p99": p99, "max": wall.max(),
+            "calls": sum(s["exchange_calls"] for s in items) / len(items),
+            "bytes": sum(s["bytes_written"] for s in items) / len(items),
+            "errors": sum(1 for s in items if "error" in s),
+        })
+    rows.sort(key=lambda r: -r["p95"])
+    return rows
+
+
+if __name__ == "__main__":
+    path = sys.argv[1] if len(sys.argv) > 1 else os.getenv("TRACE_FILE", "data/traces/trace.jsonl")
+    last = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    spans = load_spans(path, last)
+    if not spans:
+        print(f"Sin spans en {path} (¿TRACE_ENABLED=true?)")
+        sys.exit(1)
+    cycles = len({s.get("cycle_id") for s in spans})
+    print(f"Trace: {path} | ciclos: {cycles} | spans: {len(spans)}")
+    print(f"{'span':<14}{'n':>7}{'p50 ms':>11}{'p95 ms':>11}{'p99 ms':>11}{'max ms':>11}{'calls/span':>12}{'bytes/span':>12}{'errors':>8}")
+    for r in report(spans):
+        print(f"{r['span']:<14}{r['n']:>7}{r['p50']:>11.2f}{r['p95']:>11.2f}{r['p99']:>11.2f}{r['max']:>11.2f}"
+              f"{r['calls']:>12.2f}{r['bytes']:>12.0f}{r['errors']:>8}")
@@ -4,6 +4,9 @@ import json
 import logging
 import shutil
 
+# CHECKPOINT-01: cada bot de prueba arranca en frío (sin restaurar data/checkpoint.bin)
+os.environ.setdefault("RUNTIME_CHECKPOINT", "false")
+
 # Setup entorno simulado para evitar llamadas reales a API o DB
 os.environ["TRADING_ENABLED"] = "true"
 os.environ["SYSTEM_MODE"] = "DRY_RUN"
@@ -161,8 +164,12 @@ try:
          print("FAIL: Snapshot BTC HUNTING no encontrado.")
          sys.exit(1)
     
-    with open(os.path.join(snapshot_dir, btc_snapshot_file), 'r') as f:
-        data = json.load(f)
+    # SNAPSHOT-CAS-01: El archivo es un manifiesto; se reconstruye el snapshot completo desde los chunks
+    from core.snapshot_store import load_snapshot, verify_snapshot
+    data = load_snapshot(os.path.join(snapshot_dir, btc_snapshot_file))
+    if not verify_snapshot(os.path.join(snapshot_dir, btc_snapshot_file)):
+        print("FAIL: Hash de Snapshot BTC no coincide con el contenido reconstruido.")
+        sys.exit(1)
         
     required_keys = ["cycle_id", "state", "symbol", "timeframe", "limit", "ohlcv", "snapshot_hash", "timestamp"]
     missing = [k for k in required_keys if k not in data]
@@ -5,6 +5,9 @@ import logging
 import time
 from unittest.mock import MagicMock, patch
 
+# CHECKPOINT-01: cada bot de prueba arranca en frío (sin restaurar data/checkpoint.bin)
+os.environ.setdefault("RUNTIME_CHECKPOINT", "false")
+
 # Configure logging to capture output
 logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(name)s: %(message)s')
 logger = logging.getLogger("TITAN-OMNI-AUDIT")
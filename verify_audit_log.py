@@ -0,0 +1,90 @@
+import sys
+import os
+import json
+import time
+import tempfile
+from datetime import datetime, timedelta, timezone
+
+# Add current path
+sys.path.append(os.getcwd())
+
+from core.audit_log import AuditLog
+from core.post_audit import build_audit_record, write_local_audit
+
+SYMBOLS = ("BTC/USDT", "ETH/USDT", "SOL/USDT", "XRP/USDT")
+ACTIONS = ("SKIP_MTF", "SKIP_REGIME", "SKIP_RISK", "EXECUTED")
+
+
+def record_line(i, start):
+    ts = (start + timedelta(minutes=15 * i)).isoformat()
+    record = {"cycle_id": f"c{i // 4:05d}", "timestamp": ts, "state": "HUNTING", "symbol": SYMBOLS[i % 4],
+              "action": ACTIONS[(i // 4) % 4], "decision_facts": [f"asset_index={i % 4}"], "errors": []}
+    return json.dumps(record) + "\n", record
+
+
+def test_audit_log():
+    results = []
+    start = datetime(2026, 8, 1, tzinfo=timezone.utc)
+
+    # --- TEST 1: ROTATION INTO SEGMENTS + SIDECAR INDEXES ---
+    print("--- TEST 1: SEGMENT ROTATION ---")
+    log = AuditLog("seg", max_bytes=256 * 1024, max_age_s=0)
+    expected = []
+    for i in range(12_000):
+        line, record = record_line(i, start)
+        log.append(line, record)
+        expected.append(record)
+    stats = log.stats()
+    catalog = log.catalog()
+    ok = stats["segments"] >= 5 and stats["sealed_records"] + stats["active_records"] == len(expected) \
+        and all(m["bytes"] <= 256 * 1024 for m in catalog)
+    print(f"stats: {stats}")
+    results.append({"case": "Segment Rotation", "result": "PASS" if ok else "FAIL", "details": f"{stats['segments']} segments"})
+
+    # --- TEST 2: INDEXED QUERY == FULL SCAN ---
+    print("\n--- TEST 2: QUERY (symbol + action + month) ---")
+    since, until = "2026-09-01", "2026-10-01"
+    scan = [r for r in expected if r["symbol"] == "ETH/USDT" and r["action"] == "SKIP_MTF" and since <= r["timestamp"] < until]
+    started = time.perf_counter()
+    found = list(log.query(symbol="ETH/USDT", action="SKIP_MTF", since=since, until=until))
+    elapsed = time.perf_counter() - started
+    by_cycle = list(log.query(cycle_id="c00042"))
+    ok = found == scan and len(found) > 0 and by_cycle == [r for r in expected if r["cycle_id"] == "c00042"] \
+        and list(log.query(symbol="DOGE/USDT")) == [] and len(list(log.query(action="EXECUTED", limit=7))) == 7
+    print(f"matches: {len(found)} in {elapsed * 1000:.1f} ms | cycle c00042: {len(by_cycle)} records")
+    results.append({"case": "Indexed Query", "result": "PASS" if ok else "FAIL", "details": f"{len(found)} records"})
+
+    # --- TEST 3: CRASH RECOVERY (record written, index entry lost) + TAIL ---
+    print("\n--- TEST 3: SIDECAR RECOVERY + TAIL ---")
+    line, record = record_line(12_000, start)
+    with open(log.active_path, "a", encoding="utf-8") as f:
+        f.write(line) # crash entre el registro y su entrada de índice
+    with open(log.sidecar_path, "a", encoding="utf-8") as f:
+        f.write('[1,2,"trunc') # entrada truncada
+    expected.append(record)
+    reopened = AuditLog("seg", max_bytes=256 * 1024, max_age_s=0)
+    recovered = list(reopened.query(cycle_id=record["cycle_id"], symbol=record["symbol"]))
+    tail = [json.loads(l) for l in reopened.tail(300)]
+    ok = recovered == [record] and tail == expected[-300:]
+    print(f"recovered: {len(recovered)} | tail spans segments: {len(tail)} records")
+    results.append({"case": "Recovery + Tail", "result": "PASS" if ok else "FAIL", "details": f"tail={len(tail)}"})
+
+    # --- TEST 4: PIPELINE WRITER (write_local_audit) STAYS ON audit_log.jsonl ---
+    print("\n--- TEST 4: write_local_audit ---")
+    for i, symbol in enumerate(SYMBOLS):
+        write_local_audit(build_audit_record(cycle_id="pipe-1", state="HUNTING", symbol=symbol, action="SKIP_MTF", facts=[f"asset_index={i}"]))
+    with open("data/forensics/audit_log.jsonl") as f:
+        lines = [json.loads(l) for l in f]
+    found = list(AuditLog("data/forensics", readonly=True).query(cycle_id="pipe-1", symbol="ETH/USDT"))
+    ok = len(lines) == 4 and found == [lines[1]]
+    results.append({"case": "Pipeline Writer", "result": "PASS" if ok else "FAIL", "details": f"{len(lines)} lines"})
+    return results
+
+
+if __name__ == "__main__":
+    os.chdir(tempfile.mkdtemp(prefix="titan-audit-log-"))
+    test_results = test_audit_log()
+    print("\n=== SUMMARY ===")
+    for r in test_results:
+        print(r)
+    sys.exit(0 if all(r["result"] == "PASS" for r in test_results) else 1)
@@ -3,6 +3,9 @@ import os
 import pandas as pd
 from unittest.mock import MagicMock, patch
 
+# CHECKPOINT-01: cada bot de prueba arranca en frío (sin restaurar data/checkpoint.bin)
+os.environ.setdefault("RUNTIME_CHECKPOINT", "false")
+
 # Add current path
 sys.path.append(os.getcwd())
 
@@ -4,6 +4,9 @@ import json
 import shutil
 from unittest.mock import MagicMock, patch
 
+# CHECKPOINT-01: cada bot de prueba arranca en frío (sin restaurar data/checkpoint.bin)
+os.environ.setdefault("RUNTIME_CHECKPOINT", "false")
+
 # Add current path
 sys.path.append(os.getcwd())
 
@@ -0,0 +1,130 @@
+import sys
+import os
+import json
+import time
+import tempfile
+import subprocess
+
+# Add current path
+sys.path.append(os.getcwd())
+
+from core.audit_sink import AuditSink
+from core.post_audit import build_audit_record, write_local_audit
+
+
+class FakeSupabase:
+    """Cliente Supabase en memoria: cuenta peticiones (inserts) y registros."""
+    def __init__(self):
+        self.requests = 0
+        self.rows = []
+
+    def log_audit_records(self, records):
+        self.requests += 1
+        self.rows.extend(records)
+
+
+def record(i, cycle_id="sink-1", order=None):
+    return build_audit_record(cycle_id=cycle_id, state="HUNTING", symbol=f"A{i:03d}/USDT", action="SKIP_MTF",
+                              order_result=order, facts=[f"asset_index={i}"])
+
+
+def read_log(base):
+    path = os.path.join(base, "audit_log.jsonl")
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+
+def test_audit_sink():
+    results = []
+
+    # --- TEST 1: GROUP COMMIT (ONE WRITE + ONE BULK INSERT PER CYCLE) ---
+    print("--- TEST 1: GROUP COMMIT PER CYCLE ---")
+    supabase = FakeSupabase()
+    sink = AuditSink(base_path="t1", flush_ms=60_000, fsync="batch")
+    started = time.perf_counter()
+    for i in range(200):
+        sink.submit(record(i), supabase)
+    submit_us = (time.perf_counter() - started) / 200 * 1e6
+    before = len(read_log("t1"))
+    sink.flush(cycle_end=True, remote=True)
+    lines = read_log("t1")
+    ok = before == 0 and [r["symbol"] for r in lines] == [f"A{i:03d}/USDT" for i in range(200)] \
+        and sink.metrics["batches"] == 1 and supabase.requests == 1 and len(supabase.rows) == 200
+    print(f"submit: {submit_us:.1f} us/record | batches: {sink.metrics['batches']} | inserts: {supabase.requests}")
+    results.append({"case": "Group Commit", "result": "PASS" if ok else "FAIL", "details": f"{submit_us:.1f} us/record"})
+    sink.close()
+
+    # --- TEST 2: TIMED FLUSH BY THE SINK THREAD ---
+    print("\n--- TEST 2: FLUSH EVERY AUDIT_FLUSH_MS ---")
+    supabase = FakeSupabase()
+    sink = AuditSink(base_path="t2", flush_ms=50, fsync="cycle")
+    for i in range(10):
+        sink.submit(record(i), supabase)
+    sink.flush(cycle_end=True) # local síncrono; el insert remoto queda para el hilo del sink
+    local_now = len(read_log("t2"))
+    deadline = time.time() + 2.0
+    while supabase.requests == 0 and time.time() < deadline:
+        time.sleep(0.01)
+    for i in range(10, 15):
+        sink.submit(record(i), supabase)
+    time.sleep(0.3)
+    ok = local_now == 10 and len(read_log("t2")) == 15 and len(supabase.rows) == 15 and supabase.requests == 2
+    print(f"local after cycle flush: {local_now} | after timer: {len(read_log('t2'))} | remote rows: {len(supabase.rows)} in {supabase.requests} inserts")
+    results.append({"case": "Timed Flush", "result": "PASS" if ok else "FAIL", "details": f"{supabase.requests} inserts"})
+    sink.close()
+
+    # --- TEST 3: URGENT RECORD (ORDER SENT) HITS DISK BEFORE RETURNING ---
+    print("\n--- TEST 3: URGENT RECORD ---")
+    sink = AuditSink(base_path="t3", flush_ms=60_000)
+    sink.submit(record(0))
+    sink.submit(record(1, order={"status": "FILLED"}), urgent=True)
+    lines = read_log("t3")
+    ok = [r["symbol"] for r in lines] == ["A000/USDT", "A001/USDT"]
+    results.append({"case": "Urgent Record", "result": "PASS" if ok else "FAIL", "details": f"{len(lines)} on disk"})
+    sink.close()
+
+    # --- TEST 4: DRAIN AT PROCESS EXIT (atexit, incl. sys.exit) ---
+    print("\n--- TEST 4: DRAIN AT EXIT ---")
+    script = (
+        "import sys; sys.path.append(sys.argv[1])\n"
+        "from core.audit_sink import AuditSink\n"
+        "from core.post_audit import build_audit_record\n"
+        "sink = AuditSink(base_path='t4', flush_ms=60000)\n"
+        "for i in range(50): sink.submit(build_audit_record(cycle_id='exit', state='HUNTING', action='SKIP', facts=[str(i)]))\n"
+        "sys.exit(2)\n"
+    )
+    code = subprocess.run([sys.executable, "-c", script, ROOT], capture_output=True, text=True).returncode
+    lines = read_log("t4")
+    ok = code == 2 and [r["decision_facts"][0] for r in lines] == [str(i) for i in range(50)]
+    print(f"exit code: {code} | drained records: {len(lines)}")
+    results.append({"case": "Drain At Exit", "result": "PASS" if ok else "FAIL", "details": f"{len(lines)}/50"})
+
+    # --- TEST 5: PER-RECORD LATENCY vs SYNCHRONOUS WRITER ---
+    print("\n--- TEST 5: LATENCY ON THE DECISION PATH ---")
+    started = time.perf_counter()
+    for i in range(300):
+        write_local_audit(record(i, "sync"), base_path="t5-sync")
+    sync_us = (time.perf_counter() - started) / 300 * 1e6
+    sink = AuditSink(base_path="t5-sink", flush_ms=60_000)
+    started = time.perf_counter()
+    for i in range(300):
+        sink.submit(record(i, "sink"))
+    sink_us = (time.perf_counter() - started) / 300 * 1e6
+    sink.close()
+    ok = sink_us < sync_us and len(read_log("t5-sink")) == 300
+    print(f"write_local_audit: {sync_us:.1f} us/record | AuditSink.submit: {sink_us:.1f} us/record")
+    results.append({"case": "Decision-Path Latency", "result": "PASS" if ok else "FAIL", "details": f"{sync_us:.0f} -> {sink_us:.0f} us"})
+    return results
+
+
+ROOT = os.getcwd()
+
+if __name__ == "__main__":
+    os.chdir(tempfile.mkdtemp(prefix="titan-audit-sink-"))
+    test_results = test_audit_sink()
+    print("\n=== SUMMARY ===")
+    for r in test_results:
+        print(r)
+    sys.exit(0 if all(r["result"] == "PASS" for r in test_results) else 1)
@@ -0,0 +1,170 @@
+import sys
+import os
+import json
+import time
+import tempfile
+
+# Add current path
+sys.path.append(os.getcwd())
+
+os.environ.setdefault("RUNTIME_CHECKPOINT", "false")
+os.environ.setdefault("REGIME_ENGINE", "numpy")
+os.environ["SCANNER_MODE"] = "whitelist"
+
+from main import TitanOmniBot
+from core.cycle_context import CycleContext
+from core.deadline import CycleDeadline
+from core.risk_gate import RiskGate
+from core.execution import ExecutionEngine
+from core.execution_intent import ExecutionTicket
+
+
+class SlowExchange:
+    """
+    Exchange local (sin red): tickers de la whitelist; fetch_ohlcv lento para los símbolos indicados.
+    Sin rateLimit/throttling: los tests 1-4 cubren solo clientes falsos; el throttling de ccxt
+    (Kraken ~3 s/petición) se cubre en el test 5 vía CycleDeadline.for_exchange.
+    """
+    def __init__(self, hang=(), hang_s=3.0, tickers_s=0.0):
+        self.hang = set(hang)
+        self.hang_s = hang_s
+        self.tickers_s = tickers_s
+
+    def fetch_tickers(self, symbols=None):
+        time.sleep(self.tickers_s)
+        return {s: {"symbol": s, "bid": 100.0, "ask": 100.1, "close": 100.0, "quoteVolume": 1e6 * (i + 1), "percentage": 1.0}
+                for i, s in enumerate(symbols or [])}
+
+    def fetch_ticker(self, symbol):
+        return {"symbol": symbol, "bid": 100.0, "ask": 100.1, "close": 100.0}
+
+    def fetch_balance(self):
+        return {"total": {"USDT": 1000.0}, "free": {"USDT": 1000.0}}
+
+    def fetch_ohlcv(self, symbol, timeframe="15m", since=None, limit=None):
+        if symbol in self.hang:
+            time.sleep(self.hang_s)
+        tf = 900_000
+        last = int(time.time() * 1000) // tf * tf
+        return [[last - (249 - i) * tf, 100.0 - i * 0.1, 100.2 - i * 0.1, 99.8 - i * 0.1, 100.0 - i * 0.1, 1.0] for i in range(250)]
+
+
+class CountingSupabase:
+    def __init__(self):
+        self.records = 0
+
+    def log_audit_record(self, record):
+        self.records += 1
+
+
+def audit_actions(cycle_id):
+    with open("data/forensics/audit_log.jsonl") as f:
+        records = [json.loads(line) for line in f]
+    return {r["symbol"]: (r["action"], r["decision_facts"]) for r in records if r["cycle_id"] == cycle_id}
+
+
+def run_hunting(bot, exchange, deadline, cycle_id):
+    bot.cycle_id = cycle_id
+    bot.exchange = exchange
+    bot.scanner.exchange = exchange
+    bot.deadline = deadline
+    bot.context = CycleContext(exchange, cycle_id, deadline=deadline)
+    start = time.perf_counter()
+    bot._state_hunting()
+    return time.perf_counter() - start
+
+
+def test_cycle_deadline():
+    results = []
+    bot = TitanOmniBot()
+    bot.supabase = CountingSupabase()
+
+    # --- TEST 1: HUNG FETCH IS CUT AT THE ACQUIRE BUDGET ---
+    print("--- TEST 1: HUNG OHLCV FETCH (3s) vs ACQUIRE BUDGET (0.5s) ---")
+    deadline = CycleDeadline(total_s=10, budgets={"acquire": 0.5})
+    elapsed = run_hunting(bot, SlowExchange(hang=["SOL/USDT"]), deadline, "dl-test1")
+    actions = audit_actions("dl-test1")
+    sol_action, sol_facts = actions["SOL/USDT"]
+    others = [a for s, (a, _) in actions.items() if s != "SOL/USDT"]
+    ok = sol_action == "SKIP_DEADLINE" and "deadline_stage=acquire" in sol_facts and "SKIP_DEADLINE" not in others and elapsed < 1.5
+    print(f"hunting elapsed: {elapsed:.2f}s | actions: { {s: a for s, (a, _) in actions.items()} }")
+    results.append({"case": "Acquire Budget", "result": "PASS" if ok else "FAIL", "details": f"{elapsed:.2f}s"})
+
+    # --- TEST 2: SCAN OVERRUNS THE CYCLE -> EVERY ASSET SKIP_DEADLINE ---
+    print("\n--- TEST 2: SLOW SCAN EXHAUSTS CYCLE DEADLINE ---")
+    deadline = CycleDeadline(total_s=0.3)
+    elapsed = run_hunting(bot, SlowExchange(tickers_s=0.5), deadline, "dl-test2")
+    actions = audit_actions("dl-test2")
+    ok = len(actions) == 5 and all(a == "SKIP_DEADLINE" and "deadline_stage=scan" in f for a, f in actions.values())
+    print(f"hunting elapsed: {elapsed:.2f}s | actions: {sorted({a for a, _ in actions.values()})} | exceeded: {deadline.exceeded}")
+    results.append({"case": "Scan Overrun", "result": "PASS" if ok else "FAIL", "details": str(deadline.exceeded)})
+
+    # --- TEST 3: RISK GATE AND EXECUTION FAIL CLOSED AFTER THE DEADLINE ---
+    print("\n--- TEST 3: RISK GATE / EXECUTION AFTER DEADLINE ---")
+    expired = CycleDeadline(total_s=0.01)
+    time.sleep(0.02)
+    exchange = SlowExchange()
+    context = CycleContext(exchange, "dl-test3", deadline=expired)
+    gate_ok, gate_reason, _ = RiskGate.pre_trade_check(exchange, "BTC/USDT", None, context=context)
+    ticket = ExecutionTicket(ticket_id="dl-1", symbol="BTC/USDT", action="BUY", order_type="MARKET", quantity=0.1, regime="BULL_TREND", reason="TEST")
+    result = ExecutionEngine(exchange, None).execute(ticket, context=context)
+    ok = not gate_ok and gate_reason == "RISK_GATE_DEADLINE_EXCEEDED" and result["status"] == "FAILED" and result["reason"] == "DEADLINE_EXCEEDED"
+    print(f"risk gate: {gate_reason} | execution: {result}")
+    results.append({"case": "Gate/Execution Fail-Closed", "result": "PASS" if ok else "FAIL", "details": gate_reason})
+
+    # --- TEST 3b: AN EXIT (SL/TP SELL) IS NOT DEFERRED BY THE DEADLINE ---
+    print("\n--- TEST 3b: EXIT AFTER DEADLINE ---")
+    exit_ok, exit_reason, _ = RiskGate.pre_trade_check(exchange, "BTC/USDT", None, context=context, action="SELL")
+    exit_ticket = ExecutionTicket(ticket_id="dl-2", symbol="BTC/USDT", action="SELL", order_type="MARKET", quantity=0.1, regime="BEAR_TREND", reason="STOP_LOSS")
+    exit_result = ExecutionEngine(exchange, None).execute(exit_ticket, context=context)
+    ok = exit_ok and exit_result["status"] == "FILLED"
+    print(f"risk gate: {exit_reason} | execution: {exit_result}")
+    results.append({"case": "Exit Not Deferred", "result": "PASS" if ok else "FAIL", "details": f"{exit_reason} / {exit_result['status']}"})
+
+    # --- TEST 4: REMOTE AUDIT WRITE IS NOT DROPPED BY THE DEADLINE ---
+    print("\n--- TEST 4: SUPABASE WRITE AFTER THE DEADLINE ---")
+    before = bot.supabase.records
+    bot.deadline = expired
+    bot.cycle_id = "dl-test4"
+    bot._log_audit("BTC/USDT", "N/A", None, "N/A", "N/A", "SKIP", None, [], [])
+    bot.audit.flush(cycle_end=True, remote=True)
+    _, facts = audit_actions("dl-test4")["BTC/USDT"]
+    ok = bot.supabase.records == before + 1 and not any(f.startswith("audit_remote") for f in facts)
+    print(f"remote writes: {bot.supabase.records - before} | facts: {facts}")
+    results.append({"case": "Remote Audit After Deadline", "result": "PASS" if ok else "FAIL", "details": str(facts)})
+
+    # --- TEST 5: BUDGETS SCALE WITH THE EXCHANGE RATE LIMIT ---
+    print("\n--- TEST 5: RATE-LIMITED EXCHANGE (3s/request, 5 assets) ---")
+    throttled = SlowExchange()
+    throttled.rateLimit, throttled.enableRateLimit = 3000, True
+    derived = CycleDeadline.for_exchange(throttled, assets=5)
+    plain = CycleDeadline.for_exchange(SlowExchange(), assets=5)
+    ok = derived.budgets["acquire"] >= 45 and derived.budgets["decide"] >= 15 \
+        and derived.total_s >= sum(derived.budgets[s] for s in ("scan", "acquire", "decide", "execution")) \
+        and plain.budgets == CycleDeadline.configured_budgets() and plain.total_s == CycleDeadline.configured_total()
+    print(f"throttled: total={derived.total_s:.1f}s budgets={derived.budgets} | plain: total={plain.total_s:.1f}s")
+    results.append({"case": "Rate-Limit Budgets", "result": "PASS" if ok else "FAIL", "details": f"total={derived.total_s:.1f}s"})
+
+    # --- TEST 6: .env VALUES LOADED AFTER IMPORT ARE HONOURED ---
+    print("\n--- TEST 6: EXPLICIT ENV SET AFTER IMPORT (load_dotenv) ---")
+    os.environ.update({"CYCLE_DEADLINE_S": "90", "DEADLINE_ACQUIRE_S": "60"})
+    try:
+        explicit = CycleDeadline.for_exchange(throttled, assets=5)
+    finally:
+        os.environ.pop("CYCLE_DEADLINE_S")
+        os.environ.pop("DEADLINE_ACQUIRE_S")
+    ok = explicit.total_s == 90 and explicit.budgets["acquire"] == 60 and explicit.budgets["decide"] >= 15
+    print(f"explicit: total={explicit.total_s:.1f}s budgets={explicit.budgets}")
+    results.append({"case": "Env After Import", "result": "PASS" if ok else "FAIL", "details": f"total={explicit.total_s:.1f}s"})
+
+    bot.wal.stop()
+    return results
+
+
+if __name__ == "__main__":
+    os.chdir(tempfile.mkdtemp(prefix="titan-deadline-"))
+    test_results = test_cycle_deadline()
+    print("\n=== SUMMARY ===")
+    for r in test_results:
+        print(r)
+    sys.exit(0 if all(r["result"] == "PASS" for r in test_results) else 1)
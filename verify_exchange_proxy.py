@@ -0,0 +1,231 @@
+import sys
+import os
+import time
+import threading
+
+# Add current path
+sys.path.append(os.getcwd())
+
+from core.exchange_proxy import CachingExchange
+from core.cycle_context import CycleContext
+from core.risk_gate import RiskGate
+
+
+class FakeExchange:
+    """Exchange local (sin red) que cuenta las llamadas reales por método."""
+    def __init__(self, latency=0.05):
+        self.latency = latency
+        self.calls = {}
+        self._lock = threading.Lock()
+
+    def _hit(self, method):
+        with self._lock:
+            self.calls[method] = self.calls.get(method, 0) + 1
+        time.sleep(self.latency)
+
+    def fetch_tickers(self, symbols=None):
+        self._hit("fetch_tickers")
+        return {s: {"symbol": s, "bid": 100.0, "ask": 100.1, "close": 100.05, "quoteVolume": 1e6, "percentage": 1.0} for s in (symbols or [])}
+
+    def fetch_ticker(self, symbol):
+        self._hit("fetch_ticker")
+        return {"symbol": symbol, "bid": 100.0, "ask": 100.1, "close": 100.05}
+
+    def fetch_ohlcv(self, symbol, timeframe="15m", since=None, limit=None):
+        self._hit("fetch_ohlcv")
+        return [[i * 900_000, 1.0, 1.0, 1.0, 1.0, 1.0] for i in range(limit or 10)]
+
+    def load_markets(self):
+        self._hit("load_markets")
+        return {"BTC/USDT": {"precision": {"amount": 8}}}
+
+    def fetch_balance(self):
+        self._hit("fetch_balance")
+        return {"total": {"USDT": 1000.0}, "free": {"USDT": 1000.0}}
+
+    def create_order(self, *args):
+        return {"id": "FAKE-1"}
+
+
+def test_exchange_proxy():
+    results = []
+
+    # --- TEST 1: TTL CACHE ---
+    print("--- TEST 1: TTL CACHE (REPEATED READS) ---")
+    fake = FakeExchange(latency=0.0)
+    proxy = CachingExchange(fake)
+    for _ in range(10):
+        proxy.fetch_ticker("BTC/USDT")
+        proxy.fetch_ohlcv("BTC/USDT", timeframe="15m", limit=250)
+        proxy.load_markets()
+    ok = fake.calls == {"fetch_ticker": 1, "fetch_ohlcv": 1, "load_markets": 1}
+    print(f"Real calls: {fake.calls} | stats: {proxy.stats()}")
+    results.append({"case": "TTL Cache", "result": "PASS" if ok else "FAIL", "details": str(fake.calls)})
+
+    # --- TEST 2: TTL EXPIRY + KEY PER ARGUMENTS ---
+    print("\n--- TEST 2: TTL EXPIRY / ARGUMENT KEYS ---")
+    fake = FakeExchange(latency=0.0)
+    proxy = CachingExchange(fake, ttls={"fetch_ticker": 0.05})
+    proxy.fetch_ticker("BTC/USDT")
+    proxy.fetch_ticker("ETH/USDT")
+    time.sleep(0.1)
+    proxy.fetch_ticker("BTC/USDT")
+    ok = fake.calls.get("fetch_ticker") == 3
+    results.append({"case": "TTL Expiry", "result": "PASS" if ok else "FAIL", "details": str(fake.calls)})
+
+    # --- TEST 3: IN-FLIGHT COALESCING ---
+    print("\n--- TEST 3: IN-FLIGHT COALESCING (8 THREADS) ---")
+    fake = FakeExchange(latency=0.2)
+    proxy = CachingExchange(fake)
+    barrier = threading.Barrier(8)
+
+    def worker():
+        barrier.wait()
+        proxy.fetch_tickers(["BTC/USDT", "ETH/USDT"])
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    stat = proxy.stats()["fetch_tickers"]
+    ok = fake.calls.get("fetch_tickers") == 1 and stat["coalesced"] + stat["hits"] == 7
+    print(f"Real calls: {fake.calls} | stats: {stat}")
+    results.append({"case": "Coalescing", "result": "PASS" if ok else "FAIL", "details": str(stat)})
+
+    # --- TEST 4: ERRORS ARE NOT CACHED ---
+    print("\n--- TEST 4: ERRORS NOT CACHED ---")
+    fake = FakeExchange(latency=0.0)
+    state = {"fail": True}
+    original = fake.fetch_balance
+
+    def flaky_balance():
+        if state["fail"]:
+            fake._hit("fetch_balance")
+            raise RuntimeError("NETWORK_DOWN")
+        return original()
+
+    fake.fetch_balance = flaky_balance
+    proxy = CachingExchange(fake)
+    try:
+        proxy.fetch_balance()
+        raised = False
+    except RuntimeError:
+        raised = True
+    state["fail"] = False
+    bal = proxy.fetch_balance()
+    ok = raised and bal["total"]["USDT"] == 1000.0 and proxy.stats()["fetch_balance"]["errors"] == 1
+    results.append({"case": "Errors Not Cached", "result": "PASS" if ok else "FAIL", "details": str(proxy.stats()["fetch_balance"])})
+
+    # --- TEST 4b: OWNER INTERRUPTED (BaseException) RELEASES WAITERS ---
+    print("\n--- TEST 4b: OWNER INTERRUPTED ---")
+    fake = FakeExchange(latency=0.0)
+
+    def interrupted_balance():
+        time.sleep(0.2)
+        raise KeyboardInterrupt()
+
+    fake.fetch_balance = interrupted_balance
+    proxy = CachingExchange(fake)
+    outcome = {}
+
+    def owner():
+        try:
+            proxy.fetch_balance()
+        except KeyboardInterrupt:
+            outcome["owner"] = "interrupted"
+
+    def waiter():
+        started = time.time()
+        try:
+            proxy.fetch_balance()
+        except RuntimeError as e:
+            outcome["waiter"] = (str(e), time.time() - started)
+
+    threads = [threading.Thread(target=owner), threading.Thread(target=waiter)]
+    threads[0].start()
+    time.sleep(0.05)
+    threads[1].start()
+    for t in threads:
+        t.join(timeout=5)
+    ok = outcome.get("owner") == "interrupted" and "waiter" in outcome and outcome["waiter"][1] < 1.0 and not proxy._inflight
+    print(f"outcome: {outcome}")
+    results.append({"case": "Interrupted Owner", "result": "PASS" if ok else "FAIL", "details": str(outcome.get("waiter"))})
+
+    # --- TEST 5: BYPASS FOR EXECUTION-CRITICAL READS ---
+    print("\n--- TEST 5: BYPASS (RISK GATE + EXECUTION) ---")
+    fake = FakeExchange(latency=0.0)
+    proxy = CachingExchange(fake)
+    ctx = CycleContext(proxy, "verify")
+    ctx.tickers(["BTC/USDT"])             # Scanner (cacheable)
+    ctx.balance()                          # Capital check (cacheable)
+    gate_ok, gate_reason, _ = RiskGate.pre_trade_check(proxy, "BTC/USDT", context=ctx)
+    ctx.ticker("BTC/USDT", critical=True)  # ExecutionEngine: reutiliza la lectura directa del RiskGate
+    stat = proxy.stats()
+    ok = gate_ok and stat["fetch_ticker"]["bypass"] == 1 and stat["fetch_balance"]["bypass"] == 1 and fake.calls.get("fetch_ticker") == 1
+    print(f"RiskGate: {gate_reason} | Real calls: {fake.calls} | facts: {ctx.drain_facts()}")
+    results.append({"case": "Critical Bypass", "result": "PASS" if ok else "FAIL", "details": str(fake.calls)})
+
+    # --- TEST 6: DROP-IN DELEGATION ---
+    print("\n--- TEST 6: DROP-IN DELEGATION ---")
+    ok = proxy.create_order("BTC/USDT", "market", "buy", 1) == {"id": "FAKE-1"}
+    results.append({"case": "Delegation", "result": "PASS" if ok else "FAIL", "details": "create_order passthrough"})
+
+    # --- TEST 7: CALL-COUNT REDUCTION (SIMULATED CYCLE) ---
+    print("\n--- TEST 7: CALL-COUNT REDUCTION (5 ASSETS x 3 TF, 3 COMPONENTS) ---")
+    symbols = ["BTC/USDT", "ETH/USDT", "SOL/USDT", "XRP/USDT", "ADA/USDT"]
+
+    def simulated_cycle(exchange):
+        exchange.fetch_tickers(symbols)
+        for s in symbols:
+            for tf in ("15m", "1h", "4h"):
+                exchange.fetch_ohlcv(s, timeframe=tf, limit=250)
+            exchange.fetch_balance()
+        for s in symbols[:2]:
+            exchange.fetch_tickers(symbols)
+            for tf in ("1h", "4h"):
+                exchange.fetch_ohlcv(s, timeframe=tf, limit=250)
+
+    raw = FakeExchange(latency=0.0)
+    simulated_cycle(raw)
+    cached_fake = FakeExchange(latency=0.0)
+    simulated_cycle(CachingExchange(cached_fake))
+    raw_total = sum(raw.calls.values())
+    cached_total = sum(cached_fake.calls.values())
+    ok = cached_total < raw_total
+    print(f"Raw calls: {raw_total} {raw.calls} | Cached calls: {cached_total} {cached_fake.calls}")
+    results.append({"case": "Call Reduction", "result": "PASS" if ok else "FAIL", "details": f"{raw_total} -> {cached_total}"})
+
+    # --- TEST 8: STALENESS BOUNDS SET AFTER IMPORT (.env) ---
+    print("\n--- TEST 8: CTX_*_MAX_AGE FROM .env ---")
+    os.environ["CTX_TICKER_MAX_AGE"] = "1"
+    try:
+        ctx = CycleContext(CachingExchange(FakeExchange(latency=0.0)), "verify-env")
+    finally:
+        os.environ.pop("CTX_TICKER_MAX_AGE")
+    ok = ctx.ticker_max_age == 1.0
+    results.append({"case": "Context Env After Import", "result": "PASS" if ok else "FAIL", "details": f"ticker_max_age={ctx.ticker_max_age}"})
+
+    # --- TEST 9: TTL OVERRIDES SET AFTER IMPORT (.env) ---
+    print("\n--- TEST 9: EXCHANGE_TTL_* FROM .env ---")
+    os.environ["EXCHANGE_TTL_FETCH_OHLCV"] = "0"
+    try:
+        fake = FakeExchange(latency=0.0)
+        proxy = CachingExchange(fake)
+    finally:
+        os.environ.pop("EXCHANGE_TTL_FETCH_OHLCV")
+    proxy.fetch_ohlcv("BTC/USDT", timeframe="15m", limit=5)
+    time.sleep(0.01)
+    proxy.fetch_ohlcv("BTC/USDT", timeframe="15m", limit=5)
+    ok = fake.calls.get("fetch_ohlcv") == 2
+    results.append({"case": "TTL Env After Import", "result": "PASS" if ok else "FAIL", "details": str(fake.calls)})
+
+    return results
+
+
+if __name__ == "__main__":
+    test_results = test_exchange_proxy()
+    print("\n=== SUMMARY ===")
+    for r in test_results:
+        print(r)
+    sys.exit(0 if all(r["result"] == "PASS" for r in test_results) else 1)
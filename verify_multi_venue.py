@@ -0,0 +1,131 @@
+import sys
+import os
+import time
+
+# Add current path
+sys.path.append(os.getcwd())
+
+os.environ.setdefault("SCANNER_MODE", "universe")
+os.environ.setdefault("SCANNER_TIERS", "false")
+os.environ.setdefault("SCANNER_MIN_QUOTE_VOLUME", "1000")
+
+from core.scanner import Scanner
+from core.prefetch import DataPrefetcher
+from core.venues import build_venue
+
+
+class FakeVenue:
+    """Exchange local (sin red) con latencia fija y volumen por símbolo."""
+    def __init__(self, volumes, latency=0.2, rate_limit_ms=0, fail=False):
+        self.volumes = volumes
+        self.latency = latency
+        self.rateLimit = rate_limit_ms
+        self.enableRateLimit = False
+        self.fail = fail
+        self.calls = 0
+
+    def load_markets(self):
+        self.calls += 1
+        time.sleep(self.latency)
+        if self.fail:
+            raise RuntimeError("VENUE_DOWN")
+        return {s: {"symbol": s, "quote": "USDT", "active": True, "spot": True} for s in self.volumes}
+
+    def fetch_tickers(self, symbols=None):
+        self.calls += 1
+        time.sleep(self.latency)
+        return {
+            s: {"symbol": s, "bid": 100.0, "ask": 100.1, "quoteVolume": v, "percentage": 1.0}
+            for s, v in self.volumes.items() if symbols is None or s in symbols
+        }
+
+
+def test_multi_venue():
+    results = []
+
+    kraken = FakeVenue({"BTC/USDT": 5e6, "ETH/USDT": 4e6, "SOL/USDT": 1e6})
+    binance = FakeVenue({"BTC/USDT": 9e7, "ETH/USDT": 2e6, "SOL/USDT": 3e7, "PEPE/USDT": 8e7})
+    okx = FakeVenue({"BTC/USDT": 1e7, "SOL/USDT": 5e7})
+
+    def venues(require_primary=True, down=False):
+        os.environ["SCANNER_REQUIRE_PRIMARY"] = "true" if require_primary else "false"
+        okx.fail = down
+        return [
+            build_venue("kraken", exchange=kraken, min_interval_ms=0, cache=False, primary=True),
+            build_venue("binance", exchange=binance, min_interval_ms=0, cache=False),
+            build_venue("okx", exchange=okx, min_interval_ms=0, cache=False),
+        ]
+
+    # --- TEST 1: CONCURRENT FAN-OUT ---
+    print("--- TEST 1: CONCURRENT FAN-OUT (3 VENUES x 2 CALLS x 200ms) ---")
+    scanner = Scanner(kraken, venues=venues())
+    start = time.perf_counter()
+    ranked = scanner.scan_assets()
+    elapsed = time.perf_counter() - start
+    ok = elapsed < 0.2 * 2 * 3 * 0.7
+    print(f"Elapsed: {elapsed:.3f}s (sequential would be ~1.2s) | ranked: {ranked}")
+    results.append({"case": "Concurrent Fan-out", "result": "PASS" if ok else "FAIL", "details": f"{elapsed:.3f}s"})
+
+    # --- TEST 2: BEST VENUE PER SYMBOL (PRIMARY-LISTED ONLY) ---
+    print("\n--- TEST 2: BEST VENUE / REQUIRE PRIMARY ---")
+    ok = ranked == ["BTC/USDT", "SOL/USDT", "ETH/USDT"] and scanner.best_venue == {
+        "BTC/USDT": "binance", "SOL/USDT": "okx", "ETH/USDT": "kraken"
+    }
+    print(f"best_venue: {scanner.best_venue} | facts BTC: {scanner.venue_facts('BTC/USDT')}")
+    results.append({"case": "Best Venue", "result": "PASS" if ok else "FAIL", "details": str(scanner.best_venue)})
+
+    # --- TEST 3: FULL BREADTH ACROSS VENUES ---
+    print("\n--- TEST 3: BREADTH ACROSS VENUES (REQUIRE PRIMARY OFF) ---")
+    scanner = Scanner(kraken, venues=venues(require_primary=False))
+    ranked = scanner.scan_assets()
+    ok = ranked[:2] == ["BTC/USDT", "PEPE/USDT"] and scanner.best_venue["PEPE/USDT"] == "binance"
+    print(f"ranked: {ranked}")
+    results.append({"case": "Cross-Venue Breadth", "result": "PASS" if ok else "FAIL", "details": str(ranked)})
+
+    # --- TEST 4: VENUE DOWN DOES NOT BLOCK RANKING ---
+    print("\n--- TEST 4: VENUE DOWN ---")
+    scanner = Scanner(kraken, venues=venues(down=True))
+    ranked = scanner.scan_assets()
+    ok = ranked[0] == "BTC/USDT" and scanner.best_venue.get("SOL/USDT") == "binance"
+    print(f"ranked: {ranked} | best_venue: {scanner.best_venue}")
+    results.append({"case": "Venue Down", "result": "PASS" if ok else "FAIL", "details": str(scanner.last_scan.get("venues"))})
+
+    # --- TEST 5: PER-VENUE RATE-LIMIT ACCOUNTING ---
+    print("\n--- TEST 5: PER-VENUE RATE LIMIT ---")
+    slow = FakeVenue({"BTC/USDT": 1e6}, latency=0.0)
+    fast = FakeVenue({"BTC/USDT": 2e6}, latency=0.0)
+    v_slow = build_venue("slow", exchange=slow, min_interval_ms=100, cache=False)
+    v_fast = build_venue("fast", exchange=fast, min_interval_ms=0, cache=False)
+    for _ in range(3):
+        v_slow.exchange.fetch_tickers(["BTC/USDT"])
+        v_fast.exchange.fetch_tickers(["BTC/USDT"])
+    s_slow, s_fast = v_slow.limiter.stats(), v_fast.limiter.stats()
+    ok = s_slow["requests"] == 3 and s_slow["throttled"] == 2 and s_fast["throttled"] == 0 and s_fast["requests"] == 3
+    print(f"slow: {s_slow} | fast: {s_fast}")
+    results.append({"case": "Rate-Limit Accounting", "result": "PASS" if ok else "FAIL", "details": f"slow={s_slow} fast={s_fast}"})
+
+    # --- TEST 6: PREFETCH THREADS SHARE ONE LIMITER (CCXT THROTTLE IS NOT THREAD-SAFE) ---
+    print("\n--- TEST 6: PREFETCH THREADS x PRIMARY CLIENT ---")
+    primary = FakeVenue({"BTC/USDT": 1e6}, latency=0.0, rate_limit_ms=100)
+    primary.enableRateLimit = True
+    v_primary = build_venue("kraken", exchange=primary, cache=False, primary=True)
+    stamps = []
+    with DataPrefetcher(4) as prefetcher:
+        for i in range(4):
+            prefetcher.submit(i, lambda: (v_primary.exchange.fetch_tickers(["BTC/USDT"]), stamps.append(time.monotonic())))
+        for i in range(4):
+            prefetcher.result(i)
+    gaps = [b - a for a, b in zip(sorted(stamps), sorted(stamps)[1:])]
+    ok = len(gaps) == 3 and min(gaps) >= 0.09 and v_primary.limiter.stats()["throttled"] == 3
+    print(f"gaps between requests (s): {[round(g, 3) for g in gaps]}")
+    results.append({"case": "Shared Prefetch Limiter", "result": "PASS" if ok else "FAIL", "details": f"min_gap={min(gaps):.3f}s"})
+
+    return results
+
+
+if __name__ == "__main__":
+    test_results = test_multi_venue()
+    print("\n=== SUMMARY ===")
+    for r in test_results:
+        print(r)
+    sys.exit(0 if all(r["result"] == "PASS" for r in test_results) else 1)
@@ -0,0 +1,149 @@
+import sys
+import os
+import time
+import zlib
+import random
+import tempfile
+
+# Add current path
+sys.path.append(os.getcwd())
+
+os.environ.setdefault("RUNTIME_CHECKPOINT", "false")
+os.environ.setdefault("REGIME_ENGINE", "numpy")
+
+from main import TitanOmniBot, scan_shard
+from core.prefetch import DataPrefetcher
+from core.shard_scan import ShardedScan, partition
+from core.snapshot_store import SNAPSHOTS
+
+TF_MS = {"15m": 900_000, "1h": 3_600_000, "4h": 14_400_000}
+
+
+class FakeMarket:
+    """Exchange local (sin red): velas deterministas por símbolo; tendencia alcista o bajista según el símbolo."""
+    def __init__(self, jitter=0.0):
+        self.jitter = jitter
+
+    def fetch_ohlcv(self, symbol, timeframe="15m", since=None, limit=None):
+        if self.jitter:
+            time.sleep(random.random() * self.jitter)
+        if symbol.startswith("BAD"):
+            raise RuntimeError(f"FETCH_FAILED {symbol}")
+        if symbol.startswith("CRASH"):
+            os._exit(3)
+        tf = TF_MS[timeframe]
+        now = int(time.time() * 1000)
+        last = now // tf * tf
+        first = since if since is not None else last - (max(limit or 250, 1) - 1) * tf
+        seed = zlib.crc32(symbol.encode())
+        drift = 0.002 if seed % 2 else -0.002
+        candles = []
+        for ts in range(first // tf * tf, last + 1, tf):
+            k = ts // 900_000
+            close = 100 * (1 + drift) ** (k % 100_000) * (1 + 0.01 * ((k * 7 + seed) % 5) / 5)
+            candles.append([ts, close * 0.999, close * 1.004, close * 0.996, close, 10.0])
+        return candles
+
+
+class JitterMarket(FakeMarket):
+    def __init__(self):
+        super().__init__(jitter=0.02)
+
+
+def comparable(acquired, mtf, assets):
+    """Vista comparable (sin hashes/rutas de snapshot, que incluyen la hora de escritura)."""
+    out = []
+    for asset in assets:
+        pre = acquired[asset]
+        if isinstance(pre, Exception):
+            out.append((asset, "ERROR", str(pre)))
+            continue
+        ohlcv, _, regime, volatility = pre
+        item = (asset, regime, round(volatility, 10), len(ohlcv), ohlcv[-1][0])
+        if mtf.has(("mtf", asset)):
+            r1h, ok1, r4h, ok4, facts = mtf.result(("mtf", asset))
+            item += (r1h, ok1, r4h, ok4, tuple(f for f in facts if "_hash=" not in f))
+        out.append(item)
+    return out
+
+
+def test_shard_scan():
+    results = []
+    bot = TitanOmniBot()
+    assets = [f"S{i:02d}/USDT" for i in range(12)]
+
+    # --- TEST 1: DETERMINISTIC PARTITION ---
+    print("--- TEST 1: ROUND-ROBIN PARTITION ---")
+    shards = partition(assets, 5)
+    ok = shards[0] == ["S00/USDT", "S05/USDT", "S10/USDT"] and sorted(sum(shards, [])) == assets and partition(assets[:2], 5) == [["S00/USDT"], ["S01/USDT"]]
+    print(f"shards: {shards}")
+    results.append({"case": "Partition", "result": "PASS" if ok else "FAIL", "details": str([len(s) for s in shards])})
+
+    # --- TEST 2: PARITY WITH IN-PROCESS ACQUISITION ---
+    print("\n--- TEST 2: PARITY (THREADS vs 3 PROCESSES) ---")
+    bot.exchange = FakeMarket()
+    bot.regime_cache.entries.clear()
+    with DataPrefetcher() as prefetcher:
+        acquired = bot._acquisition_stage(prefetcher, assets)
+        baseline = comparable(acquired, prefetcher, assets)
+    bot.regime_cache.entries.clear()
+    bot.shard_scan = ShardedScan(scan_shard, shards=3)
+    bot.shard_exchange_factory = FakeMarket
+    start = time.perf_counter()
+    acquired, mtf = bot._sharded_acquisition(assets)
+    sharded = comparable(acquired, mtf, assets)
+    elapsed = time.perf_counter() - start
+    strip = lambda rows: [r[:9] for r in rows]
+    bulls = sum(1 for r in baseline if len(r) > 5)
+    ok = strip(baseline) == strip(sharded) and bulls > 0 and len(bot.regime_cache.entries) > 0
+    print(f"BULL candidates: {bulls} | first run (incl. worker start): {elapsed:.2f}s | regime cache merged: {len(bot.regime_cache.entries)}")
+    results.append({"case": "Parity", "result": "PASS" if ok else "FAIL", "details": f"bulls={bulls}"})
+
+    # --- TEST 3: RESULTS INDEPENDENT OF WORKER SCHEDULING ---
+    print("\n--- TEST 3: DETERMINISM UNDER RANDOM WORKER LATENCY ---")
+    bot.shard_exchange_factory = JitterMarket
+    runs = []
+    for _ in range(2):
+        bot.regime_cache.entries.clear()
+        acquired, mtf = bot._sharded_acquisition(assets)
+        runs.append((comparable(acquired, mtf, assets), list(bot.regime_cache.entries.items())))
+    ok = runs[0] == runs[1] and [r[0] for r in runs[0][0]] == assets
+    results.append({"case": "Scheduling Independence", "result": "PASS" if ok else "FAIL", "details": f"{len(runs[0][0])} assets"})
+
+    # --- TEST 4: ASSET AND SHARD FAILURES ARE FAIL-CLOSED PER ASSET ---
+    print("\n--- TEST 4: FETCH ERROR + WORKER CRASH ---")
+    bot.shard_exchange_factory = FakeMarket
+    faulty = assets[:4] + ["BAD/USDT"] + assets[4:6]
+    acquired, _ = bot._sharded_acquisition(faulty)
+    fetch_error_ok = isinstance(acquired["BAD/USDT"], Exception) and not any(isinstance(acquired[a], Exception) for a in faulty if a != "BAD/USDT")
+    crashing = assets[:5] + ["CRASH/USDT"]
+    acquired, _ = bot._sharded_acquisition(crashing)
+    crashed = [a for a in crashing if isinstance(acquired[a], Exception)]
+    acquired, _ = bot._sharded_acquisition(assets[:6])
+    recovered = not any(isinstance(v, Exception) for v in acquired.values())
+    ok = fetch_error_ok and "CRASH/USDT" in crashed and recovered
+    print(f"errored after crash: {crashed} | recovered next cycle: {recovered}")
+    results.append({"case": "Failure Isolation", "result": "PASS" if ok else "FAIL", "details": f"crashed={crashed}"})
+
+    # --- TEST 5: SNAPSHOT REFS WRITTEN BY WORKERS REACH THE COORDINATOR ---
+    print("\n--- TEST 5: SHARD SNAPSHOT REFS ---")
+    SNAPSHOTS._latest.clear()
+    bot._sharded_acquisition(assets[:6])
+    refs = SNAPSHOTS.export_latest()
+    covered = [a for a in assets[:6] if any(k.rpartition("|")[0] == a for k in refs)]
+    ok = covered == assets[:6] and all(refs.values())
+    print(f"coordinator refs: {len(refs)} keys for {len(covered)}/6 assets")
+    results.append({"case": "Shard Snapshot Refs", "result": "PASS" if ok else "FAIL", "details": f"keys={len(refs)}"})
+
+    bot.shard_scan.shutdown()
+    bot.wal.stop()
+    return results
+
+
+if __name__ == "__main__":
+    os.chdir(tempfile.mkdtemp(prefix="titan-shards-"))
+    test_results = test_shard_scan()
+    print("\n=== SUMMARY ===")
+    for r in test_results:
+        print(r)
+    sys.exit(0 if all(r["result"] == "PASS" for r in test_results) else 1)
@@ -0,0 +1,175 @@
+import sys
+import os
+import json
+import glob
+import marshal
+import tempfile
+import subprocess
+
+# Add current path
+sys.path.append(os.getcwd())
+
+os.environ["SNAPSHOT_STORE"] = "chunked"
+
+from core.post_audit import save_ohlcv_snapshot
+from core.snapshot_store import SnapshotStore, load_snapshot, snapshot_hash
+from core.snapshot_format import SnapshotReader, binary_to_json, candle_fragments, json_to_binary, stream_hash
+
+TF = 900_000
+
+
+def window(cycle, limit=250):
+    """Ventana deslizante de 250 velas 15m: cerradas + vela en formación (cambia en cada ciclo)."""
+    last = 1_700_000_100_000 // TF * TF + cycle * TF
+    candles = []
+    for i in range(limit - 1):
+        ts = last - (limit - 1 - i) * TF
+        k = ts // TF
+        candles.append([ts, 100.0 + (k % 50) * 0.01, 100.5, 99.5, 100.0 + (k % 7) * 0.123, 12.5 + k % 3])
+    candles.append([last, 101.0, 101.2 + cycle * 0.001, 100.9, 101.1 + cycle * 0.002, 3])
+    return candles
+
+
+def legacy_bytes(snapshot):
+    return json.dumps(snapshot, indent=2).encode("utf-8")
+
+
+def make_snapshot(cycle, ohlcv, symbol="BTC/USDT"):
+    snapshot = {"cycle_id": f"c{cycle:04d}", "state": "HUNTING", "symbol": symbol, "timeframe": "15m",
+                "limit": 250, "ohlcv": ohlcv, "timestamp": f"2026-01-01T00:{cycle % 60:02d}:00+00:00"}
+    snapshot["snapshot_hash"] = snapshot_hash(snapshot)
+    return snapshot
+
+
+def dir_size(path):
+    return sum(os.path.getsize(p) for p in glob.glob(os.path.join(path, "**", "*"), recursive=True) if os.path.isfile(p))
+
+
+def test_snapshot_store():
+    results = []
+    store = SnapshotStore(chunk_dir="cas/chunks")
+
+    # --- TEST 1: BYTE-EXACT RECONSTRUCTION + UNCHANGED HASH ---
+    print("--- TEST 1: BYTE-EXACT RECONSTRUCTION ---")
+    snapshot = make_snapshot(0, window(0))
+    path = store.save(snapshot, "cas/manifests/c0000.json")
+    ok = store.read_bytes(path) == legacy_bytes(snapshot) and store.verify(path) and store.load(path)["snapshot_hash"] == snapshot["snapshot_hash"]
+    print(f"manifest: {os.path.getsize(path)} bytes | legacy: {len(legacy_bytes(snapshot))} bytes")
+    results.append({"case": "Byte-Exact", "result": "PASS" if ok else "FAIL", "details": snapshot["snapshot_hash"][:12]})
+
+    # --- TEST 2: ONE DAY OF 15m CYCLES (DEDUP RATIO) ---
+    print("\n--- TEST 2: 96 CONSECUTIVE CYCLES ---")
+    legacy_total = 0
+    exact = True
+    for cycle in range(1, 97):
+        snapshot = make_snapshot(cycle, window(cycle))
+        legacy_total += len(legacy_bytes(snapshot))
+        path = store.save(snapshot, f"cas/manifests/c{cycle:04d}.json")
+        exact = exact and store.read_bytes(path) == legacy_bytes(snapshot)
+    cas_total = dir_size("cas")
+    ratio = cas_total / legacy_total
+    ok = exact and ratio < 0.2
+    print(f"legacy: {legacy_total / 1024:.0f} KB | chunked: {cas_total / 1024:.0f} KB ({ratio:.1%}) | metrics: {store.metrics}")
+    results.append({"case": "Dedup Ratio", "result": "PASS" if ok else "FAIL", "details": f"{ratio:.1%}"})
+
+    # --- TEST 3: PIPELINE ENTRY POINT + LEGACY FILES STILL READABLE ---
+    print("\n--- TEST 3: save_ohlcv_snapshot + LEGACY PASSTHROUGH ---")
+    result = save_ohlcv_snapshot("pipe-1", "HUNTING", "ETH/USDT", "15m", 250, window(5))
+    loaded = load_snapshot(result["path"])
+    legacy_path = "cas/legacy.json"
+    legacy = make_snapshot(7, window(7))
+    with open(legacy_path, "w", encoding="utf-8") as f:
+        json.dump(legacy, f, indent=2)
+    ok = snapshot_hash(loaded) == result["hash"] and store.verify(legacy_path) and store.read_bytes(legacy_path) == legacy_bytes(legacy)
+    print(f"pipeline hash: {result['hash'][:12]} | legacy verify: {store.verify(legacy_path)}")
+    results.append({"case": "Pipeline + Legacy", "result": "PASS" if ok else "FAIL", "details": result["path"]})
+
+    # --- TEST 4: TAMPERED CHUNK IS DETECTED ---
+    print("\n--- TEST 4: TAMPERED CHUNK ---")
+    manifest = json.load(open("cas/manifests/c0096.json"))
+    chunk_file = store.chunk_path(manifest["chunks"][3][0])
+    with open(chunk_file, "r+b") as f:
+        data = f.read()
+        f.seek(len(data) // 2)
+        f.write(bytes([data[len(data) // 2] ^ 0xFF]))
+    ok = not store.verify("cas/manifests/c0096.json")
+    results.append({"case": "Tamper Detection", "result": "PASS" if ok else "FAIL", "details": os.path.basename(chunk_file)[:12]})
+
+    # --- TEST 5: SINGLE-PASS HASH == LEGACY TWO-PASS HASH ---
+    print("\n--- TEST 5: SINGLE-PASS STREAMING HASH ---")
+    import hashlib
+    mixed = window(3)
+    mixed[10][5] = None
+    mixed[11][4] = 101
+    snapshot = make_snapshot(3, mixed)
+    payload = {k: v for k, v in snapshot.items() if k != "snapshot_hash"}
+    two_pass = hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+    ok = stream_hash(snapshot, candle_fragments(mixed)) == two_pass == snapshot["snapshot_hash"]
+    results.append({"case": "Single-Pass Hash", "result": "PASS" if ok else "FAIL", "details": two_pass[:12]})
+
+    # --- TEST 6: LEGACY JSON <-> BINARY CONVERTER (int/float/null preserved) ---
+    print("\n--- TEST 6: CONVERTER ROUNDTRIP ---")
+    with open("cas/mixed.json", "w", encoding="utf-8") as f:
+        json.dump(snapshot, f, indent=2)
+    original = open("cas/mixed.json", "rb").read()
+    sizes = {}
+    exact = True
+    for codec in ("none", "zlib", "lzma", "bz2"):
+        out = json_to_binary("cas/mixed.json", f"cas/mixed.{codec}.tosb", codec=codec)
+        sizes[codec] = os.path.getsize(out)
+        exact = exact and binary_to_json(out) == original and store.read_bytes(out) == original and store.verify(out)
+    # to-binary convierte en la misma ruta: la ruta auditada (ohlcv_*_path) sigue verificando
+    os.makedirs("conv", exist_ok=True)
+    with open("conv/audited.json", "wb") as f:
+        f.write(original)
+    converter = subprocess.run([sys.executable, os.path.join(ROOT, "scripts", "snapshot_convert.py"), "to-binary", "conv"],
+                               capture_output=True, text=True, env=dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [ROOT, os.getenv("PYTHONPATH")]))))
+    in_place = converter.returncode == 0 and os.listdir("conv") == ["audited.json"] \
+        and open("conv/audited.json", "rb").read(4) != original[:4] and load_snapshot("conv/audited.json") == snapshot \
+        and store.verify("conv/audited.json")
+    ok = exact and in_place and sizes["zlib"] < len(original) / 3
+    print(f"legacy JSON: {len(original)} bytes | binary: {sizes} | converted in place: {in_place}")
+    results.append({"case": "Converter Roundtrip", "result": "PASS" if ok else "FAIL", "details": str(sizes)})
+
+    # --- TEST 7: ZERO-COPY MMAP READER ---
+    print("\n--- TEST 7: ZERO-COPY NUMPY COLUMNS ---")
+    reader = SnapshotReader("cas/mixed.none.tosb")
+    columns = reader.columns()
+    zero_copy = not columns["close"].flags.owndata and not columns["close"].flags.writeable
+    ok = zero_copy and columns["timestamp"].dtype.name == "int64" and columns["close"][11] == 101.0 and len(columns["close"]) == 250
+    del columns
+    reader.close()
+    fresh = SnapshotStore(chunk_dir="cas2/chunks")
+    fresh.save(make_snapshot(50, window(50)), "cas2/c0050.json")
+    arrays = fresh.arrays("cas2/c0050.json")
+    ok = ok and list(arrays["timestamp"]) == [c[0] for c in window(50)] and list(arrays["close"]) == [c[4] for c in window(50)]
+    results.append({"case": "Zero-Copy Reader", "result": "PASS" if ok else "FAIL", "details": f"zero_copy={zero_copy}"})
+
+    # --- TEST 8: CRON MODE (NEW PROCESS PER CYCLE) WITH REFS FROM THE CHECKPOINT ---
+    print("\n--- TEST 8: CRON RESTART ---")
+    written = {}
+    for name, restored in (("cold", False), ("warm", True)):
+        previous = SnapshotStore(chunk_dir=f"cron-{name}/chunks")
+        previous.save(make_snapshot(200, window(200)), f"cron-{name}/c0200.json")
+        current = SnapshotStore(chunk_dir=f"cron-{name}/chunks")
+        if restored:
+            current.import_latest(marshal.loads(marshal.dumps(previous.export_latest())))
+        snapshot = make_snapshot(201, window(201))
+        path = current.save(snapshot, f"cron-{name}/c0201.json")
+        written[name] = current.metrics["chunks_written"]
+        ok = current.read_bytes(path) == legacy_bytes(snapshot) and current.verify(path)
+    ok = ok and written["warm"] == 1 and written["cold"] > written["warm"]
+    print(f"chunks written by the next process: without refs {written['cold']} | with checkpoint refs {written['warm']}")
+    results.append({"case": "Cron Restart", "result": "PASS" if ok else "FAIL", "details": str(written)})
+    return results
+
+
+ROOT = os.getcwd()
+
+if __name__ == "__main__":
+    os.chdir(tempfile.mkdtemp(prefix="titan-snapshots-"))
+    test_results = test_snapshot_store()
+    print("\n=== SUMMARY ===")
+    for r in test_results:
+        print(r)
+    sys.exit(0 if all(r["result"] == "PASS" for r in test_results) else 1)
@@ -0,0 +1,197 @@
+import sys
+import os
+import json
+import time
+import tempfile
+
+# Add current path
+sys.path.append(os.getcwd())
+
+from core.outbox import NATURAL_KEYS, SupabaseOutbox
+from core.audit_sink import AuditSink
+from core.post_audit import build_audit_record
+from data.supabase_client import SupabaseClient
+
+
+class FakeSupabase:
+    """
+    API de tablas de Supabase en proceso: table(t).insert/upsert(rows, on_conflict, ignore_duplicates).execute().
+    Claves únicas = NATURAL_KEYS. down -> caída del servicio; reject(row) -> rechazo de fila;
+    lose_response -> aplica el lote y falla la respuesta (reenvío del mismo lote).
+    """
+    def __init__(self):
+        self.tables = {}
+        self.requests = {}
+        self.down = False
+        self.lose_response = False
+        self.reject = lambda table, row: False
+
+    def table(self, name):
+        return _FakeQuery(self, name)
+
+
+class _FakeQuery:
+    def __init__(self, db, name):
+        self.db, self.name, self.rows, self.ignore_duplicates = db, name, [], False
+
+    def insert(self, rows):
+        self.rows = rows if isinstance(rows, list) else [rows]
+        return self
+
+    def upsert(self, rows, on_conflict="", ignore_duplicates=False):
+        assert on_conflict == ",".join(NATURAL_KEYS[self.name])
+        self.ignore_duplicates = ignore_duplicates
+        return self.insert(rows)
+
+    def execute(self):
+        db = self.db
+        db.requests[self.name] = db.requests.get(self.name, 0) + 1
+        if db.down:
+            raise ConnectionError("supabase unreachable")
+        if any(db.reject(self.name, row) for row in self.rows):
+            raise ValueError("violates check constraint")
+        table = db.tables.setdefault(self.name, {})
+        keys = NATURAL_KEYS.get(self.name)
+        for row in self.rows:
+            key = tuple(row.get(k) for k in keys) if keys else len(table)
+            if key in table and not self.ignore_duplicates:
+                raise ValueError(f"duplicate key {key}")
+            table.setdefault(key, row)
+        if db.lose_response:
+            db.lose_response = False
+            raise TimeoutError("response lost")
+        return self
+
+
+def audit_row(i, cycle_id="ob-1", symbol=None):
+    return {"cycle_id": cycle_id, "symbol": symbol or f"A{i:03d}/USDT", "action": "SKIP_MTF",
+            "timestamp": f"2026-10-18T00:00:{i % 60:02d}.{i:06d}+00:00", "decision_facts": [f"asset_index={i}"]}
+
+
+def spool_files(path):
+    return sorted(n for n in os.listdir(path) if n.startswith("spool-"))
+
+
+def test_outbox():
+    results = []
+
+    # --- TEST 1: PER-TABLE BATCHING THROUGH SupabaseClient ---
+    print("--- TEST 1: BATCHED INSERTS PER TABLE ---")
+    fake = FakeSupabase()
+    client = SupabaseClient.__new__(SupabaseClient)
+    client.mode, client.client = "DRY_RUN", fake
+    client.outbox = SupabaseOutbox(fake, spool_dir="t1", batch_max=100, autostart=False)
+    client.log_audit_records([audit_row(i) for i in range(250)])
+    for i in range(3):
+        client.log_execution(f"ob-{i}", "HOLD", "TEST")
+    client.record_paper_state("ob-1", 900.0, 0.5, 200.0, "ETH/USDT")
+    pending_read = client.get_latest_portfolio_state("ETH/USDT")
+    exists_pending = client.check_log_exists("ob-2")
+    drained = client.outbox.drain(timeout_s=5)
+    ok = drained and fake.requests == {"audit_trail": 3, "execution_logs": 1, "paper_wallet": 1} \
+        and len(fake.tables["audit_trail"]) == 250 and pending_read == (900.0, 0.5, 200.0) and exists_pending \
+        and spool_files("t1") == []
+    print(f"requests: {fake.requests} | read-your-writes: {pending_read} | metrics: {client.outbox_metrics()}")
+    results.append({"case": "Per-Table Batching", "result": "PASS" if ok else "FAIL", "details": str(fake.requests)})
+    client.close()
+
+    # --- TEST 2: OUTAGE -> BACKLOG METRICS + BACKOFF, NOTHING LOST ---
+    print("\n--- TEST 2: OUTAGE AND RECOVERY ---")
+    fake = FakeSupabase()
+    fake.down = True
+    box = SupabaseOutbox(fake, spool_dir="t2", batch_max=20, retry_base_s=0.05, retry_max_s=0.2)
+    for i in range(50):
+        box.enqueue("audit_trail", audit_row(i, "ob-2"))
+    time.sleep(0.6)
+    during = box.metrics()
+    fake.down = False
+    drained = box.drain(timeout_s=5)
+    ok = during["backlog"] == 50 and during["failures"] >= 2 and during["oldest_age_s"] > 0 \
+        and during["spool_segments"] == 1 and drained and len(fake.tables["audit_trail"]) == 50
+    print(f"during outage: backlog={during['backlog']} failures={during['failures']} tables={during['tables']} | after: {box.metrics()['shipped']} shipped")
+    results.append({"case": "Outage Backlog", "result": "PASS" if ok else "FAIL", "details": f"{during['failures']} failed attempts"})
+    box.close()
+
+    # --- TEST 3: CRASH + REPLAY IS IDEMPOTENT (NATURAL KEYS) ---
+    print("\n--- TEST 3: IDEMPOTENT REPLAY ---")
+    fake = FakeSupabase()
+    box = SupabaseOutbox(fake, spool_dir="t3", batch_max=20, autostart=False, retry_base_s=0.01)
+    for i in range(40):
+        box.enqueue("audit_trail", audit_row(i, "ob-3"))
+    box.enqueue("paper_wallet", {"cycle_id": "ob-3", "symbol": "BTC/USDT", "cash_usd": 1.0, "asset_qty": 0.0, "last_entry_price": 0.0})
+    fake.lose_response = True
+    box.ship_once() # lote aplicado en Supabase, respuesta perdida -> sigue pendiente
+    box.ship_once() # segundo lote confirmado
+    # "crash": el proceso muere sin drenar; un nuevo outbox reabre el mismo spool
+    replayed = SupabaseOutbox(fake, spool_dir="t3", batch_max=20, autostart=False)
+    drained = replayed.drain(timeout_s=5)
+    ok = drained and replayed.stats["replayed"] == 41 and len(fake.tables["audit_trail"]) == 40 \
+        and len(fake.tables["paper_wallet"]) == 1 and spool_files("t3") == []
+    print(f"replayed: {replayed.stats['replayed']} | unique rows: {len(fake.tables['audit_trail'])} | requests: {fake.requests}")
+    results.append({"case": "Idempotent Replay", "result": "PASS" if ok else "FAIL", "details": f"{replayed.stats['replayed']} replayed"})
+
+    # --- TEST 4: REJECTED ROW IS ISOLATED AND DEAD-LETTERED ---
+    print("\n--- TEST 4: POISON ROW ---")
+    fake = FakeSupabase()
+    fake.reject = lambda table, row: row.get("symbol") == "BAD/USDT"
+    box = SupabaseOutbox(fake, spool_dir="t4", batch_max=16, retry_base_s=0.001, retry_max_s=0.01, max_attempts=3, autostart=False)
+    rows = [audit_row(i, "ob-4") for i in range(30)]
+    rows[7] = audit_row(7, "ob-4", symbol="BAD/USDT")
+    box.enqueue_many("audit_trail", rows)
+    drained = box.drain(timeout_s=5)
+    with open(os.path.join("t4", "dead_letter.jsonl")) as f:
+        dead = [json.loads(line) for line in f]
+    ok = drained and len(fake.tables["audit_trail"]) == 29 and len(dead) == 1 and dead[0]["row"]["symbol"] == "BAD/USDT"
+    print(f"shipped: {box.stats['shipped']} | dead letters: {len(dead)} | failures: {box.stats['failures']}")
+    results.append({"case": "Poison Row", "result": "PASS" if ok else "FAIL", "details": f"{len(dead)} dead-lettered"})
+
+    # --- TEST 5: AUDIT SINK -> OUTBOX DOES NOT BLOCK ON AN OUTAGE ---
+    print("\n--- TEST 5: AUDIT SINK DURING OUTAGE ---")
+    fake = FakeSupabase()
+    fake.down = True
+    client = SupabaseClient.__new__(SupabaseClient)
+    client.mode, client.client = "DRY_RUN", fake
+    client.outbox = SupabaseOutbox(fake, spool_dir="t5", retry_base_s=0.05)
+    sink = AuditSink(base_path="t5-forensics", flush_ms=0)
+    started = time.perf_counter()
+    for i in range(20):
+        sink.submit(build_audit_record(cycle_id="ob-5", state="HUNTING", symbol=f"A{i:03d}/USDT", action="SKIP"), client)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    spooled = client.outbox.backlog()
+    fake.down = False
+    drained = client.outbox.drain(timeout_s=5)
+    ok = spooled == 20 and drained and len(fake.tables["audit_trail"]) == 20 and elapsed_ms < 2000
+    print(f"20 records with Supabase down: {elapsed_ms:.1f} ms | spooled: {spooled} | delivered after recovery: {len(fake.tables['audit_trail'])}")
+    results.append({"case": "Sink Via Outbox", "result": "PASS" if ok else "FAIL", "details": f"{elapsed_ms:.0f} ms"})
+    sink.close()
+    client.close()
+
+    # --- TEST 6: FAILING HEAD ROW KEEPS PER-TABLE ORDER (READ-YOUR-WRITES) ---
+    print("\n--- TEST 6: FAILING HEAD ROW ---")
+    fake = FakeSupabase()
+    fake.reject = lambda table, row: row.get("cycle_id") == "ob-6a"
+    client = SupabaseClient.__new__(SupabaseClient)
+    client.mode, client.client = "DRY_RUN", fake
+    client.outbox = SupabaseOutbox(fake, spool_dir="t6", retry_base_s=0.001, retry_max_s=0.01, max_attempts=3, autostart=False)
+    for i, cycle_id in enumerate(("ob-6a", "ob-6b", "ob-6c")):
+        client.record_paper_state(cycle_id, float(i + 1), 0.1, 100.0, "ETH/USDT")
+    client.outbox.ship_once()
+    client.outbox.ship_once()
+    order = [row["cycle_id"] for row in client.outbox.pending_rows("paper_wallet")]
+    latest = client.get_latest_portfolio_state("ETH/USDT")
+    drained = client.outbox.drain(timeout_s=5)
+    ok = order == ["ob-6a", "ob-6b", "ob-6c"] and latest == (3.0, 0.1, 100.0) and drained \
+        and client.outbox.stats["dead_letters"] == 1 and len(fake.tables["paper_wallet"]) == 2
+    print(f"pending order after failures: {order} | latest: {latest} | dead letters: {client.outbox.stats['dead_letters']}")
+    results.append({"case": "Head Row Order", "result": "PASS" if ok else "FAIL", "details": str(order)})
+    client.close()
+    return results
+
+
+if __name__ == "__main__":
+    os.chdir(tempfile.mkdtemp(prefix="titan-outbox-"))
+    test_results = test_outbox()
+    print("\n=== SUMMARY ===")
+    for r in test_results:
+        print(r)
+    sys.exit(0 if all(r["result"] == "PASS" for r in test_results) else 1)